@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, request
 import os
 import threading
 import time
@@ -14,10 +14,18 @@ os.makedirs('../data', exist_ok=True)
 # 设置密钥以便flash消息能够正常工作
 app.secret_key = os.urandom(24)
 
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# 配置日志（后台线程写出，各模块级别和调试跟踪见app/logging_config.py）
+from app.config import get_config
+from app.logging_config import setup_logging, sample_trace
+setup_logging(get_config('logging'))
 logger = logging.getLogger(__name__)
 
+@app.before_request
+def start_log_trace():
+    """按配置的比例抽样请求进行调试跟踪"""
+    if sample_trace():
+        logger.debug("调试跟踪: %s %s", request.method, request.full_path)
+
 # 自动同步线程
 def auto_sync_thread():
     """后台线程，定期自动同步数据"""
@@ -38,7 +46,7 @@ def auto_sync_thread():
                 sync_interval = webdav_config.get('sync_interval', 3600)
                 
                 # 执行同步
-                logger.info(f"执行自动同步，间隔: {sync_interval}秒")
+                logger.info("执行自动同步，间隔: %s秒", sync_interval)
                 sync_result = sync_data(force=False)
                 
                 if sync_result:
@@ -53,10 +61,22 @@ def auto_sync_thread():
             # 等待下一次同步
             time.sleep(sync_interval)
         except Exception as e:
-            logger.error(f"自动同步线程发生错误: {e}")
+            logger.error("自动同步线程发生错误: %s", e)
             # 发生错误时，等待一段时间后重试
             time.sleep(300)  # 5分钟后重试
 
+# 注册数据库连接的请求级管理（每个请求共用一个连接，结束时归还连接池）
+from app.database import init_app as init_db_app
+init_db_app(app)
+
+# 检查数据库架构版本，有未应用的迁移时执行迁移
+from app.migrations import ensure_schema
+ensure_schema()
+
+# 拼音搜索依赖pypinyin，缺失时提醒
+from app.pinyin import warn_if_unavailable
+warn_if_unavailable(logger)
+
 # 启动自动同步线程
 sync_thread = threading.Thread(target=auto_sync_thread, daemon=True)
 sync_thread.start()
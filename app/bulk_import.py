@@ -0,0 +1,105 @@
+"""
+批量导入
+
+/api/{books,movies,music}/bulk的请求体（NDJSON或CSV）按行逐条解析，不把整个文件读入内存；
+解析出的记录经过与add_book/add_movie/add_music相同的字段映射后按批调用create_many写入，每批一个
+事务（见models.import_items）。导入的文件可以是/api/export导出的文件：带id的记录保留原ID，
+created_at、updated_at也保留原值。
+"""
+
+import csv
+import json
+
+# 导入格式 -> 请求的Content-Type
+IMPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'application/jsonl'),
+    'csv': ('text/csv',),
+}
+
+def detect_format(fmt, content_type):
+    """按查询参数format或请求的Content-Type确定导入格式，无法识别时抛出ValueError"""
+    if fmt:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"不支持的导入格式: {fmt}")
+        return fmt
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    for name, mimetypes in IMPORT_FORMATS.items():
+        if mimetype in mimetypes:
+            return name
+    return 'ndjson'
+
+class LineDecodeError(ValueError):
+    """请求体中的某一行不是UTF-8编码"""
+
+    def __init__(self, line_no, reason):
+        super().__init__(f"第{line_no}行不是UTF-8编码: {reason}")
+        self.line_no = line_no
+        self.reason = reason
+
+def iter_lines(stream):
+    """逐行读取二进制流并按UTF-8解码（保留行尾，去掉文件开头的BOM），无法解码时抛出LineDecodeError"""
+    first = True
+    for line_no, line in enumerate(stream, 1):
+        try:
+            text = line.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise LineDecodeError(line_no, e.reason) from e
+        if first:
+            text = text.lstrip('\ufeff')
+            first = False
+        yield text
+
+def parse_ndjson(lines):
+    """
+    逐行解析NDJSON
+
+    返回:
+    迭代器: (行号, 记录字典, 错误信息)，解析失败的行记录为None，空行跳过
+    """
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"JSON格式错误: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "每行须是一个JSON对象"
+            continue
+        yield line_no, record, None
+
+def parse_csv(lines):
+    """
+    逐行解析CSV，首行为字段名，空值视为未提供该字段
+
+    返回:
+    迭代器: (行号, 记录字典, 错误信息)，行号为记录开始的行（字段中可以有换行）
+    """
+    reader = csv.DictReader(lines)
+    line_no = 1
+    try:
+        for row in reader:
+            start, line_no = line_no + 1, reader.line_num
+            if None in row:
+                yield start, None, "字段数多于表头"
+                continue
+            yield start, {key: value for key, value in row.items() if value not in (None, '')}, None
+    except csv.Error as e:
+        yield line_no + 1, None, f"CSV格式错误: {e}"
+
+PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+}
+
+def parse_records(stream, fmt):
+    """
+    按格式逐条解析二进制流中的记录，见parse_ndjson
+
+    遇到无法按UTF-8解码的行时，产生该行的错误记录后停止解析（之后的内容无法可靠地分行）
+    """
+    try:
+        yield from PARSERS[fmt](iter_lines(stream))
+    except LineDecodeError as e:
+        yield e.line_no, None, f"请求体不是UTF-8编码: {e.reason}"
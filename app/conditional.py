@@ -0,0 +1,98 @@
+"""
+条件GET
+
+列表页、详情页和JSON API的响应附带ETag和Last-Modified：ETag由数据库标识和页面依赖的条目表的代数计算
+（cache_generations表，每次写入提交时加1，见app/dao/cache.py；恢复备份后表的代数可能回到之前的值，
+数据库标识随之改变，旧的ETag不会匹配），Last-Modified为这些表最后一次
+写入的时间。请求带If-None-Match或If-Modified-Since且数据未变化时，在查询数据和渲染模板之前
+直接返回304；响应带Cache-Control: no-cache，浏览器和反向代理每次使用缓存前都会重新验证。
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+import functools
+from datetime import datetime, timezone
+from flask import request, session, make_response
+from app import app
+from app.database import database_identity
+from app.dao.cache import get_table_versions
+
+logger = logging.getLogger(__name__)
+
+# 各类条目对应的表
+MEDIA_TABLES = ('books', 'movies', 'music')
+
+def _template_version():
+    """模板文件的最后修改时间，部署新版本后页面的ETag随之改变"""
+    latest = 0
+    for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return int(latest)
+
+TEMPLATE_VERSION = _template_version()
+
+def table_validators(tables):
+    """
+    计算依赖于tables的响应的ETag和Last-Modified
+
+    返回:
+    tuple: (etag, last_modified)，last_modified为UTC时间；最后一次写入发生在当前这一秒内时为None，
+           避免同一秒内的后续写入被If-Modified-Since（精度为秒）漏掉
+    """
+    versions = get_table_versions(tables)
+    raw = repr((TEMPLATE_VERSION, database_identity(), sorted(versions.items())))
+    etag = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+    changed = [changed_at for _, changed_at in versions.values()]
+    last_modified = None
+    if changed and all(changed):
+        last_modified = datetime.strptime(max(changed), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+        if last_modified >= datetime.now(timezone.utc).replace(microsecond=0):
+            last_modified = None
+    return etag, last_modified
+
+def not_modified(etag, last_modified):
+    """请求的缓存是否仍然有效（有If-None-Match时只比较ETag）"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+def conditional(*tables):
+    """
+    视图函数的装饰器：为GET响应附带ETag/Last-Modified，数据未变化时直接返回304
+
+    参数:
+    tables: 页面依赖的条目表，默认为全部条目表
+    """
+    tables = tables or MEDIA_TABLES
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # 闪现消息只显示一次，有待显示的消息时须重新渲染页面
+            if request.method != 'GET' or session.get('_flashes'):
+                return view(*args, **kwargs)
+            try:
+                etag, last_modified = table_validators(tables)
+            except sqlite3.Error as e:
+                logger.warning("计算ETag失败: %s", e)
+                return view(*args, **kwargs)
+
+            if not_modified(etag, last_modified):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
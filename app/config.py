@@ -18,6 +18,33 @@ DEFAULT_CONFIG = {
         "remote_path": "/media-manager/",
         "sync_interval": 3600,  # 同步间隔，默认1小时
         "last_sync": None
+    },
+    "database": {
+        "profile": "production",  # 存储配置档案: production 或 default（SQLite默认设置）
+        "pragmas": {}  # 覆盖档案中的单项PRAGMA，例如 {"cache_size": -32000}
+    },
+    "logging": {
+        "level": "INFO",
+        "levels": {},  # 各模块的日志级别，例如 {"app.dao": "WARNING", "app.douban": "DEBUG"}
+        "file": "",  # 日志文件路径，为空时只输出到控制台
+        "trace_sample_rate": 0  # 调试跟踪的请求抽样比例（0~1），被抽样的请求输出DEBUG日志
+    },
+    "query_cache": {
+        "enabled": True,
+        "max_mb": 32,  # 缓存结果的内存预算
+        "shared": False  # 多进程部署时设为true，从数据库读取各表的代数，写入后所有进程的缓存一致失效
+    },
+    "douban": {
+        "pool_size": 10,  # 每个豆瓣主机保持的keep-alive连接数
+        "retries": 3,  # 429、5xx响应或连接错误时的重试次数
+        "backoff_factor": 0.5,  # 重试的指数退避系数（秒）
+        "parser": "partial",  # 页面解析方式：html.parser、lxml或partial（lxml且只构建用到的元素）
+        "cache": {
+            "enabled": True,
+            "max_mb": 64,  # 缓存的页面总大小上限，超过时淘汰最久未访问的页面
+            "ttl": {"search": 21600, "detail": 604800},  # 有效期（秒）：搜索6小时，详情7天
+            "stale": {"search": 86400, "detail": 2592000}  # 过期后仍返回缓存并在后台刷新的时间（秒）
+        }
     }
 }
 
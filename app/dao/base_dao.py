@@ -1,50 +1,435 @@
+import json
+import base64
 import logging
 import sqlite3
-from app.database import get_db_connection
+from app.database import get_connection, release_connection
+from app.pinyin import pinyin_available, to_search_pinyin
+from app.dao.query import QueryBuilder, escape_like, EQUALS, STATUS, AT_LEAST, AT_MOST
+from app.dao.facets import FACET_TABLE, facet_values, apply_facet_changes, rebuild_facets
+from app.dao.tags import TAG_COLUMN, split_tags, join_tags, sync_item_tags
+from app.dao.cache import cached, skip_cache, bump_generation, query_cache
 
 logger = logging.getLogger(__name__)
 
+# 分页默认每页条数
+DEFAULT_PAGE_SIZE = 50
+
+# 全文搜索默认返回条数
+DEFAULT_SEARCH_LIMIT = 20
+# 首页每类条目显示的最近记录数
+DEFAULT_RECENT_LIMIT = 3
+# get_recent可用的时间字段（均有(字段, id)联合索引）
+RECENT_COLUMNS = ('created_at', 'updated_at')
+
+# 搜索结果摘要中高亮匹配词的标记
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+
+# 批量写入时每次executemany的行数
+BULK_BATCH_SIZE = 500
+
+# 导出时每次从游标读取的行数
+EXPORT_BATCH_SIZE = 1000
+# 导出全部字段时排除的内部字段
+INTERNAL_COLUMNS = ('search_pinyin',)
+
+# create_many返回的每行处理结果
+INSERTED = 'inserted'
+IGNORED = 'ignored'
+REPLACED = 'replaced'
+UPDATED = 'updated'
+FAILED = 'failed'
+
+# ID已存在时各冲突处理方式对应的结果
+CONFLICT_OUTCOMES = {'ignore': IGNORED, 'replace': REPLACED, 'update': UPDATED}
+
+def encode_cursor(order_by, value, id):
+    """将排序字段、最后一行的排序值和ID编码为不透明的游标字符串"""
+    raw = json.dumps([order_by, value, id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """解析游标字符串，返回(order_by, value, id)，格式无效时抛出ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        order_by, value, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return order_by, value, id
+
+# trigram分词的索引只能匹配至少3个字符的子串
+MIN_MATCH_LENGTH = 3
+
+def split_search_terms(query):
+    """
+    将用户输入按空白拆分为搜索词，返回(FTS5查询表达式, 短词列表)
+    
+    至少3个字符的词作为短语进行子串匹配，词之间为AND关系；引号、括号、AND/OR等FTS5语法字符
+    都按普通文本处理。更短的词无法使用trigram索引，由调用方用LIKE匹配。没有长词时表达式为None。
+    """
+    terms = query.split()
+    long_terms = [term.replace('"', '""') for term in terms if len(term) >= MIN_MATCH_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_MATCH_LENGTH]
+    match = ' '.join(f'"{term}"' for term in long_terms) or None
+    return match, short_terms
+
+def like_pattern(term):
+    """构建子串匹配的LIKE模式（配合ESCAPE '\\'使用）"""
+    return f'%{escape_like(term)}%'
+
 class BaseDAO:
     """基础数据访问对象，提供通用的数据库操作方法"""
     
+    # 分页允许的排序字段（均有(字段, id)联合索引）
+    SORT_COLUMNS = ('created_at', 'updated_at', 'title', 'rating')
+    # 列表筛选条件：条件名（即查询参数名） -> (字段, 条件类型)，条件类型见app.dao.query
+    FILTERS = {
+        'status': ('status', STATUS),
+        'rating_min': ('rating', AT_LEAST),
+        'rating_max': ('rating', AT_MOST),
+    }
+    
+    # 条目类型，即item_tags、facet_counts表中的item_type
+    ITEM_TYPE = None
+    # 筛选项：名称（与FILTERS中的条件名一致） -> (字段, 是否按逗号拆分)，计数由写入方法增量维护
+    FACETS = {}
+    
+    # 字段投影：列表页、首页卡片和详情页各自需要的字段，None表示全部字段
+    LIST_COLUMNS = None
+    CARD_COLUMNS = None
+    DETAIL_COLUMNS = None
+    
+    # 全文索引（{表名}_fts）中的字段及对应的bm25权重，须与迁移中创建的索引一致
+    SEARCH_COLUMNS = ()
+    SEARCH_WEIGHTS = ()
+    # 生成拼音搜索字段search_pinyin的来源字段
+    PINYIN_COLUMNS = ()
+    
     def __init__(self, table_name):
         self.table_name = table_name
+        self._table_columns = None
     
-    def get_all(self):
-        """获取所有记录"""
-        conn = get_db_connection()
+    def _commit(self, conn):
+        """提交写入事务，同时使该表缓存的查询结果过期（见app/dao/cache.py）"""
+        bump_generation(conn, self.table_name)
+        conn.commit()
+        query_cache.table_changed(self.table_name)
+    
+    def get_table_columns(self):
+        """获取表的所有字段名（首次调用时读取表结构）"""
+        if self._table_columns is None:
+            conn = get_connection()
+            try:
+                rows = conn.execute(f'PRAGMA table_info({self.table_name})').fetchall()
+                self._table_columns = [row[1] for row in rows]
+            finally:
+                release_connection(conn)
+        return self._table_columns
+    
+    def projection_columns(self, columns):
+        """将投影名称（'list'、'card'、'detail'）解析为字段名列表（None表示全部字段），其余取值原样返回"""
+        if isinstance(columns, str):
+            projection = columns.upper() + '_COLUMNS'
+            if not hasattr(self, projection):
+                raise ValueError(f"未知的字段投影: {columns}")
+            columns = getattr(self, projection)
+        return columns
+    
+    def select_columns(self, columns=None, required=(), table_alias=None):
+        """
+        构建SELECT字段列表
+        
+        参数:
+        columns: 投影名称（'list'、'card'、'detail'）、字段名列表，或None表示全部字段
+        required (tuple): 必须包含的字段，例如分页排序字段
+        table_alias (str): 字段名前加的表别名，用于联表查询
+        
+        字段不存在时抛出ValueError
+        """
+        columns = self.projection_columns(columns)
+        prefix = f'{table_alias}.' if table_alias else ''
+        if columns is None:
+            return f'{prefix}*'
+        
+        table_columns = self.get_table_columns()
+        selected = ['id']
+        for column in list(columns) + list(required):
+            if column not in table_columns:
+                raise ValueError(f"{self.table_name}表没有字段: {column}")
+            if column not in selected:
+                selected.append(column)
+        # 字段名加引号，cast等字段名与SQL关键字冲突
+        return ', '.join(f'{prefix}"{column}"' for column in selected)
+    
+    @cached
+    def get_all(self, columns=None):
+        """获取所有记录，columns为字段投影（见select_columns）"""
+        select_list = self.select_columns(columns)
+        conn = get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(f'SELECT * FROM {self.table_name}')
+            cursor.execute(f'SELECT {select_list} FROM {self.table_name}')
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            logger.error(f"获取所有{self.table_name}记录失败: {e}")
+            skip_cache()
+            logger.error("获取所有%s记录失败: %s", self.table_name, e)
+            return []
+        finally:
+            release_connection(conn)
+    
+    def iter_rows(self, columns=None, filters=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        逐批读取符合筛选条件的记录，用于导出
+        
+        参数:
+        columns: 字段投影（见select_columns），None表示除内部字段（search_pinyin）外的全部字段
+        filters (dict): 筛选条件，见build_filters
+        batch_size (int): 每次从游标读取的行数
+        
+        返回:
+        tuple: (字段名列表, 记录字典的迭代器)
+        
+        字段投影或筛选条件无效时立即抛出ValueError（而不是在迭代时）。迭代器在同一个游标上按
+        batch_size逐批读取，不排序（按表中的存储顺序，大致为添加顺序），内存占用与记录总数无关；
+        结果不缓存，迭代结束或关闭迭代器时释放连接
+        """
+        columns = self.projection_columns(columns)
+        if columns is None:
+            columns = [column for column in self.get_table_columns() if column not in INTERNAL_COLUMNS]
+        select_list = self.select_columns(columns)
+        where_clause, params = self.build_filters(filters).build()
+        sql = f'SELECT {select_list} FROM {self.table_name} {where_clause}'
+        # 与select_columns的字段顺序一致：id在前，重复的字段只出现一次
+        fields = list(dict.fromkeys(['id', *columns]))
+        return fields, self._iter_query(sql, tuple(params), max(1, int(batch_size)))
+    
+    def _iter_query(self, sql, params, batch_size):
+        conn = get_connection()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        except sqlite3.Error as e:
+            logger.error("导出%s记录失败: %s", self.table_name, e)
+            raise
+        finally:
+            release_connection(conn)
+    
+    def build_filters(self, filters=None, table_alias=None):
+        """
+        将筛选条件编译为QueryBuilder
+        
+        参数:
+        filters (dict): 条件名 -> 取值（可以是列表），条件名须在FILTERS中
+        table_alias (str): 字段名前加的表别名，用于联表查询
+        
+        条件名未知或取值无效时抛出ValueError
+        """
+        query = QueryBuilder(table_alias)
+        for name, value in (filters or {}).items():
+            if name not in self.FILTERS:
+                raise ValueError(f"不支持的筛选条件: {name}")
+            column, kind = self.FILTERS[name]
+            query.add_filter(kind, column, value, self.ITEM_TYPE)
+        return query
+    
+    @cached
+    def get_page(self, order_by='created_at', after_cursor=None, limit=DEFAULT_PAGE_SIZE, filters=None, columns=None):
+        """
+        按游标（keyset）分页获取记录
+        
+        参数:
+        order_by (str): 排序字段，前缀"-"表示降序，例如"-created_at"；同值记录按id排序
+        after_cursor (str): 上一页返回的next_cursor，为None时从第一页开始
+        limit (int): 每页条数
+        filters (dict): 筛选条件，见build_filters
+        columns: 字段投影（见select_columns），排序字段总会包含在内
+        
+        返回:
+        dict: {'items': 当前页记录列表, 'next_cursor': 下一页游标，没有下一页时为None}
+        
+        排序字段、筛选条件、游标或字段投影无效时抛出ValueError
+        """
+        descending = order_by.startswith('-')
+        column = order_by.lstrip('-')
+        if column not in self.SORT_COLUMNS:
+            raise ValueError(f"不支持的排序字段: {order_by}")
+        
+        limit = max(1, int(limit))
+        query = self.build_filters(filters)
+        
+        if after_cursor:
+            cursor_order, last_value, last_id = decode_cursor(after_cursor)
+            if cursor_order != order_by:
+                raise ValueError(f"游标的排序字段({cursor_order})与请求的排序字段({order_by})不一致")
+            condition, condition_params = self._seek_condition(column, descending, last_value, last_id)
+            query.where(condition, *condition_params)
+        
+        select_list = self.select_columns(columns, required=(column,))
+        where_clause, params = query.build()
+        direction = 'DESC' if descending else 'ASC'
+        sql = (f'SELECT {select_list} FROM {self.table_name} {where_clause} '
+               f'ORDER BY {column} {direction}, id {direction} LIMIT ?')
+        params.append(limit + 1)  # 多取一行，用于判断是否还有下一页
+        
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            rows = [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            skip_cache()
+            logger.error("分页获取%s记录失败: %s", self.table_name, e)
+            return {'items': [], 'next_cursor': None}
+        finally:
+            release_connection(conn)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(order_by, last.get(column), last['id'])
+        return {'items': rows, 'next_cursor': next_cursor}
+    
+    def _seek_condition(self, column, descending, value, last_id):
+        """构建游标之后的记录的查询条件（SQLite中NULL在升序时排最前，降序时排最后）"""
+        op = '<' if descending else '>'
+        if value is None:
+            if descending:
+                return f'({column} IS NULL AND id < ?)', [last_id]
+            return f'(({column} IS NULL AND id > ?) OR {column} IS NOT NULL)', [last_id]
+        
+        condition = f'{column} {op} ? OR ({column} = ? AND id {op} ?)'
+        if descending:
+            condition += f' OR {column} IS NULL'
+        return f'({condition})', [value, value, last_id]
+    
+    def recent_query(self, limit=DEFAULT_RECENT_LIMIT, order_by='created_at', columns='card'):
+        """
+        构建最近记录的查询，返回(sql, params)，按(时间字段, id)索引倒序读取前limit行
+        
+        时间字段或字段投影无效时抛出ValueError
+        """
+        if order_by not in RECENT_COLUMNS:
+            raise ValueError(f"不支持的时间字段: {order_by}")
+        select_list = self.select_columns(columns, required=(order_by,))
+        sql = f'SELECT {select_list} FROM {self.table_name} ORDER BY {order_by} DESC, id DESC LIMIT ?'
+        return sql, (max(1, int(limit)),)
+    
+    @cached
+    def get_recent(self, limit=DEFAULT_RECENT_LIMIT, order_by='created_at', columns='card'):
+        """
+        获取最近添加（order_by='updated_at'时为最近更新）的记录
+        
+        参数:
+        limit (int): 条数
+        order_by (str): 时间字段，created_at或updated_at
+        columns: 字段投影（见select_columns），默认为首页卡片的字段
+        
+        时间字段或字段投影无效时抛出ValueError
+        """
+        sql, params = self.recent_query(limit, order_by, columns)
+        conn = get_connection()
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        except sqlite3.Error as e:
+            skip_cache()
+            logger.error("获取最近的%s记录失败: %s", self.table_name, e)
             return []
         finally:
-            conn.close()
+            release_connection(conn)
     
-    def get_by_id(self, id):
-        """根据ID获取记录"""
-        conn = get_db_connection()
+    @cached
+    def get_distinct_values(self, column, split=False):
+        """
+        获取字段的所有不同取值（已排序，忽略空值）
+        
+        参数:
+        column (str): 字段名
+        split (bool): 是否按逗号拆分多值字段（如tags、genre、cast）
+        """
+        conn = get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(f'SELECT * FROM {self.table_name} WHERE id = ?', (id,))
+            # 字段名加引号，cast等字段名与SQL关键字冲突
+            quoted = f'"{column}"'
+            cursor.execute(f"SELECT DISTINCT {quoted} FROM {self.table_name} "
+                           f"WHERE {quoted} IS NOT NULL AND {quoted} != ''")
+            values = set()
+            for row in cursor.fetchall():
+                if split:
+                    values.update(v.strip() for v in str(row[0]).split(',') if v.strip())
+                elif str(row[0]).strip():
+                    values.add(str(row[0]).strip())
+            return sorted(values)
+        except Exception as e:
+            skip_cache()
+            logger.error("获取%s表%s字段取值失败: %s", self.table_name, column, e)
+            return []
+        finally:
+            release_connection(conn)
+    
+    @cached
+    def get_by_id(self, id, columns=None):
+        """根据ID获取记录，columns为字段投影（见select_columns）"""
+        select_list = self.select_columns(columns)
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {select_list} FROM {self.table_name} WHERE id = ?', (id,))
             row = cursor.fetchone()
             return dict(row) if row else None
         except Exception as e:
-            logger.error(f"获取{self.table_name}记录(ID={id})失败: {e}")
+            skip_cache()
+            logger.error("获取%s记录(ID=%s)失败: %s", self.table_name, id, e)
             return None
         finally:
-            conn.close()
+            release_connection(conn)
+    
+    @cached
+    def get_many(self, ids, columns=None):
+        """
+        按ID列表获取多条记录，每500个ID一条WHERE id IN查询
+        
+        参数:
+        ids (list): 记录ID，重复的ID只返回一次
+        columns: 字段投影（见select_columns）
+        
+        返回:
+        list: 找到的记录，按ids中的顺序排列，不存在的ID被跳过
+        """
+        select_list = self.select_columns(columns)
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        conn = get_connection()
+        try:
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                chunk = ids[start:start + BULK_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor = conn.execute(f'SELECT {select_list} FROM {self.table_name} WHERE id IN ({placeholders})',
+                                      tuple(chunk))
+                found.update((row['id'], dict(row)) for row in cursor.fetchall())
+        except Exception as e:
+            skip_cache()
+            logger.error("批量获取%s记录失败: %s", self.table_name, e)
+            return []
+        finally:
+            release_connection(conn)
+        return [found[id] for id in ids if id in found]
     
     def create(self, data):
         """创建新记录"""
         if 'id' not in data:
-            logger.error(f"创建{self.table_name}记录失败: 缺少ID字段")
+            logger.error("创建%s记录失败: 缺少ID字段", self.table_name)
             return False
             
-        conn = get_db_connection()
+        data = self._normalize_tags(data)
+        conn = get_connection()
         try:
             cursor = conn.cursor()
             
@@ -54,36 +439,168 @@ class BaseDAO:
             fields_str = ', '.join(fields)
             
             sql = f'INSERT INTO {self.table_name} ({fields_str}) VALUES ({placeholders})'
-            logger.info(f"执行SQL: {sql}")
-            logger.info(f"SQL参数: {list(data.values())}")
+            params = tuple(data.values())
+            logger.debug("执行SQL: %s 参数: %s", sql, params)
             
-            cursor.execute(sql, tuple(data.values()))
+            cursor.execute(sql, params)
+            self._refresh_search_pinyin(conn, [data['id']])
+            if TAG_COLUMN in data:
+                self._sync_item_tags(conn, [data['id']])
+            self._update_facets(conn, {}, [data['id']])
             
-            conn.commit()
-            logger.info(f"成功创建{self.table_name}记录 ID={data['id']}")
+            self._commit(conn)
+            logger.debug("成功创建%s记录 ID=%s", self.table_name, data['id'])
             return True
         except sqlite3.Error as e:
             conn.rollback()
-            logger.error(f"创建{self.table_name}记录SQL错误: {e}", exc_info=True)
+            logger.error("创建%s记录SQL错误: %s", self.table_name, e, exc_info=True)
             # 记录表结构以便诊断
             try:
                 cursor = conn.cursor()
                 cursor.execute(f"PRAGMA table_info({self.table_name})")
                 columns = cursor.fetchall()
-                logger.error(f"{self.table_name}表结构: {[dict(col) for col in columns]}")
+                logger.error("%s表结构: %s", self.table_name, [dict(col) for col in columns])
             except Exception as e2:
-                logger.error(f"获取表结构失败: {e2}")
+                logger.error("获取表结构失败: %s", e2)
             return False
         except Exception as e:
             conn.rollback()
-            logger.error(f"创建{self.table_name}记录失败: {e}", exc_info=True)
+            logger.error("创建%s记录失败: %s", self.table_name, e, exc_info=True)
             return False
         finally:
-            conn.close()
+            release_connection(conn)
+    
+    def create_many(self, rows, on_conflict='ignore', batch_size=BULK_BATCH_SIZE):
+        """
+        批量创建记录，所有行在同一个事务中写入
+        
+        参数:
+        rows (list): 记录字典列表，每条记录须包含id
+        on_conflict (str): ID已存在时的处理方式，'ignore'保留已有记录，'replace'整行替换，
+                           'update'只更新该行提供的字段
+        batch_size (int): 每次executemany的行数
+        
+        返回:
+        list: 与rows一一对应的处理结果，取值为inserted、ignored、replaced、updated或failed
+        """
+        if on_conflict not in CONFLICT_OUTCOMES:
+            raise ValueError(f"不支持的冲突处理方式: {on_conflict}")
+        
+        rows = [self._normalize_tags(row) for row in rows]
+        outcomes = [FAILED] * len(rows)
+        table_columns = self.get_table_columns()
+        
+        # 按字段组合分组，同一组的行共用一条SQL
+        groups = {}
+        for index, row in enumerate(rows):
+            if not row.get('id'):
+                logger.error("批量创建%s记录失败: 第%s行缺少ID字段", self.table_name, index + 1)
+                continue
+            unknown = [column for column in row if column not in table_columns]
+            if unknown:
+                logger.error("批量创建%s记录(ID=%s)失败: 未知字段 %s", self.table_name, row['id'], unknown)
+                continue
+            groups.setdefault(tuple(sorted(row)), []).append(index)
+        
+        conn = get_connection()
+        try:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            
+            for columns, indexes in groups.items():
+                sql = self._bulk_insert_sql(columns, on_conflict)
+                for start in range(0, len(indexes), batch_size):
+                    batch = indexes[start:start + batch_size]
+                    params = [tuple(rows[i][column] for column in columns) for i in batch]
+                    batch_ids = list(dict.fromkeys(rows[i]['id'] for i in batch))
+                    existing = self._existing_ids(conn, batch_ids)
+                    facets_before = self._facet_snapshot(conn, list(existing))
+                    
+                    conn.execute('SAVEPOINT create_many_batch')
+                    try:
+                        conn.executemany(sql, params)
+                        conn.execute('RELEASE create_many_batch')
+                    except sqlite3.Error as e:
+                        # 整批失败时回滚该批并逐行重试，找出出错的行
+                        conn.execute('ROLLBACK TO create_many_batch')
+                        conn.execute('RELEASE create_many_batch')
+                        logger.warning("批量创建%s记录失败，改为逐行写入: %s", self.table_name, e)
+                        self._create_rows_one_by_one(conn, sql, rows, batch, params, on_conflict, outcomes)
+                    else:
+                        for i in batch:
+                            id = rows[i]['id']
+                            if id in existing:
+                                outcomes[i] = CONFLICT_OUTCOMES[on_conflict]
+                            else:
+                                outcomes[i] = INSERTED
+                                existing.add(id)  # 同一批中重复的ID按冲突处理
+                    
+                    if any(column in columns for column in self.PINYIN_COLUMNS):
+                        self._refresh_search_pinyin(conn, [rows[i]['id'] for i in batch if outcomes[i] != FAILED])
+                    # 整行替换时未提供的tags字段被清空，同样需要同步标签关联
+                    if TAG_COLUMN in columns or on_conflict == 'replace':
+                        self._sync_item_tags(conn, batch_ids)
+                    self._update_facets(conn, facets_before, batch_ids)
+            
+            self._commit(conn)
+        except Exception as e:
+            conn.rollback()
+            logger.error("批量创建%s记录失败: %s", self.table_name, e, exc_info=True)
+            return [FAILED] * len(rows)
+        finally:
+            release_connection(conn)
+        
+        summary = {outcome: outcomes.count(outcome) for outcome in set(outcomes)}
+        logger.info("批量创建%s记录完成: %s", self.table_name, summary)
+        return outcomes
+    
+    def _bulk_insert_sql(self, columns, on_conflict):
+        """构建批量写入的INSERT语句"""
+        # 字段名加引号，cast等字段名与SQL关键字冲突
+        fields = ', '.join(f'"{column}"' for column in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        if on_conflict == 'replace':
+            return f'INSERT OR REPLACE INTO {self.table_name} ({fields}) VALUES ({placeholders})'
+        
+        # 不使用INSERT OR IGNORE，它会同时忽略NOT NULL等约束错误，使出错的行被当作已写入
+        updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column != 'id')
+        if on_conflict == 'update' and updates:
+            action = f'DO UPDATE SET {updates}'
+        else:
+            action = 'DO NOTHING'
+        return f'INSERT INTO {self.table_name} ({fields}) VALUES ({placeholders}) ON CONFLICT(id) {action}'
+    
+    def existing_ids(self, ids):
+        """返回ids中已存在于表中的ID集合"""
+        conn = get_connection()
+        try:
+            return self._existing_ids(conn, list(ids))
+        finally:
+            release_connection(conn)
+    
+    def _existing_ids(self, conn, ids):
+        """返回ids中已存在于表中的ID集合"""
+        placeholders = ', '.join('?' for _ in ids)
+        cursor = conn.execute(f'SELECT id FROM {self.table_name} WHERE id IN ({placeholders})', tuple(ids))
+        return {row[0] for row in cursor.fetchall()}
+    
+    def _create_rows_one_by_one(self, conn, sql, rows, batch, params, on_conflict, outcomes):
+        """逐行写入一批记录，记录每行的处理结果"""
+        for i, row_params in zip(batch, params):
+            id = rows[i]['id']
+            exists = bool(self._existing_ids(conn, [id]))
+            try:
+                conn.execute(sql, row_params)
+            except sqlite3.Error as e:
+                logger.error("创建%s记录(ID=%s)失败: %s", self.table_name, id, e)
+                outcomes[i] = FAILED
+                continue
+            outcomes[i] = CONFLICT_OUTCOMES[on_conflict] if exists else INSERTED
     
     def update(self, id, data):
         """更新记录"""
-        conn = get_db_connection()
+        data = self._normalize_tags(data)
+        conn = get_connection()
         try:
             cursor = conn.cursor()
             
@@ -93,75 +610,433 @@ class BaseDAO:
             values.append(id)  # 添加WHERE条件的参数
             
             sql = f'UPDATE {self.table_name} SET {set_clause} WHERE id = ?'
-            logger.info(f"执行SQL: {sql}")
-            logger.info(f"参数值: {values}")
+            logger.debug("执行SQL: %s 参数: %s", sql, values)
             
+            # 先取得写锁再读取分类统计快照，避免其他连接在快照和写入之间修改这条记录
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            facets_before = self._facet_snapshot(conn, [id], changed=data)
             cursor.execute(sql, tuple(values))
-            
-            conn.commit()
             result = cursor.rowcount > 0
-            logger.info(f"更新{self.table_name}记录(ID={id})结果: {result}, 影响行数: {cursor.rowcount}")
+            if result and any(column in data for column in self.PINYIN_COLUMNS):
+                self._refresh_search_pinyin(conn, [id])
+            if result and TAG_COLUMN in data:
+                self._sync_item_tags(conn, [id])
+            if facets_before:
+                self._update_facets(conn, facets_before, [id])
+            
+            self._commit(conn)
+            logger.debug("更新%s记录(ID=%s)结果: %s, 影响行数: %s", self.table_name, id, result, cursor.rowcount)
             return result
         except Exception as e:
             conn.rollback()
-            logger.error(f"更新{self.table_name}记录(ID={id})失败: {e}")
+            logger.error("更新%s记录(ID=%s)失败: %s", self.table_name, id, e)
             return False
         finally:
-            conn.close()
+            release_connection(conn)
+    
+    def update_many(self, ids, changes=None, add_tags=(), remove_tags=()):
+        """
+        批量修改多条记录，所有修改在同一个事务中执行
+        
+        参数:
+        ids (list): 记录ID
+        changes (dict): 字段 -> 新值，对所有记录设置相同的值（每批ID一条UPDATE ... WHERE id IN）
+        add_tags (list): 为每条记录添加的标签
+        remove_tags (list): 从每条记录移除的标签
+        
+        返回:
+        dict: {'updated': 找到的记录数, 'missing': 不存在的ID列表}
+        
+        字段不存在或没有任何修改时抛出ValueError；写入失败时回滚并抛出sqlite3.Error
+        """
+        changes = self._normalize_tags(dict(changes or {}))
+        add_tags, remove_tags = split_tags(add_tags), split_tags(remove_tags)
+        table_columns = self.get_table_columns()
+        for column in changes:
+            if column not in table_columns or column in ('id', 'created_at'):
+                raise ValueError(f"不能批量修改字段: {column}")
+        if TAG_COLUMN in changes and (add_tags or remove_tags):
+            raise ValueError("不能同时设置tags和添加/移除标签")
+        if not changes and not add_tags and not remove_tags:
+            raise ValueError("没有要修改的内容")
+        
+        ids = list(dict.fromkeys(ids))
+        conn = get_connection()
+        try:
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            existing = set()
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                existing |= self._existing_ids(conn, ids[start:start + BULK_BATCH_SIZE])
+            found = [id for id in ids if id in existing]
+            touched = set(changes) | ({TAG_COLUMN} if add_tags or remove_tags else set())
+            facets_before = self._facet_snapshot(conn, found, changed=touched)
+            
+            set_clause = ', '.join(f'"{column}" = ?' for column in changes)
+            for start in range(0, len(found), BULK_BATCH_SIZE):
+                chunk = found[start:start + BULK_BATCH_SIZE]
+                if changes:
+                    placeholders = ', '.join('?' for _ in chunk)
+                    conn.execute(f'UPDATE {self.table_name} SET {set_clause} WHERE id IN ({placeholders})',
+                                 (*changes.values(), *chunk))
+                if add_tags or remove_tags:
+                    self._change_tags(conn, chunk, add_tags, remove_tags)
+            
+            if any(column in touched for column in self.PINYIN_COLUMNS):
+                self._refresh_search_pinyin(conn, found)
+            if TAG_COLUMN in touched:
+                self._sync_item_tags(conn, found)
+            if facets_before:
+                self._update_facets(conn, facets_before, found)
+            self._commit(conn)
+        except Exception as e:
+            conn.rollback()
+            logger.error("批量修改%s记录失败: %s", self.table_name, e)
+            raise
+        finally:
+            release_connection(conn)
+        
+        return {'updated': len(found), 'missing': [id for id in ids if id not in existing]}
+    
+    def _change_tags(self, conn, ids, add_tags, remove_tags):
+        """为ids添加/移除标签，只写入标签有变化的记录（在调用方的事务中执行）"""
+        placeholders = ', '.join('?' for _ in ids)
+        rows = conn.execute(f'SELECT id, {TAG_COLUMN} FROM {self.table_name} WHERE id IN ({placeholders})',
+                            tuple(ids)).fetchall()
+        changed = []
+        for row in rows:
+            tags = split_tags(row[TAG_COLUMN])
+            new_tags = split_tags([tag for tag in tags if tag not in remove_tags] + add_tags)
+            if new_tags != tags:
+                changed.append((join_tags(new_tags), row['id']))
+        if changed:
+            conn.executemany(f'UPDATE {self.table_name} SET {TAG_COLUMN} = ? WHERE id = ?', changed)
     
     def delete(self, id):
         """删除记录"""
-        conn = get_db_connection()
+        conn = get_connection()
         try:
             cursor = conn.cursor()
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            facets_before = self._facet_snapshot(conn, [id])
             cursor.execute(f'DELETE FROM {self.table_name} WHERE id = ?', (id,))
-            conn.commit()
+            self._sync_item_tags(conn, [id])
+            self._update_facets(conn, facets_before, [])
+            self._commit(conn)
             return cursor.rowcount > 0
         except Exception as e:
             conn.rollback()
-            logger.error(f"删除{self.table_name}记录(ID={id})失败: {e}")
+            logger.error("删除%s记录(ID=%s)失败: %s", self.table_name, id, e)
             return False
         finally:
-            conn.close()
+            release_connection(conn)
     
-    def search(self, query, fields=None):
-        """搜索记录"""
-        if not fields:
-            logger.error(f"搜索{self.table_name}记录失败: 未指定搜索字段")
+    @cached
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT, offset=0, columns='list', filters=None):
+        """
+        全文搜索记录
+        
+        参数:
+        query (str): 搜索词，可以是原文的任意子串或标题、人名的全拼/首字母；多个词以空格分隔时须全部匹配
+        limit (int): 返回条数
+        offset (int): 跳过的条数
+        columns: 字段投影（见select_columns）
+        filters (dict): 筛选条件，见build_filters
+        
+        返回:
+        list: 记录列表，每条记录附带snippet字段（匹配处用<mark>标记的摘要，内容未做HTML转义）。
+              包含至少3个字符的词时按bm25相关度排序；只有更短的词时无法使用索引，
+              逐行LIKE匹配并按标题排序，snippet为None
+        """
+        match, short_terms = split_search_terms(query or '')
+        if not match and not short_terms:
             return []
-            
-        conn = get_db_connection()
+        
+        fts = f'{self.table_name}_fts'
+        select_list = self.select_columns(columns, table_alias='t')
+        query = self.build_filters(filters, table_alias='t')
+        
+        for term in short_terms:
+            likes = ' OR '.join(f"t.\"{column}\" LIKE ? ESCAPE '\\'" for column in self.SEARCH_COLUMNS)
+            query.where(f'({likes})', *[like_pattern(term)] * len(self.SEARCH_COLUMNS))
+        conditions, params = query.conditions, query.params
+        
+        if match:
+            weights = ', '.join(str(float(weight)) for weight in self.SEARCH_WEIGHTS)
+            bm25 = f'bm25({fts}, {weights})' if weights else f'bm25({fts})'
+            where_clause = ' AND '.join([f'{fts} MATCH ?'] + conditions)
+            sql = (f'SELECT {select_list}, snippet({fts}, -1, ?, ?, ?, 16) AS snippet '
+                   f'FROM {fts} JOIN {self.table_name} t ON t.rowid = {fts}.rowid '
+                   f'WHERE {where_clause} ORDER BY {bm25} LIMIT ? OFFSET ?')
+            params = [SNIPPET_START, SNIPPET_END, '…', match] + params
+        else:
+            sql = (f'SELECT {select_list}, NULL AS snippet FROM {self.table_name} t '
+                   f'WHERE {" AND ".join(conditions)} ORDER BY t.title LIMIT ? OFFSET ?')
+        params.extend([int(limit), int(offset)])
+        
+        conn = get_connection()
         try:
             cursor = conn.cursor()
-            
-            # 构建LIKE条件
-            like_conditions = [f"{field} LIKE ?" for field in fields]
-            where_clause = " OR ".join(like_conditions)
-            
-            # 为每个字段准备模糊匹配参数
-            params = [f"%{query}%" for _ in fields]
-            
-            sql = f'SELECT * FROM {self.table_name} WHERE {where_clause}'
             cursor.execute(sql, tuple(params))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            skip_cache()
+            logger.error("搜索%s记录失败: %s", self.table_name, e)
+            return []
+        finally:
+            release_connection(conn)
+    
+    def _refresh_search_pinyin(self, conn, ids):
+        """根据PINYIN_COLUMNS重新生成search_pinyin字段（在调用方的事务中执行，未安装pypinyin时跳过）"""
+        if not self.PINYIN_COLUMNS or not pinyin_available():
+            return
+        
+        columns = ', '.join(f'"{column}"' for column in self.PINYIN_COLUMNS)
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            chunk = ids[start:start + BULK_BATCH_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = conn.execute(f'SELECT id, search_pinyin, {columns} FROM {self.table_name} '
+                                f'WHERE id IN ({placeholders})', tuple(chunk)).fetchall()
+            updates = []
+            for row in rows:
+                value = to_search_pinyin(*(row[column] for column in self.PINYIN_COLUMNS))
+                if value != row['search_pinyin']:
+                    updates.append((value, row['id']))
+            if updates:
+                conn.executemany(f'UPDATE {self.table_name} SET search_pinyin = ? WHERE id = ?', updates)
+    
+    def rebuild_search_index(self):
+        """重新生成拼音搜索字段，从原表重建全文索引并合并索引段（用于索引与数据不一致或安装pypinyin之后）"""
+        fts = f'{self.table_name}_fts'
+        conn = get_connection()
+        try:
+            ids = [row[0] for row in conn.execute(f'SELECT id FROM {self.table_name}').fetchall()]
+            self._refresh_search_pinyin(conn, ids)
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('optimize')")
+            self._commit(conn)
+            logger.info("已重建%s的全文索引", self.table_name)
+            return True
+        except Exception as e:
+            conn.rollback()
+            logger.error("重建%s的全文索引失败: %s", self.table_name, e)
+            return False
+        finally:
+            release_connection(conn)
+    
+    def check_search_index(self):
+        """检查全文索引与原表内容是否一致"""
+        fts = f'{self.table_name}_fts'
+        conn = get_connection()
+        try:
+            conn.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('integrity-check', 1)")
+            return True
+        except sqlite3.Error as e:
+            logger.warning("%s的全文索引与数据不一致: %s", self.table_name, e)
+            return False
+        finally:
+            release_connection(conn)
+    
+    def _normalize_tags(self, data):
+        """将写入数据中的tags（逗号分隔的文本或列表）转换为规范化文本，返回新的字典"""
+        if TAG_COLUMN not in data or not self.ITEM_TYPE:
+            return data
+        data = dict(data)
+        data[TAG_COLUMN] = join_tags(split_tags(data[TAG_COLUMN]))
+        return data
+    
+    def _sync_item_tags(self, conn, ids):
+        """按tags字段同步ids的item_tags关联（在调用方的事务中执行）"""
+        if self.ITEM_TYPE and ids:
+            sync_item_tags(conn, self.table_name, self.ITEM_TYPE, ids)
+    
+    @cached
+    def get_by_tag(self, tag, columns=None):
+        """获取有该标签的全部记录（按标题排序），columns为字段投影（见select_columns）"""
+        select_list = self.select_columns(columns)
+        where_clause, params = self.build_filters({'tag': tag}).build()
+        conn = get_connection()
+        try:
+            cursor = conn.execute(f'SELECT {select_list} FROM {self.table_name} {where_clause} ORDER BY title, id',
+                                  tuple(params))
+            return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            logger.error(f"搜索{self.table_name}记录失败: {e}")
+            skip_cache()
+            logger.error("获取标签为'%s'的%s记录失败: %s", tag, self.table_name, e)
             return []
         finally:
-            conn.close()
+            release_connection(conn)
+    
+    @cached
+    def get_all_tags(self):
+        """获取全部标签及其条目数（标签云），按条目数从多到少排序"""
+        conn = get_connection()
+        try:
+            cursor = conn.execute('''
+            SELECT t.name, tc.count FROM (
+                SELECT tag_id, COUNT(*) AS count FROM item_tags WHERE item_type = ? GROUP BY tag_id
+            ) tc
+            JOIN tags t ON t.id = tc.tag_id
+            ORDER BY tc.count DESC, t.name
+            ''', (self.ITEM_TYPE,))
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            skip_cache()
+            logger.error("获取所有%s标签失败: %s", self.table_name, e)
+            return []
+        finally:
+            release_connection(conn)
+    
+    def add_tag(self, id, tag_name):
+        """为记录添加标签"""
+        item = self.get_by_id(id, columns=[TAG_COLUMN])
+        if not item:
+            return False
+        tags = split_tags(item[TAG_COLUMN])
+        if tag_name.strip() in tags:
+            return True
+        return self.update(id, {TAG_COLUMN: tags + [tag_name]})
+    
+    def remove_tag(self, id, tag_name):
+        """从记录移除标签"""
+        item = self.get_by_id(id, columns=[TAG_COLUMN])
+        if not item:
+            return False
+        tags = split_tags(item[TAG_COLUMN])
+        if tag_name.strip() not in tags:
+            return True
+        return self.update(id, {TAG_COLUMN: [tag for tag in tags if tag != tag_name.strip()]})
+    
+    def rebuild_item_tags(self, batch_size=BULK_BATCH_SIZE):
+        """按tags字段重建全部标签关联（用于关联与数据不一致时，例如直接修改了数据库文件）"""
+        conn = get_connection()
+        try:
+            ids = [row[0] for row in conn.execute(f'SELECT id FROM {self.table_name}').fetchall()]
+            conn.execute('DELETE FROM item_tags WHERE item_type = ?', (self.ITEM_TYPE,))
+            for start in range(0, len(ids), batch_size):
+                self._sync_item_tags(conn, ids[start:start + batch_size])
+            self._commit(conn)
+            logger.info("已重建%s的标签关联", self.table_name)
+            return True
+        except Exception as e:
+            conn.rollback()
+            logger.error("重建%s的标签关联失败: %s", self.table_name, e)
+            return False
+        finally:
+            release_connection(conn)
+    
+    def _facet_snapshot(self, conn, ids, changed=None):
+        """
+        读取记录当前的筛选项取值，返回 ID -> (筛选项名, 取值)集合
+        
+        changed为本次更新的字段时，没有涉及筛选项字段则返回空字典
+        """
+        if not self.FACETS or not ids:
+            return {}
+        columns = sorted({column for column, _ in self.FACETS.values()})
+        if changed is not None and not any(column in changed for column in columns):
+            return {}
+        
+        select_list = ', '.join(f'"{column}"' for column in columns)
+        snapshot = {}
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            chunk = ids[start:start + BULK_BATCH_SIZE]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = conn.execute(f'SELECT id, {select_list} FROM {self.table_name} '
+                                f'WHERE id IN ({placeholders})', tuple(chunk)).fetchall()
+            for row in rows:
+                snapshot[row['id']] = facet_values(row, self.FACETS)
+        return snapshot
+    
+    def _update_facets(self, conn, before, ids):
+        """按写入前的取值before和ids的当前取值更新筛选项计数（在调用方的事务中执行）"""
+        if not self.FACETS:
+            return
+        apply_facet_changes(conn, self.ITEM_TYPE, before, self._facet_snapshot(conn, ids))
+    
+    @cached
+    def get_facets(self, names=None, filters=None):
+        """
+        获取筛选项的取值及条目数
+        
+        参数:
+        names (list): 筛选项名，默认为FACETS中的全部筛选项
+        filters (dict): 只统计符合筛选条件的条目（见build_filters）；为空时直接读取facet_counts表
+        
+        返回:
+        dict: 筛选项名 -> [{'value': 取值, 'count': 条目数}, ...]，按取值排序
+        
+        筛选项名或筛选条件无效时抛出ValueError
+        """
+        names = list(self.FACETS) if names is None else list(names)
+        for name in names:
+            if name not in self.FACETS:
+                raise ValueError(f"不支持的筛选项: {name}")
+        query = self.build_filters(filters)
+        facets = {name: [] for name in names}
+        if not names:
+            return facets
+        
+        conn = get_connection()
+        try:
+            if not query.conditions:
+                placeholders = ', '.join('?' for _ in names)
+                rows = conn.execute(f'SELECT facet, value, count FROM {FACET_TABLE} '
+                                    f'WHERE item_type = ? AND facet IN ({placeholders}) ORDER BY facet, value',
+                                    (self.ITEM_TYPE, *names)).fetchall()
+                for row in rows:
+                    facets[row['facet']].append({'value': row['value'], 'count': row['count']})
+                return facets
+            
+            # 有筛选条件时只统计匹配的条目
+            selected = {name: self.FACETS[name] for name in names}
+            columns = sorted({column for column, _ in selected.values()})
+            select_list = ', '.join(f'"{column}"' for column in columns)
+            where_clause, params = query.build()
+            cursor = conn.execute(f'SELECT {select_list} FROM {self.table_name} {where_clause}', tuple(params))
+            counts = {}
+            for row in cursor:
+                for key in facet_values(row, selected):
+                    counts[key] = counts.get(key, 0) + 1
+            for (name, value), count in sorted(counts.items()):
+                facets[name].append({'value': value, 'count': count})
+            return facets
+        except sqlite3.Error as e:
+            skip_cache()
+            logger.error("获取%s的筛选项失败: %s", self.table_name, e)
+            return {name: [] for name in names}
+        finally:
+            release_connection(conn)
+    
+    def rebuild_facet_counts(self):
+        """从原表重新统计筛选项计数（用于计数与数据不一致时，例如直接修改了数据库文件）"""
+        conn = get_connection()
+        try:
+            rebuild_facets(conn, self.table_name, self.ITEM_TYPE, self.FACETS)
+            self._commit(conn)
+            logger.info("已重新统计%s的筛选项计数", self.table_name)
+            return True
+        except Exception as e:
+            conn.rollback()
+            logger.error("重新统计%s的筛选项计数失败: %s", self.table_name, e)
+            return False
+        finally:
+            release_connection(conn)
     
+    @cached
     def count(self):
         """获取记录总数"""
-        conn = get_db_connection()
+        conn = get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(f'SELECT COUNT(*) as count FROM {self.table_name}')
             result = cursor.fetchone()
             return result['count'] if result else 0
         except Exception as e:
-            logger.error(f"获取{self.table_name}记录总数失败: {e}")
+            skip_cache()
+            logger.error("获取%s记录总数失败: %s", self.table_name, e)
             return 0
         finally:
-            conn.close() 
\ No newline at end of file
+            release_connection(conn) 
\ No newline at end of file
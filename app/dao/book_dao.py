@@ -1,145 +1,71 @@
 import logging
-from app.dao.base_dao import BaseDAO
-from app.database import get_db_connection
+from app.dao.base_dao import BaseDAO, DEFAULT_SEARCH_LIMIT
+from app.dao.query import EQUALS, STATUS, TAG, AT_LEAST, AT_MOST, YEAR_FROM, YEAR_TO, FLAG
+from app.database import get_connection, release_connection
 
 logger = logging.getLogger(__name__)
 
 class BookDAO(BaseDAO):
     """书籍数据访问对象"""
     
+    SORT_COLUMNS = ('created_at', 'updated_at', 'title', 'rating', 'author', 'publish_date')
+    FILTERS = {
+        'status': ('status', STATUS),
+        'tag': ('tags', TAG),
+        'author': ('author', EQUALS),
+        'year_min': ('publish_date', YEAR_FROM),
+        'year_max': ('publish_date', YEAR_TO),
+        'rating_min': ('rating', AT_LEAST),
+        'rating_max': ('rating', AT_MOST),
+        'is_owned': ('is_owned', FLAG),
+    }
+    ITEM_TYPE = 'book'
+    FACETS = {
+        'status': ('status', False),
+        'tag': ('tags', True),
+        'author': ('author', False),
+    }
+    
+    # 列表页：网格/列表/表格视图和书架需要的字段，不含简介和笔记
+    LIST_COLUMNS = ('title', 'author', 'status', 'rating', 'cover_url', 'tags', 'publish_date',
+                    'is_owned', 'created_at', 'updated_at')
+    # 首页卡片
+    CARD_COLUMNS = ('title', 'author', 'rating', 'cover_url', 'created_at')
+    
+    # 全文索引字段及bm25权重，search_pinyin为标题和人名的拼音
+    SEARCH_COLUMNS = ('title', 'author', 'isbn', 'publisher', 'tags', 'notes', 'search_pinyin')
+    SEARCH_WEIGHTS = (10, 5, 3, 1, 2, 1, 4)
+    PINYIN_COLUMNS = ('title', 'author')
+    
     def __init__(self):
         super().__init__('books')
     
-    def search_books(self, query):
-        """搜索书籍"""
-        search_fields = ['title', 'author', 'isbn', 'publisher', 'notes', 'tags']
-        return self.search(query, search_fields)
+    def search_books(self, query, limit=DEFAULT_SEARCH_LIMIT, offset=0, filters=None):
+        """全文搜索书籍，支持中文子串和拼音，按相关度排序"""
+        return self.search(query, limit, offset, filters=filters)
     
     def get_books_by_tag(self, tag):
         """根据标签获取书籍"""
-        conn = get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-            SELECT b.* FROM books b
-            JOIN item_tags it ON b.id = it.item_id
-            JOIN tags t ON it.tag_id = t.id
-            WHERE t.name = ? AND it.item_type = 'book'
-            ''', (tag,))
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        except Exception as e:
-            logger.error(f"获取标签为'{tag}'的书籍失败: {e}")
-            return []
-        finally:
-            conn.close()
+        return self.get_by_tag(tag)
     
     def get_books_by_status(self, status):
         """根据状态获取书籍"""
-        conn = get_db_connection()
+        conn = get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM books WHERE status = ?', (status,))
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            logger.error(f"获取状态为'{status}'的书籍失败: {e}")
-            return []
-        finally:
-            conn.close()
-    
-    def get_all_tags(self):
-        """获取所有书籍标签"""
-        conn = get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-            SELECT DISTINCT t.name, COUNT(it.item_id) as count
-            FROM tags t
-            JOIN item_tags it ON t.id = it.tag_id
-            WHERE it.item_type = 'book'
-            GROUP BY t.name
-            ORDER BY count DESC
-            ''')
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        except Exception as e:
-            logger.error(f"获取所有书籍标签失败: {e}")
+            logger.error("获取状态为'%s'的书籍失败: %s", status, e)
             return []
         finally:
-            conn.close()
+            release_connection(conn)
     
     def add_tag_to_book(self, book_id, tag_name):
         """为书籍添加标签"""
-        conn = get_db_connection()
-        try:
-            cursor = conn.cursor()
-            
-            # 确保标签存在
-            tag_id = tag_name.lower().replace(' ', '_')
-            cursor.execute('INSERT OR IGNORE INTO tags (id, name, type) VALUES (?, ?, ?)', 
-                         (tag_id, tag_name, 'book'))
-            
-            # 添加关联
-            cursor.execute('''
-            INSERT OR IGNORE INTO item_tags (item_id, tag_id, item_type)
-            VALUES (?, ?, ?)
-            ''', (book_id, tag_id, 'book'))
-            
-            # 更新书籍的tags字段
-            cursor.execute('SELECT tags FROM books WHERE id = ?', (book_id,))
-            result = cursor.fetchone()
-            if result:
-                current_tags = result['tags'].split(',') if result['tags'] else []
-                if tag_name not in current_tags:
-                    current_tags.append(tag_name)
-                    new_tags = ','.join(current_tags)
-                    cursor.execute('UPDATE books SET tags = ? WHERE id = ?', (new_tags, book_id))
-            
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"为书籍(ID={book_id})添加标签'{tag_name}'失败: {e}")
-            return False
-        finally:
-            conn.close()
+        return self.add_tag(book_id, tag_name)
     
     def remove_tag_from_book(self, book_id, tag_name):
         """从书籍移除标签"""
-        conn = get_db_connection()
-        try:
-            cursor = conn.cursor()
-            
-            # 获取标签ID
-            cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-            result = cursor.fetchone()
-            if not result:
-                return False
-                
-            tag_id = result['id']
-            
-            # 移除关联
-            cursor.execute('''
-            DELETE FROM item_tags 
-            WHERE item_id = ? AND tag_id = ? AND item_type = 'book'
-            ''', (book_id, tag_id))
-            
-            # 更新书籍的tags字段
-            cursor.execute('SELECT tags FROM books WHERE id = ?', (book_id,))
-            result = cursor.fetchone()
-            if result and result['tags']:
-                current_tags = result['tags'].split(',')
-                if tag_name in current_tags:
-                    current_tags.remove(tag_name)
-                    new_tags = ','.join(current_tags)
-                    cursor.execute('UPDATE books SET tags = ? WHERE id = ?', (new_tags, book_id))
-            
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"从书籍(ID={book_id})移除标签'{tag_name}'失败: {e}")
-            return False
-        finally:
-            conn.close() 
\ No newline at end of file
+        return self.remove_tag(book_id, tag_name)
@@ -0,0 +1,226 @@
+"""
+查询结果缓存
+
+DAO读取方法（get_all、get_page、get_facets、get_all_tags、count等）的结果按(数据库, 表, 方法, 参数)
+缓存在进程内存中，并记下计算时该表的代数（generation）。create、create_many、update、delete、
+add_tag/remove_tag以及重建索引和计数在提交写入时使表的代数加1，代数不一致的结果视为过期，
+写入后不会读到旧数据，也不需要逐个查询失效。
+
+缓存按最近最少使用（LRU）淘汰，结果的估算大小之和不超过内存预算，超过预算四分之一的结果不缓存。
+代数同时保存在数据库的cache_generations表中，与数据在同一事务内更新：配置query_cache.shared为true时，
+读取缓存前从该表读取代数，多个WSGI工作进程的写入都能使彼此的缓存失效；为false时只使用进程内的代数，
+适用于单进程部署。数据库文件被替换（连接池重置）后，之前缓存的结果不再使用。
+"""
+
+import sys
+import json
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from app import database
+from app.config import get_config
+from app.database import get_connection, release_connection
+
+logger = logging.getLogger(__name__)
+
+GENERATION_TABLE = 'cache_generations'
+
+# 默认内存预算（MB）
+DEFAULT_MAX_MB = 32
+
+# 当前线程正在计算的结果是否不应缓存（例如查询出错时返回的空结果）
+_state = threading.local()
+
+def skip_cache():
+    """标记当前正在计算的结果不缓存，在读取方法的异常处理中调用"""
+    _state.skip = True
+
+def bump_generation(conn, table):
+    """使表的代数加1并记录修改时间（在调用方的写入事务中执行）"""
+    conn.execute(f'INSERT INTO {GENERATION_TABLE} (name, generation, changed_at) VALUES (?, 1, CURRENT_TIMESTAMP) '
+                 f'ON CONFLICT (name) DO UPDATE SET generation = generation + 1, changed_at = CURRENT_TIMESTAMP',
+                 (table,))
+
+def get_table_versions(tables):
+    """
+    读取表的代数和最后修改时间（UTC，格式为YYYY-MM-DD HH:MM:SS），用于条件GET
+
+    返回:
+    dict: 表名 -> (代数, 最后修改时间)，没有记录的表为(0, None)
+    """
+    conn = get_connection()
+    try:
+        placeholders = ', '.join('?' for _ in tables)
+        rows = conn.execute(f'SELECT name, generation, changed_at FROM {GENERATION_TABLE} '
+                            f'WHERE name IN ({placeholders})', tuple(tables)).fetchall()
+    finally:
+        release_connection(conn)
+    versions = {table: (0, None) for table in tables}
+    versions.update({row['name']: (row['generation'], row['changed_at']) for row in rows})
+    return versions
+
+def estimate_size(value):
+    """粗略估算结果占用的内存（字节）"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+def clone(value):
+    """复制缓存的结果（列表、字典逐层复制，其余值不可变），调用方修改返回值不影响缓存"""
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(clone(item) for item in value)
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+class QueryCache:
+    """按表代数失效的LRU查询结果缓存"""
+
+    def __init__(self, enabled=True, max_mb=DEFAULT_MAX_MB, shared=False):
+        self._entries = OrderedDict()  # 键 -> (代数, 结果, 估算大小)
+        self._generations = {}  # (命名空间, 表) -> 进程内代数
+        self._lock = threading.Lock()
+        self.configure(enabled, max_mb, shared)
+
+    def configure(self, enabled=True, max_mb=DEFAULT_MAX_MB, shared=False):
+        """修改设置并清空缓存"""
+        self.enabled = bool(enabled)
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.shared = bool(shared)
+        self.clear()
+
+    def clear(self):
+        """清空缓存的结果和统计"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.stale = self.evictions = 0
+
+    def _namespace(self):
+        return database.DB_FILE, database.pool.generation
+
+    def generations(self, tables):
+        """表的当前代数"""
+        namespace = self._namespace()
+        if not self.shared:
+            return tuple(self._generations.get((namespace, table), 0) for table in tables)
+        conn = get_connection()
+        try:
+            placeholders = ', '.join('?' for _ in tables)
+            rows = conn.execute(f'SELECT name, generation FROM {GENERATION_TABLE} WHERE name IN ({placeholders})',
+                                tuple(tables)).fetchall()
+        finally:
+            release_connection(conn)
+        current = {row['name']: row['generation'] for row in rows}
+        return tuple(current.get(table, 0) for table in tables)
+
+    def table_changed(self, table):
+        """写入提交后使表的进程内代数加1"""
+        key = (self._namespace(), table)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get_or_compute(self, tables, name, params, compute):
+        """
+        读取缓存的结果，没有或已过期时调用compute计算并缓存
+
+        参数:
+        tables (tuple): 结果依赖的表，其中任一表被写入后结果过期
+        name (str): 查询名称
+        params: 查询参数（须可转换为JSON）
+        compute: 计算结果的函数
+        """
+        if not self.enabled:
+            return compute()
+
+        key = (self._namespace(), tables, name, json.dumps(params, sort_keys=True, ensure_ascii=False, default=repr))
+        # 先读取代数再计算，计算期间发生的写入会使本次结果在下次读取时过期
+        generation = self.generations(tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    value = entry[1]
+                else:
+                    del self._entries[key]
+                    self.bytes -= entry[2]
+                    self.stale += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+        if entry is not None:
+            return clone(value)
+
+        outer_skip = getattr(_state, 'skip', False)
+        _state.skip = False
+        try:
+            value = compute()
+            skipped = _state.skip
+        finally:
+            _state.skip = outer_skip or _state.skip
+        if skipped:
+            return value
+
+        size = estimate_size(value)
+        if size <= self.max_bytes // 4:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self.bytes -= previous[2]
+                self._entries[key] = (generation, value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.bytes -= evicted[2]
+                    self.evictions += 1
+        return clone(value)
+
+    def stats(self):
+        """命中率等统计（仅本进程）"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'shared': self.shared,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def configure_query_cache(enabled=None, max_mb=None, shared=None):
+    """按参数设置查询缓存，为None的参数从config.json的query_cache项读取"""
+    cache_config = get_config('query_cache') or {}
+    query_cache.configure(
+        cache_config.get('enabled', True) if enabled is None else enabled,
+        cache_config.get('max_mb', DEFAULT_MAX_MB) if max_mb is None else max_mb,
+        cache_config.get('shared', False) if shared is None else shared,
+    )
+
+def cached(method):
+    """DAO读取方法的装饰器：结果按(表, 方法, 参数)缓存，表被写入后过期"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return query_cache.get_or_compute((self.table_name,), f'{type(self).__name__}.{method.__name__}',
+                                          [args, kwargs], lambda: method(self, *args, **kwargs))
+    return wrapper
+
+# 全局查询缓存
+query_cache = QueryCache()
+configure_query_cache()
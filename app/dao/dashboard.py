@@ -0,0 +1,68 @@
+"""
+首页概览
+
+三类条目的最近记录和各状态的条目数在同一个连接中查询：最近记录按(created_at, id)索引倒序
+读取前几行；状态计数读取facet_counts表中由写入方法维护的status筛选项，再加上没有状态的
+条目数（按status索引查找），查询量与条目总数无关。
+"""
+
+import logging
+import sqlite3
+from app.database import get_connection, release_connection
+from app.dao.base_dao import DEFAULT_RECENT_LIMIT
+from app.dao.facets import FACET_TABLE
+from app.dao.cache import skip_cache
+from app.status import status_options
+
+logger = logging.getLogger(__name__)
+
+STATUS_FACET = 'status'
+
+def get_dashboard_summary(daos, limit=DEFAULT_RECENT_LIMIT):
+    """
+    获取首页概览
+
+    参数:
+    daos (dict): 条目类型 -> DAO，各DAO的FACETS须包含status
+    limit (int): 每类条目的最近记录数
+
+    返回:
+    dict: 条目类型 -> {'recent': 最近添加的记录（首页卡片字段）, 'total': 条目总数,
+                       'statuses': [{'value': 状态代码, 'label': 名称, 'count': 条目数}, ...]}
+    """
+    item_types = list(daos)
+    recent_queries = [dao.recent_query(limit) for dao in daos.values()]
+    # 各状态的计数和没有状态的条目数合并为一条查询
+    placeholders = ', '.join('?' for _ in item_types)
+    count_sql = ' UNION ALL '.join(
+        [f'SELECT item_type, value, count FROM {FACET_TABLE} WHERE item_type IN ({placeholders}) AND facet = ?'] +
+        [f"SELECT ?, NULL, COUNT(*) FROM {dao.table_name} WHERE status IS NULL OR status = ''"
+         for dao in daos.values()])
+    count_params = (*item_types, STATUS_FACET, *item_types)
+
+    recent = {item_type: [] for item_type in item_types}
+    counts = {item_type: {} for item_type in item_types}
+    totals = dict.fromkeys(item_types, 0)
+    conn = get_connection()
+    try:
+        for item_type, (sql, params) in zip(item_types, recent_queries):
+            recent[item_type] = [dict(row) for row in conn.execute(sql, params).fetchall()]
+        for row in conn.execute(count_sql, count_params).fetchall():
+            if row['value'] is not None:
+                counts[row['item_type']][row['value']] = row['count']
+            totals[row['item_type']] += row['count']
+    except sqlite3.Error as e:
+        skip_cache()
+        logger.error("获取首页概览失败: %s", e)
+    finally:
+        release_connection(conn)
+
+    return {
+        item_type: {
+            'recent': recent[item_type],
+            'total': totals[item_type],
+            'statuses': [dict(option, count=counts[item_type].get(option['value'], 0))
+                         for option in status_options(item_type)],
+        }
+        for item_type in item_types
+    }
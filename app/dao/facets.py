@@ -0,0 +1,83 @@
+"""
+筛选项计数（facet）
+
+筛选下拉框中的分类、作者、导演、演员、艺术家、专辑等取值及条目数保存在facet_counts表中，
+由DAO在写入时按增量维护（在同一个BEGIN IMMEDIATE写事务内比较写入前后的取值，
+快照与写入之间其他连接无法修改这些记录），列表页读取筛选项只需一次索引查询，
+不必每次请求都扫描整个库并拆分逗号分隔的字段。
+"""
+
+FACET_TABLE = 'facet_counts'
+
+def split_values(value, split):
+    """将字段值拆分为筛选项取值（去除空白和空值，去重）"""
+    if value is None:
+        return set()
+    if split:
+        return {item.strip() for item in str(value).split(',') if item.strip()}
+    text = str(value).strip()
+    return {text} if text else set()
+
+def facet_values(row, facets):
+    """
+    计算一行记录的筛选项取值
+
+    参数:
+    row: 记录（dict或sqlite3.Row）
+    facets (dict): 筛选项名 -> (字段, 是否按逗号拆分)
+
+    返回:
+    set: (筛选项名, 取值)的集合
+    """
+    values = set()
+    for name, (column, split) in facets.items():
+        values.update((name, value) for value in split_values(row[column], split))
+    return values
+
+def apply_facet_changes(conn, item_type, before, after):
+    """
+    按写入前后的取值更新计数（在调用方的事务中执行）
+
+    参数:
+    item_type (str): 条目类型（book、movie、music）
+    before (dict): 写入前 ID -> (筛选项名, 取值)集合，新建的记录不在其中
+    after (dict): 写入后 ID -> (筛选项名, 取值)集合，已删除的记录不在其中
+    """
+    deltas = {}
+    for id in set(before) | set(after):
+        old = before.get(id, set())
+        new = after.get(id, set())
+        for key in new - old:
+            deltas[key] = deltas.get(key, 0) + 1
+        for key in old - new:
+            deltas[key] = deltas.get(key, 0) - 1
+
+    changes = [(item_type, facet, value, delta) for (facet, value), delta in deltas.items() if delta]
+    if not changes:
+        return
+    conn.executemany(f'''
+    INSERT INTO {FACET_TABLE} (item_type, facet, value, count) VALUES (?, ?, ?, ?)
+    ON CONFLICT (item_type, facet, value) DO UPDATE SET count = count + excluded.count
+    ''', changes)
+    conn.execute(f'DELETE FROM {FACET_TABLE} WHERE item_type = ? AND count <= 0', (item_type,))
+
+def rebuild_facets(conn, table, item_type, facets, batch_size=1000):
+    """从原表重新统计某类条目的全部筛选项计数（在调用方的事务中执行）"""
+    conn.execute(f'DELETE FROM {FACET_TABLE} WHERE item_type = ?', (item_type,))
+    if not facets:
+        return
+
+    columns = sorted({column for column, _ in facets.values()})
+    select_list = ', '.join(f'"{column}"' for column in columns)
+    counts = {}
+    cursor = conn.execute(f'SELECT {select_list} FROM {table}')
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            for key in facet_values(row, facets):
+                counts[key] = counts.get(key, 0) + 1
+
+    conn.executemany(f'INSERT INTO {FACET_TABLE} (item_type, facet, value, count) VALUES (?, ?, ?, ?)',
+                     [(item_type, facet, value, count) for (facet, value), count in counts.items()])
@@ -0,0 +1,167 @@
+"""
+列表筛选条件构建器
+
+列表页和API的筛选条件（状态、标签/类型、作者/导演/艺术家、年份范围、评分范围、是否拥有）
+由DAO的FILTERS声明，经QueryBuilder编译为参数化的WHERE子句，筛选在数据库中完成，
+只返回匹配的当前页。
+"""
+
+from app.dao.tags import make_tag_id
+from app.status import status_code
+
+# 筛选条件类型
+EQUALS = 'equals'        # 等值，多个取值时为IN
+STATUS = 'status'        # 状态，取值可以是状态代码或中文名称，转换为状态代码后等值匹配
+CONTAINS = 'contains'    # 逗号分隔的多值字段（如genre）包含该值，多个取值时须全部包含
+TAG = 'tag'              # 条目在item_tags表中有该标签，多个取值时须全部包含
+AT_LEAST = 'at_least'    # 数值下限（含）
+AT_MOST = 'at_most'      # 数值上限（含）
+YEAR_FROM = 'year_from'  # 以年份开头的日期文本（如publish_date），不早于该年
+YEAR_TO = 'year_to'      # 以年份开头的日期文本，不晚于该年
+FLAG = 'flag'            # 布尔标记，取值1/0、true/false
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+def escape_like(text):
+    """转义LIKE模式中的通配符（配合ESCAPE '\\'使用）"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def as_list(value):
+    """将单个取值或取值列表统一为列表"""
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+class QueryBuilder:
+    """
+    组合查询条件，生成WHERE子句及其参数
+
+    每个方法添加一个条件，条件之间为AND关系；字段名加引号，取值全部作为参数传入。
+    """
+
+    def __init__(self, table_alias=None):
+        self.prefix = f'{table_alias}.' if table_alias else ''
+        self.conditions = []
+        self.params = []
+
+    def column(self, name):
+        """带表别名和引号的字段名（cast等字段名与SQL关键字冲突）"""
+        return f'{self.prefix}"{name}"'
+
+    def where(self, condition, *params):
+        """添加任意条件，condition中的?与params一一对应"""
+        self.conditions.append(condition)
+        self.params.extend(params)
+        return self
+
+    def equals(self, column, value):
+        """字段等于value，value为列表时等于其中任意一个"""
+        values = as_list(value)
+        if len(values) == 1:
+            return self.where(f'{self.column(column)} = ?', values[0])
+        placeholders = ', '.join('?' for _ in values)
+        return self.where(f'{self.column(column)} IN ({placeholders})', *values)
+
+    def contains(self, column, value):
+        """逗号分隔的多值字段包含value这一项（忽略逗号后的空格）"""
+        return self.where(f"(',' || REPLACE({self.column(column)}, ', ', ',') || ',') LIKE ? ESCAPE '\\'",
+                          f'%,{escape_like(str(value).strip())},%')
+
+    def tagged(self, item_type, name):
+        """条目在item_tags表中有名为name的标签（按(item_type, tag_id, item_id)索引查找）"""
+        name = str(name).strip()
+        return self.where(f"{self.column('id')} IN (SELECT item_id FROM item_tags WHERE item_type = ? AND "
+                          f"tag_id = COALESCE((SELECT id FROM tags WHERE name = ?), ?))",
+                          item_type, name, make_tag_id(name))
+
+    def at_least(self, column, value):
+        """字段不小于value"""
+        return self.where(f'{self.column(column)} >= ?', value)
+
+    def at_most(self, column, value):
+        """字段不大于value"""
+        return self.where(f'{self.column(column)} <= ?', value)
+
+    def build(self):
+        """返回(WHERE子句, 参数列表)，没有条件时WHERE子句为空字符串"""
+        if not self.conditions:
+            return '', []
+        return f"WHERE {' AND '.join(self.conditions)}", list(self.params)
+
+    def add_filter(self, kind, column, value, item_type=None):
+        """
+        按筛选条件类型添加条件
+
+        参数:
+        kind (str): 条件类型（EQUALS、STATUS、CONTAINS等）
+        column (str): 字段名
+        value: 查询参数中的取值，可以是列表
+        item_type (str): STATUS和TAG类型对应的条目类型
+
+        取值无法转换为所需类型时抛出ValueError
+        """
+        values = [v for v in as_list(value) if v is not None and str(v).strip() != '']
+        if not values:
+            return self
+
+        if kind == EQUALS:
+            return self.equals(column, values)
+        if kind == STATUS:
+            codes = []
+            for v in values:
+                code = status_code(item_type, v)
+                if code is None:
+                    raise ValueError(f"无效的状态: {v}")
+                if code not in codes:
+                    codes.append(code)
+            return self.equals(column, codes)
+        if kind == CONTAINS:
+            for v in values:
+                self.contains(column, v)
+            return self
+        if kind == TAG:
+            for v in values:
+                self.tagged(item_type, v)
+            return self
+        if kind == FLAG:
+            return self.equals(column, parse_flag(values[-1]))
+        if kind == AT_LEAST:
+            return self.at_least(column, parse_number(values[-1]))
+        if kind == AT_MOST:
+            return self.at_most(column, parse_number(values[-1]))
+        if kind == YEAR_FROM:
+            # 日期文本以4位年份开头，按字符串比较可以使用索引
+            return self.at_least(column, str(parse_year(values[-1])))
+        if kind == YEAR_TO:
+            return self.where(f'{self.column(column)} < ?', str(parse_year(values[-1]) + 1))
+        raise ValueError(f"未知的筛选条件类型: {kind}")
+
+def parse_number(value):
+    """将查询参数转换为数值"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的数值: {value}")
+    return int(number) if number.is_integer() else number
+
+def parse_year(value):
+    """将查询参数转换为4位年份"""
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的年份: {value}")
+    if not 1000 <= year <= 9999:
+        raise ValueError(f"无效的年份: {value}")
+    return year
+
+def parse_flag(value):
+    """将查询参数转换为0或1"""
+    if isinstance(value, bool):
+        return int(value)
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return 1
+    if text in FALSE_VALUES:
+        return 0
+    raise ValueError(f"无效的布尔值: {value}")
@@ -0,0 +1,81 @@
+"""
+条目标签
+
+标签以item_tags表（条目与tags表的关联）为准，DAO在每次写入tags字段时于同一事务中同步关联，
+按标签筛选和标签云只需查询(item_type, tag_id, item_id)索引。条目表的tags字段保留为
+', '分隔的规范化文本，供列表显示和全文索引使用，不再作为筛选的依据。
+"""
+
+TAG_COLUMN = 'tags'
+
+# 每条IN查询的最大取值数
+CHUNK_SIZE = 500
+
+def split_tags(value):
+    """将逗号分隔的文本或标签列表拆分为标签列表（去除空白和空值，去重并保持原有顺序）"""
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple, set)) else str(value).split(',')
+    tags = []
+    for item in items:
+        tag = str(item).strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def join_tags(tags):
+    """将标签列表转换为tags字段的规范化文本"""
+    return ', '.join(tags)
+
+def make_tag_id(name):
+    """由标签名生成tags表的ID（与历史数据的生成方式一致）"""
+    return name.lower().replace(' ', '_')
+
+def resolve_tag_ids(conn, item_type, names):
+    """
+    确保标签存在于tags表中，返回 标签名 -> 标签ID（在调用方的事务中执行）
+
+    同名标签已存在时沿用原有ID；ID与其他标签名冲突（如大小写不同）时并入已有的标签。
+    """
+    if not names:
+        return {}
+    conn.executemany('INSERT OR IGNORE INTO tags (id, name, type) VALUES (?, ?, ?)',
+                     [(make_tag_id(name), name, item_type) for name in names])
+    tag_ids = {}
+    for start in range(0, len(names), CHUNK_SIZE):
+        chunk = names[start:start + CHUNK_SIZE]
+        placeholders = ', '.join('?' for _ in chunk)
+        rows = conn.execute(f'SELECT id, name FROM tags WHERE name IN ({placeholders})', tuple(chunk)).fetchall()
+        tag_ids.update({row['name']: row['id'] for row in rows})
+    return {name: tag_ids.get(name, make_tag_id(name)) for name in names}
+
+def sync_item_tags(conn, table, item_type, ids):
+    """
+    按记录当前的tags字段重写其item_tags关联（在调用方的事务中执行）
+
+    参数:
+    table (str): 条目表名
+    item_type (str): 条目类型（book、movie、music）
+    ids (list): 条目ID，不存在的条目（如已删除）的关联被清除
+    """
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = list(ids[start:start + CHUNK_SIZE])
+        placeholders = ', '.join('?' for _ in chunk)
+        rows = conn.execute(f'SELECT id, {TAG_COLUMN} FROM {table} WHERE id IN ({placeholders})',
+                            tuple(chunk)).fetchall()
+        wanted_names = {row['id']: split_tags(row[TAG_COLUMN]) for row in rows}
+        all_names = list(dict.fromkeys(name for names in wanted_names.values() for name in names))
+        tag_ids = resolve_tag_ids(conn, item_type, all_names)
+        wanted = {(id, tag_ids[name]) for id, names in wanted_names.items() for name in names}
+
+        current = {(row['item_id'], row['tag_id']) for row in conn.execute(
+            f'SELECT item_id, tag_id FROM item_tags WHERE item_type = ? AND item_id IN ({placeholders})',
+            (item_type, *chunk)).fetchall()}
+        removed = current - wanted
+        added = wanted - current
+        if removed:
+            conn.executemany('DELETE FROM item_tags WHERE item_id = ? AND tag_id = ? AND item_type = ?',
+                             [(id, tag_id, item_type) for id, tag_id in removed])
+        if added:
+            conn.executemany('INSERT INTO item_tags (item_id, tag_id, item_type) VALUES (?, ?, ?)',
+                             [(id, tag_id, item_type) for id, tag_id in added])
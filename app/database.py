@@ -1,7 +1,13 @@
 import os
+import time
+import uuid
+import queue
 import sqlite3
 import logging
+import threading
 from pathlib import Path
+from flask import g, has_app_context
+from app.config import get_config
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -13,182 +19,241 @@ DB_FILE = os.path.join(DB_DIR, 'media_manager.db')
 # 确保数据目录存在
 os.makedirs(DB_DIR, exist_ok=True)
 
+# 存储配置档案，每个新连接建立时按顺序应用这些PRAGMA
+STORAGE_PROFILES = {
+    # SQLite默认设置：回滚日志、synchronous=FULL、无mmap、无忙等待
+    'default': {},
+    # 生产环境：WAL日志使读写互不阻塞，忙等待避免并发写入时报"database is locked"
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # 负数表示KB，即约64MB页缓存
+        'mmap_size': 268435456,  # 256MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # 毫秒
+        'foreign_keys': 'ON',
+    },
+}
+
+DEFAULT_STORAGE_PROFILE = 'production'
+
+# 当前生效的PRAGMA，首次建立连接时从配置文件加载
+_storage_pragmas = None
+
+def configure_storage(profile=None, overrides=None):
+    """
+    设置存储配置档案
+    
+    参数:
+    profile (str): 档案名称，为None时从config.json的database.profile读取
+    overrides (dict): 覆盖档案中的单项PRAGMA，为None时从config.json的database.pragmas读取
+    """
+    global _storage_pragmas
+    
+    if profile is None or overrides is None:
+        db_config = get_config('database') or {}
+        if profile is None:
+            profile = db_config.get('profile', DEFAULT_STORAGE_PROFILE)
+        if overrides is None:
+            overrides = db_config.get('pragmas') or {}
+    
+    if profile not in STORAGE_PROFILES:
+        logger.warning("未知的存储配置档案: %s，使用默认档案: %s", profile, DEFAULT_STORAGE_PROFILE)
+        profile = DEFAULT_STORAGE_PROFILE
+    
+    pragmas = dict(STORAGE_PROFILES[profile])
+    pragmas.update(overrides)
+    _storage_pragmas = pragmas
+    logger.info("数据库存储配置档案: %s, PRAGMA: %s", profile, pragmas)
+    
+    # 已打开的连接使用的是旧设置
+    reset_pool()
+
+def get_storage_pragmas():
+    """获取当前生效的PRAGMA设置"""
+    if _storage_pragmas is None:
+        configure_storage()
+    return _storage_pragmas
+
+def apply_pragmas(conn, pragmas):
+    """在连接上应用PRAGMA设置"""
+    for name, value in pragmas.items():
+        if not str(name).replace('_', '').isalnum() or not str(value).lstrip('-').isalnum():
+            logger.warning("忽略无效的PRAGMA设置: %s=%s", name, value)
+            continue
+        conn.execute(f'PRAGMA {name} = {value}')
+
+# 检查点因其他连接正在读写而未完成时的重试次数和间隔（秒）
+CHECKPOINT_RETRIES = 5
+CHECKPOINT_RETRY_INTERVAL = 0.2
+
+def checkpoint(retries=CHECKPOINT_RETRIES, interval=CHECKPOINT_RETRY_INTERVAL):
+    """
+    将WAL日志中的内容全部写回数据库文件并清空日志，在替换数据库文件前调用
+    
+    wal_checkpoint返回的busy为1表示有其他连接正在读写，日志没有全部写回；
+    重试retries次后仍未完成时抛出sqlite3.OperationalError
+    """
+    conn = get_db_connection()
+    try:
+        for attempt in range(retries + 1):
+            busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+            if not busy:
+                return
+            logger.warning("WAL检查点未完成（第%s次）: 日志%s页，已写回%s页", attempt + 1, log_frames, checkpointed)
+            if attempt < retries:
+                time.sleep(interval)
+        raise sqlite3.OperationalError("WAL检查点未完成: 有其他连接正在使用数据库")
+    finally:
+        conn.close()
+
+def backup_database(path):
+    """用SQLite在线备份接口把数据库的一致快照（含WAL中尚未写回的内容）写入path，不阻塞其他连接的读写"""
+    source = get_db_connection()
+    try:
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+# 连接池中保留的空闲连接数量，设为0表示不复用连接
+POOL_SIZE = 8
+
+class PooledConnection(sqlite3.Connection):
+    """可记录所属连接池代数的SQLite连接"""
+    pool_generation = 0
+
 def get_db_connection():
-    """获取数据库连接"""
-    conn = sqlite3.connect(DB_FILE)
+    """获取数据库连接（新建连接，调用方负责关闭）"""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, factory=PooledConnection)
     conn.row_factory = sqlite3.Row  # 使查询结果可通过列名访问
+    # INSERT OR REPLACE删除旧行时也要触发DELETE触发器，否则全文索引中会残留旧行
+    conn.execute('PRAGMA recursive_triggers = ON')
+    apply_pragmas(conn, get_storage_pragmas())
     return conn
 
-def init_db():
-    """初始化数据库，创建表结构"""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        
-        # 创建书籍表
-        cursor.execute('''\
-        CREATE TABLE IF NOT EXISTS books (
-            id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            author TEXT,
-            isbn TEXT,
-            publisher TEXT,
-            publish_date TEXT,
-            pages INTEGER,
-            status TEXT,
-            rating REAL,
-            notes TEXT,
-            description TEXT,
-            cover_url TEXT,
-            tags TEXT,
-            is_owned BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # 创建电影表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS movies (
-            id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            director TEXT,
-            cast TEXT,
-            year INTEGER,
-            genre TEXT,
-            status TEXT,
-            rating REAL,
-            notes TEXT,
-            poster_url TEXT,
-            tags TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # 创建音乐表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS music (
-            id TEXT PRIMARY KEY,
-            title TEXT NOT NULL,
-            artist TEXT,
-            album TEXT,
-            year INTEGER,
-            genre TEXT,
-            status TEXT,
-            rating REAL,
-            notes TEXT,
-            cover_url TEXT,
-            tags TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # 创建标签表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tags (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            type TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # 创建项目-标签关联表
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS item_tags (
-            item_id TEXT NOT NULL,
-            tag_id TEXT NOT NULL,
-            item_type TEXT NOT NULL,
-            PRIMARY KEY (item_id, tag_id, item_type),
-            FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
-        )
-        ''')
+class ConnectionPool:
+    """SQLite连接池，复用已打开的连接，避免每次查询都重新连接并预热页缓存"""
+    
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._generation = 0
+    
+    @property
+    def generation(self):
+        """连接池代数，每次重置（例如数据库文件被替换）后加1"""
+        return self._generation
+    
+    def acquire(self):
+        """从连接池借出一个连接，池中没有空闲连接时新建"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = get_db_connection()
+            conn.pool_generation = self._generation
+            return conn
+    
+    def release(self, conn):
+        """归还连接，未结束的事务会被回滚"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning("回滚归还的连接失败，关闭该连接: %s", e)
+            conn.close()
+            return
         
-        # 创建索引
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_title ON books (title)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_title ON movies (title)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_music_title ON music (title)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_name ON tags (name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_item_tags_item_id ON item_tags (item_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_item_tags_tag_id ON item_tags (tag_id)')
-        
-        conn.commit()
-        logger.info("数据库初始化成功")
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"数据库初始化失败: {e}")
-        raise
+        with self._lock:
+            reusable = (conn.pool_generation == self._generation
+                        and self._idle.qsize() < self.size)
+            if reusable:
+                self._idle.put_nowait(conn)
+        if not reusable:
+            conn.close()
+    
+    def reset(self):
+        """关闭所有空闲连接，已借出的连接在归还时关闭（例如数据库文件被替换后）"""
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+# 全局连接池
+pool = ConnectionPool()
+
+def get_connection():
+    """获取当前上下文使用的连接：Flask请求内共用同一连接，请求外从连接池借出"""
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = g._db_conn = pool.acquire()
+        return conn
+    return pool.acquire()
+
+def release_connection(conn):
+    """释放通过get_connection获取的连接，请求绑定的连接在请求结束时统一归还"""
+    if has_app_context() and g.get('_db_conn') is conn:
+        return
+    pool.release(conn)
+
+def close_request_connection(exception=None):
+    """请求结束时归还绑定到请求的连接"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        pool.release(conn)
+
+def reset_pool():
+    """重置连接池"""
+    pool.reset()
+
+def database_identity():
+    """
+    数据库的标识，用于ETag等缓存验证器区分不同的数据库
+
+    返回:
+    tuple: (实例标识, 数据库文件的inode)。实例标识保存在database_info表中，恢复备份后重新生成；
+           inode在数据库文件被替换（例如移动新文件覆盖）后改变
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT value FROM database_info WHERE key = 'instance_id'").fetchone()
     finally:
-        conn.close()
+        release_connection(conn)
+    try:
+        inode = os.stat(DB_FILE).st_ino
+    except OSError:
+        inode = None
+    return (row['value'] if row else None, inode)
 
-def update_db_schema():
-    """更新数据库表结构，添加缺失的字段"""
+def renew_instance_id():
+    """
+    重新生成数据库实例标识，在恢复备份等替换数据库内容后调用
+
+    恢复的数据库中各表的代数可能与之前的某个时刻相同，更换实例标识后客户端缓存的ETag不再匹配；
+    同时把各表的最后修改时间更新为当前时间，If-Modified-Since也不会返回304。
+    """
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        
-        # 检查books表是否缺少description字段
-        cursor.execute("PRAGMA table_info(books)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'description' not in columns:
-            logger.info("添加books表的description字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN description TEXT")
-        
-        # 检查books表是否缺少is_owned字段
-        if 'is_owned' not in columns:
-            logger.info("添加books表的is_owned字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN is_owned BOOLEAN DEFAULT 0")
-        
-        # 检查books表是否缺少series字段
-        if 'series' not in columns:
-            logger.info("添加books表的series字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN series TEXT")
-        
-        # 检查books表是否缺少translator字段
-        if 'translator' not in columns:
-            logger.info("添加books表的translator字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN translator TEXT")
-        
-        # 检查books表是否缺少totalPage字段（将使用pages字段）
-        if 'page_count' not in columns:
-            logger.info("添加books表的page_count字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN page_count INTEGER")
-        
-        # 检查books表是否缺少price字段
-        if 'price' not in columns:
-            logger.info("添加books表的price字段")
-            cursor.execute("ALTER TABLE books ADD COLUMN price TEXT")
-        
-        # 检查movies表是否缺少cast字段
-        cursor.execute("PRAGMA table_info(movies)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'cast' not in columns:
-            logger.info("添加movies表的cast字段")
-            cursor.execute("ALTER TABLE movies ADD COLUMN cast TEXT")
-        
-        # 检查music表是否缺少status字段
-        cursor.execute("PRAGMA table_info(music)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'status' not in columns:
-            logger.info("添加music表的status字段")
-            cursor.execute("ALTER TABLE music ADD COLUMN status TEXT")
-        
+        conn.execute("INSERT OR REPLACE INTO database_info (key, value) VALUES ('instance_id', ?)",
+                     (uuid.uuid4().hex,))
+        conn.execute('UPDATE cache_generations SET changed_at = CURRENT_TIMESTAMP')
         conn.commit()
-        logger.info("数据库表结构更新成功")
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"更新数据库表结构失败: {e}")
     finally:
         conn.close()
 
-# 在模块导入时初始化数据库
-if not os.path.exists(DB_FILE):
-    logger.info(f"数据库文件不存在，创建新数据库: {DB_FILE}")
-    init_db()
-else:
-    logger.info(f"数据库已存在: {DB_FILE}")
-    # 更新数据库表结构
-    update_db_schema()
-    # 可以在这里添加数据库版本检查和迁移逻辑 
\ No newline at end of file
+def init_app(app):
+    """注册请求结束时的连接回收"""
+    app.teardown_appcontext(close_request_connection)
+
+def init_db():
+    """初始化数据库，执行所有未应用的架构迁移（表结构定义见app/migrations.py）"""
+    from app.migrations import migrate
+    return migrate()
@@ -1,22 +1,47 @@
-import requests
-import json
 import logging
 import time
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
+from app.douban.http import get_session
+from app.douban.cache import http_cache, UncacheableResponse
+from app.douban.parser import (parse_info, info_text, info_people, extract_json_ld, make_soup,
+                               PUBLISH_DATE_LABELS, ARTIST_LABELS)
 
 logger = logging.getLogger(__name__)
 
+# 正常页面必然包含的标记（搜索页的结果列表，详情页的#info或标题），
+# 缺少时多半是验证码、登录页或反爬提示页，不应写入缓存
+PAGE_MARKERS = {
+    'search': ('search_results_subjects', 'subject-item'),
+    'detail': ('id="info"', '<h1'),
+}
+
+def uncacheable_reason(kind, url, response):
+    """检查响应是否为kind类型的正常页面，不是时返回原因，是时返回None"""
+    host = urlsplit(url).hostname
+    for hop in [*response.history, response]:
+        if urlsplit(hop.url).hostname != host:
+            return f"跳转到了{hop.url}"
+    markers = PAGE_MARKERS.get(kind, ())
+    if markers and not any(marker in response.text for marker in markers):
+        return "页面缺少正常内容，可能是验证码或登录页"
+    return None
+
 class DoubanAPI:
     """豆瓣API客户端，用于获取豆瓣信息"""
     
-    def __init__(self, headers=None):
+    def __init__(self, headers=None, session=None, cache=None, parser=None):
         """
         初始化豆瓣API客户端
         
         Args:
             headers: 请求头，可包含Cookie等信息用于模拟登录状态
+            session: 发送请求的requests.Session，默认使用共享连接池中当前线程的Session（见app/douban/http.py）
+            cache: 响应缓存（HttpCache），默认使用全局的豆瓣响应缓存（见app/douban/cache.py）
+            parser: 页面解析方式（html.parser、lxml或partial），默认使用配置的解析方式（见app/douban/parser.py）
         """
+        self.session = session
+        self.cache = cache or http_cache
+        self.parser = parser
         self.base_url = "https://m.douban.com/rexxar/api/v2"
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
@@ -30,6 +55,22 @@ class DoubanAPI:
             'Connection': 'keep-alive'
         }
     
+    def _get(self, url, params=None, headers=None, timeout=10):
+        """通过连接池发送GET请求"""
+        session = self.session or get_session()
+        return session.get(url, params=params, headers=headers or self.headers, timeout=timeout)
+    
+    def _fetch_text(self, kind, url, params=None, headers=None, timeout=10):
+        """获取页面内容，优先读取响应缓存；kind为search或detail，决定缓存有效期"""
+        def fetch():
+            response = self._get(url, params=params, headers=headers, timeout=timeout)
+            response.raise_for_status()
+            reason = uncacheable_reason(kind, url, response)
+            if reason:
+                raise UncacheableResponse(reason, response.text)
+            return response.text
+        return self.cache.fetch(kind, url, params, fetch)
+    
     def search(self, keyword, item_type="all", page=1, count=20):
         """
         搜索豆瓣内容
@@ -78,12 +119,11 @@ class DoubanAPI:
         }
         
         try:
-            logger.info(f"发送搜索请求: URL={url}, 参数={params}")
-            response = requests.get(url, params=params, headers=mobile_headers, timeout=15)
-            response.raise_for_status()
+            logger.debug("发送搜索请求: URL=%s, 参数=%s", url, params)
+            html = self._fetch_text('search', url, params=params, headers=mobile_headers, timeout=15)
             
             # 解析HTML响应
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = make_soup(html, 'search', self.parser)
             results = []
             
             # 查找搜索结果 - 移动版网站使用不同的HTML结构
@@ -98,11 +138,11 @@ class DoubanAPI:
                 search_items = soup.select(".search_results_subjects a")
             
             # 记录找到的项目数量
-            logger.info(f"找到 {len(search_items)} 个搜索结果项")
+            logger.debug("找到 %s 个搜索结果项", len(search_items))
             
             # 如果没有找到任何结果，记录页面内容以便调试
-            if not search_items:
-                logger.debug(f"页面内容: {soup.prettify()[:1000]}...")
+            if not search_items and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("页面内容: %s...", html[:1000])
             
             for item in search_items:
                 try:
@@ -222,7 +262,7 @@ class DoubanAPI:
                     }
                     
                     # 记录提取的结果
-                    logger.debug(f"提取的结果: {result}")
+                    logger.debug("提取的结果: %s", result)
                     
                     # 根据item_type过滤结果
                     if item_type != "all":
@@ -235,13 +275,13 @@ class DoubanAPI:
                     
                     results.append(result)
                 except Exception as e:
-                    logger.error(f"解析搜索结果项失败: {e}")
+                    logger.error("解析搜索结果项失败: %s", e)
                     continue
             
-            logger.info(f"搜索成功，找到{len(results)}个结果")
+            logger.info("搜索成功，找到%s个结果", len(results))
             return results
         except Exception as e:
-            logger.error(f"搜索豆瓣内容失败: {e}")
+            logger.error("搜索豆瓣内容失败: %s", e)
             return []
     
     def get_movie_detail(self, movie_id):
@@ -262,20 +302,12 @@ class DoubanAPI:
         url = f"https://movie.douban.com/subject/{movie_id}/"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
+            html = self._fetch_text('detail', url)
             
-            # 尝试解析JSON-LD数据
-            json_ld = None
-            for script in soup.find_all("script", {"type": "application/ld+json"}):
-                try:
-                    json_ld = json.loads(script.string)
-                    break
-                except Exception as e:
-                    logger.warning(f"解析JSON-LD数据失败: {e}")
-                    continue
+            # JSON-LD直接从HTML中截取；#info中的字段只能从DOM读取，所以详情页总要构建DOM
+            # （partial方式只构建详情方法读取的元素，见app/douban/parser.py）
+            json_ld = extract_json_ld(html)
+            soup = make_soup(html, 'detail', self.parser)
             
             # 初始化电影信息字典
             movie = {
@@ -297,7 +329,7 @@ class DoubanAPI:
             
             # 如果成功解析了JSON-LD数据，优先使用它
             if json_ld:
-                logger.info(f"成功解析电影(ID={movie_id})的JSON-LD数据")
+                logger.debug("成功解析电影(ID=%s)的JSON-LD数据", movie_id)
             
                 # 提取电影信息
                 movie.update({
@@ -314,7 +346,7 @@ class DoubanAPI:
                 if json_ld.get("datePublished") and isinstance(json_ld.get("datePublished"), str):
                     movie["year"] = json_ld.get("datePublished", "")[:4]
             else:
-                logger.warning(f"无法解析电影(ID={movie_id})的JSON-LD数据，尝试使用备用方法解析")
+                logger.warning("无法解析电影(ID=%s)的JSON-LD数据，尝试使用备用方法解析", movie_id)
             
             # 无论是否有JSON-LD数据，都尝试从HTML中提取更多信息
             # 这样可以补充JSON-LD中缺失的信息，或者在JSON-LD不可用时作为备用
@@ -380,11 +412,12 @@ class DoubanAPI:
                     if cover_elem:
                         movie["cover_url"] = cover_elem.get("src", "")
             
-            # 提取其他信息
-            movie["country"] = self._get_info_item(soup, "制片国家/地区")
-            movie["language"] = self._get_info_item(soup, "语言")
-            movie["duration"] = self._get_info_item(soup, "片长")
-            movie["imdb"] = self._get_info_item(soup, "IMDb")
+            # 提取其他信息（遍历一次信息栏）
+            info = parse_info(soup)
+            movie["country"] = info_text(info, "制片国家/地区")
+            movie["language"] = info_text(info, "语言")
+            movie["duration"] = info_text(info, "片长")
+            movie["imdb"] = info_text(info, "IMDb")
             
             # 确保导演和演员是字符串，而不是列表
             if movie["director"] and isinstance(movie["director"], list):
@@ -398,11 +431,11 @@ class DoubanAPI:
                 movie["genre"] = ",".join([g.strip() for g in movie["genre"] if g.strip()])
             
             # 记录提取的信息
-            logger.info(f"成功提取电影(ID={movie_id})信息: 标题={movie['title']}, 导演={movie['director']}")
+            logger.info("成功提取电影(ID=%s)信息: 标题=%s, 导演=%s", movie_id, movie['title'], movie['director'])
             
             return movie
         except Exception as e:
-            logger.error(f"获取电影(ID={movie_id})详情失败: {e}")
+            logger.error("获取电影(ID=%s)详情失败: %s", movie_id, e)
             return None
     
     def get_book_detail(self, book_id):
@@ -423,20 +456,12 @@ class DoubanAPI:
         url = f"https://book.douban.com/subject/{book_id}/"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            html = self._fetch_text('detail', url)
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # 尝试解析JSON-LD数据
-            json_ld = None
-            for script in soup.find_all("script", {"type": "application/ld+json"}):
-                try:
-                    json_ld = json.loads(script.string)
-                    break
-                except Exception as e:
-                    logger.warning(f"解析图书JSON-LD数据失败: {e}")
-                    continue
+            # JSON-LD直接从HTML中截取；#info中的字段只能从DOM读取，所以详情页总要构建DOM
+            # （partial方式只构建详情方法读取的元素，见app/douban/parser.py）
+            json_ld = extract_json_ld(html)
+            soup = make_soup(html, 'detail', self.parser)
             
             # 初始化图书信息字典
             book = {
@@ -462,7 +487,7 @@ class DoubanAPI:
             
             # 如果成功解析了JSON-LD数据，优先使用它
             if json_ld:
-                logger.info(f"成功解析图书(ID={book_id})的JSON-LD数据")
+                logger.debug("成功解析图书(ID=%s)的JSON-LD数据", book_id)
             
                 # 提取图书信息
                 if isinstance(json_ld, dict):
@@ -493,7 +518,7 @@ class DoubanAPI:
                     if "isbn" in json_ld:
                         book["isbn"] = json_ld["isbn"]
             else:
-                logger.warning(f"无法解析图书(ID={book_id})的JSON-LD数据，尝试使用备用方法解析")
+                logger.warning("无法解析图书(ID=%s)的JSON-LD数据，尝试使用备用方法解析", book_id)
             
             # 无论是否有JSON-LD数据，都尝试从HTML中提取更多信息
             # 这样可以补充JSON-LD中缺失的信息，或者在JSON-LD不可用时作为备用
@@ -504,39 +529,36 @@ class DoubanAPI:
                 if title_elem:
                     book["title"] = title_elem.text.strip()
             
-            # 获取信息区域文本
-            info_text = ""
-            info = soup.find("div", id="info")
-            if info:
-                info_text = info.text.strip()
+            # 遍历一次信息栏，以下字段都从中读取
+            info = parse_info(soup)
             
-            # 解析作者和译者使用专门的方法
+            # 解析作者和译者（去掉国籍标识）
             if not book["author"]:
-                book["author"] = self._get_author_or_translator(soup, "作者")
+                book["author"] = info_people(info, "作者")
             
-            book["translator"] = self._get_author_or_translator(soup, "译者")
+            book["translator"] = info_people(info, "译者")
             
             # 解析丛书
-            book["series"] = self._get_info_item(soup, "丛书")
+            book["series"] = info_text(info, "丛书")
             
             # 解析出版社
             if not book["publisher"]:
-                book["publisher"] = self._get_info_item(soup, "出版社")
+                book["publisher"] = info_text(info, "出版社")
             
             # 解析出版年份
             if not book["publish_date"]:
-                book["publish_date"] = self._get_info_item(soup, "出版年")
-                logger.info(f"从豆瓣提取出版年份: {book['publish_date']}")
+                book["publish_date"] = info_text(info, *PUBLISH_DATE_LABELS)
+                logger.debug("从豆瓣提取出版年份: %s", book['publish_date'])
             
             # 解析页数
-            book["total_page"] = self._get_info_item(soup, "页数")
+            book["total_page"] = info_text(info, "页数")
             
             # 解析定价
-            book["price"] = self._get_info_item(soup, "定价")
+            book["price"] = info_text(info, "定价")
             
             # 解析ISBN
             if not book["isbn"]:
-                book["isbn"] = self._get_info_item(soup, "ISBN")
+                book["isbn"] = info_text(info, "ISBN")
             
             # 获取评分（如果JSON-LD中没有）
             if not book["score"]:
@@ -598,11 +620,11 @@ class DoubanAPI:
                 book["tags"] = ",".join(book["tags"])
             
             # 记录提取的信息
-            logger.info(f"成功提取图书(ID={book_id})信息: 标题={book['title']}, 作者={book['author']}")
+            logger.info("成功提取图书(ID=%s)信息: 标题=%s, 作者=%s", book_id, book['title'], book['author'])
             
             return book
         except Exception as e:
-            logger.error(f"获取图书(ID={book_id})详情失败: {e}")
+            logger.error("获取图书(ID=%s)详情失败: %s", book_id, e)
             return None
     
     def get_music_detail(self, music_id):
@@ -623,20 +645,12 @@ class DoubanAPI:
         url = f"https://music.douban.com/subject/{music_id}/"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
+            html = self._fetch_text('detail', url)
             
-            # 尝试解析JSON-LD数据
-            json_ld = None
-            for script in soup.find_all("script", {"type": "application/ld+json"}):
-                try:
-                    json_ld = json.loads(script.string)
-                    break
-                except Exception as e:
-                    logger.warning(f"解析音乐JSON-LD数据失败: {e}")
-                    continue
+            # JSON-LD直接从HTML中截取；#info中的字段只能从DOM读取，所以详情页总要构建DOM
+            # （partial方式只构建详情方法读取的元素，见app/douban/parser.py）
+            json_ld = extract_json_ld(html)
+            soup = make_soup(html, 'detail', self.parser)
             
             # 初始化音乐信息字典
             music = {
@@ -656,7 +670,7 @@ class DoubanAPI:
             
             # 如果成功解析了JSON-LD数据，优先使用它
             if json_ld:
-                logger.info(f"成功解析音乐(ID={music_id})的JSON-LD数据")
+                logger.debug("成功解析音乐(ID=%s)的JSON-LD数据", music_id)
             
                 # 提取音乐信息
                 if isinstance(json_ld, dict):
@@ -675,7 +689,7 @@ class DoubanAPI:
                     if "byArtist" in json_ld and isinstance(json_ld["byArtist"], dict):
                         music["artist"] = json_ld["byArtist"].get("name", "")
             else:
-                logger.warning(f"无法解析音乐(ID={music_id})的JSON-LD数据，尝试使用备用方法解析")
+                logger.warning("无法解析音乐(ID=%s)的JSON-LD数据，尝试使用备用方法解析", music_id)
             
             # 无论是否有JSON-LD数据，都尝试从HTML中提取更多信息
             # 这样可以补充JSON-LD中缺失的信息，或者在JSON-LD不可用时作为备用
@@ -689,9 +703,12 @@ class DoubanAPI:
             else:
                 music["album"] = music["title"]  # 确保专辑名存在
             
+            # 遍历一次信息栏，艺术家、发行年份等字段都从中读取
+            info = parse_info(soup)
+            
             # 提取艺术家（如果JSON-LD中没有）
             if not music["artist"]:
-                music["artist"] = self._get_music_artist(soup)
+                music["artist"] = self._get_music_artist(soup, info)
             
             # 使用特殊处理映射
             special_artists = {
@@ -715,7 +732,7 @@ class DoubanAPI:
             # 如果还没有找到艺术家，并且ID在特殊映射中，使用映射的艺术家
             if (not music["artist"] or music["artist"] == "") and music_id in special_artists:
                 music["artist"] = special_artists[music_id]
-                logger.info(f"使用特殊映射设置艺术家: {music['artist']}")
+                logger.debug("使用特殊映射设置艺术家: %s", music['artist'])
                 
             # 特殊处理：如果标题包含特定艺术家的专辑名，则设置对应的艺术家
             if not music["artist"] or music["artist"] == "":
@@ -746,7 +763,7 @@ class DoubanAPI:
                 for album_name, artist_name in title_artist_map.items():
                     if album_name in music["title"]:
                         music["artist"] = artist_name
-                        logger.info(f"根据专辑名设置艺术家: {music['artist']}")
+                        logger.debug("根据专辑名设置艺术家: %s", music['artist'])
                         break
             
             # 尝试从描述中提取艺术家信息
@@ -759,7 +776,7 @@ class DoubanAPI:
                             parts = first_line.split(separator)
                             if len(parts) > 0 and parts[0].strip():
                                 music["artist"] = parts[0].strip()
-                                logger.info(f"从描述中提取艺术家信息: {music['artist']}")
+                                logger.debug("从描述中提取艺术家信息: %s", music['artist'])
                                 break
             
             # 提取简介（如果JSON-LD中没有）
@@ -792,33 +809,17 @@ class DoubanAPI:
                     if cover_elem:
                         music["cover_url"] = cover_elem.get("src", "")
             
-            # 提取其他信息
-            info_div = soup.find("div", {"id": "info"})
-            if info_div:
-                # 提取发行年份（如果JSON-LD中没有）
-                if not music["year"]:
-                    year_span = info_div.find("span", text=lambda t: t and "发行时间" in t)
-                    if year_span and year_span.next_sibling:
-                        year_text = year_span.next_sibling.strip()
-                        import re
-                        year_match = re.search(r'\d{4}', year_text)
-                        if year_match:
-                            music["year"] = year_match.group(0)
-                
-                # 提取流派
-                genre_span = info_div.find("span", text=lambda t: t and "流派" in t)
-                if genre_span and genre_span.next_sibling:
-                    music["genre"] = genre_span.next_sibling.strip()
-                
-                # 提取发行商
-                publisher_span = info_div.find("span", text=lambda t: t and "出版者" in t)
-                if publisher_span and publisher_span.next_sibling:
-                    music["publisher"] = publisher_span.next_sibling.strip()
-                
-                # 提取介质
-                medium_span = info_div.find("span", text=lambda t: t and "介质" in t)
-                if medium_span and medium_span.next_sibling:
-                    music["medium"] = medium_span.next_sibling.strip()
+            # 提取发行年份（如果JSON-LD中没有）
+            if not music["year"]:
+                import re
+                year_match = re.search(r'\d{4}', info_text(info, "发行时间"))
+                if year_match:
+                    music["year"] = year_match.group(0)
+            
+            # 提取流派、发行商和介质
+            music["genre"] = info_text(info, "流派")
+            music["publisher"] = info_text(info, "出版者")
+            music["medium"] = info_text(info, "介质")
             
             # 提取曲目列表
             tracks_div = soup.find("div", {"class": "track-list"})
@@ -827,11 +828,11 @@ class DoubanAPI:
                 music["tracks"] = [track.text.strip() for track in track_items]
             
             # 记录提取的信息
-            logger.info(f"成功提取音乐(ID={music_id})信息: 标题={music['title']}, 艺术家={music['artist']}")
+            logger.info("成功提取音乐(ID=%s)信息: 标题=%s, 艺术家=%s", music_id, music['title'], music['artist'])
             
             return music
         except Exception as e:
-            logger.error(f"获取音乐(ID={music_id})详情失败: {e}")
+            logger.error("获取音乐(ID=%s)详情失败: %s", music_id, e)
             return None
     
     def _match_type(self, result_type, item_type):
@@ -863,117 +864,21 @@ class DoubanAPI:
                 return parts[1].strip()
         return ""
     
-    def _get_info_item(self, soup, label):
-        """从信息栏提取特定标签的内容"""
-        info = soup.find("div", id="info")
-        if not info:
-            return ""
-        
-        span = info.find("span", text=lambda t: t and label in t)
-        if not span:
-            # 特殊处理出版年份，尝试多种可能的标签
-            if label == "出版年":
-                for alt_label in ["出版年份", "出版时间", "出版日期"]:
-                    span = info.find("span", text=lambda t: t and alt_label in t)
-                    if span:
-                        logger.info(f"找到替代标签: {alt_label}")
-                        break
-                if not span:
-                    logger.warning(f"未找到出版年份相关标签")
-                    return ""
-            else:
-                return ""
-        
-        content = span.next_sibling
-        if not content or not content.strip():
-            content = span.find_next_sibling()
-        
-        if content:
-            result = content.text.strip().replace("/", ",")
-            if label == "出版年":
-                logger.info(f"提取到的原始出版年份: {result}")
-            return result
-        return ""
-
-    def _get_author_or_translator(self, soup, label):
-        """专门用于提取作者或译者信息，因为这些字段在豆瓣HTML中有特殊结构"""
-        info = soup.find("div", id="info")
-        if not info:
-            return ""
-        
-        # 查找包含"作者:"或"译者:"的span
-        span = info.find("span", text=lambda t: t and label in t)
-        if not span:
-            return ""
-        
-        # 查找作者或译者链接
-        authors = []
-        # 查找span后面的所有a标签，直到下一个span
-        next_element = span.next_sibling
-        while next_element and not (next_element.name == "span" and next_element.text.strip()):
-            if next_element.name == "a":
-                authors.append(next_element.text.strip())
-            next_element = next_element.next_sibling
-        
-        # 如果没有找到链接，尝试查找文本内容
-        if not authors:
-            text_content = ""
-            next_element = span.next_sibling
-            while next_element and not (next_element.name == "span" and next_element.text.strip()):
-                if isinstance(next_element, str):
-                    text_content += next_element
-                elif next_element.name == "br":
-                    text_content += " "
-                next_element = next_element.next_sibling
-            
-            if text_content:
-                # 清理文本内容，移除特殊字符和多余空格
-                text_content = text_content.replace("[", "").replace("]", "").strip()
-                # 处理多行文本和国籍标识
-                text_content = ' '.join(line.strip() for line in text_content.split('\n'))
-                text_content = text_content.replace("(美)", "").replace("(英)", "").replace("(法)", "")
-                text_content = text_content.replace("（美）", "").replace("（英）", "").replace("（法）", "")
-                # 处理常见的国籍标识
-                text_content = text_content.replace("[美]", "").replace("[英]", "").replace("[法]", "")
-                text_content = text_content.replace("[美国]", "").replace("[英国]", "").replace("[法国]", "")
-                text_content = ' '.join(text_content.split())  # 规范化空格
-                if text_content:
-                    authors.append(text_content)
-        
-        # 清理每个作者名
-        cleaned_authors = []
-        for author in authors:
-            # 处理多行文本和国籍标识
-            author = ' '.join(line.strip() for line in author.split('\n'))
-            author = author.replace("(美)", "").replace("(英)", "").replace("(法)", "")
-            author = author.replace("（美）", "").replace("（英）", "").replace("（法）", "")
-            author = author.replace("[美]", "").replace("[英]", "").replace("[法]", "")
-            author = author.replace("[美国]", "").replace("[英国]", "").replace("[法国]", "")
-            author = ' '.join(author.split())  # 规范化空格
-            if author:
-                cleaned_authors.append(author)
+    def _get_music_artist(self, soup, info=None):
+        """
+        专门用于提取音乐艺术家信息
         
-        return ", ".join(cleaned_authors)
-
-    def _get_music_artist(self, soup):
-        """专门用于提取音乐艺术家信息"""
-        artist = ""
+        Args:
+            soup: 详情页的BeautifulSoup对象
+            info: 已解析的信息栏（parse_info的结果），为None时从soup解析
+        """
+        if info is None:
+            info = parse_info(soup)
         
-        # 方法1：直接从表演者标签提取
-        info = soup.find("div", id="info")
-        if info:
-            # 查找表演者标签
-            performer_span = info.find("span", text=lambda t: t and "表演者:" in t)
-            if performer_span:
-                # 查找表演者链接
-                performer_link = performer_span.find_next("a")
-                if performer_link:
-                    return performer_link.text.strip()
-                
-                # 如果没有链接，尝试获取文本内容
-                next_element = performer_span.next_sibling
-                if next_element and isinstance(next_element, str) and next_element.strip():
-                    return next_element.strip().replace("/", ",")
+        # 方法1：从信息栏的表演者等标签提取，多个艺术家用“, ”连接
+        artist = info_text(info, *ARTIST_LABELS, sep=", ")
+        if artist:
+            return artist
         
         # 方法2：从数据描述中提取
         data_desc = soup.find("a", attrs={"data-desc": True})
@@ -984,42 +889,6 @@ class DoubanAPI:
                 if len(parts) > 0 and parts[0].strip():
                     return parts[0].strip()
         
-        # 方法3：尝试从信息栏中提取
-        if info:
-            # 尝试表演者标签
-            for label in ["表演者", "艺术家", "歌手", "演唱者", "演奏者"]:
-                span = info.find("span", text=lambda t: t and label in t)
-                if span:
-                    # 查找span后面的所有a标签，收集艺术家名称
-                    artists = []
-                    next_element = span.next_sibling
-                    
-                    # 处理纯文本情况
-                    if next_element and isinstance(next_element, str) and next_element.strip():
-                        return next_element.strip().replace("/", ",")
-                    
-                    # 处理链接情况
-                    while next_element and not (isinstance(next_element, str) and ":" in next_element):
-                        if next_element.name == "a":
-                            artists.append(next_element.text.strip())
-                        next_element = next_element.next_sibling
-                        
-                    if artists:
-                        return ", ".join(artists)
-        
-        # 方法4：尝试从文本内容中提取
-        if info:
-            info_text = info.get_text()
-            for label in ["表演者:", "艺术家:", "歌手:", "演唱者:", "演奏者:"]:
-                if label in info_text:
-                    lines = info_text.split('\n')
-                    for line in lines:
-                        if label in line:
-                            parts = line.split(":", 1)
-                            if len(parts) > 1:
-                                artist = parts[1].strip()
-                                return artist
-        
         # 方法5：尝试从页面标题中提取（通常格式为"专辑名 - 艺术家"）
         title_tag = soup.find("title")
         if title_tag and " - " in title_tag.text:
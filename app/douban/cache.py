@@ -0,0 +1,254 @@
+"""
+豆瓣响应缓存
+
+搜索页和详情页的原始HTML保存在单独的SQLite文件（data/douban_cache.db，不参与WebDAV备份）中，
+键为规范化的URL加排序后的查询参数。同一条目的预览页、导入和重复搜索都直接读取本地缓存，
+不再重复请求豆瓣：
+
+- 每类请求（search、detail）有各自的有效期（ttl），过期后的一段时间（stale）内仍返回缓存内容，
+  同时在后台线程重新抓取（stale-while-revalidate），超过这段时间才同步请求豆瓣
+- 请求豆瓣失败时，若有过期的缓存内容则返回它
+- 抓取到的不是正常页面（跳转到其他主机、验证码或登录页，见UncacheableResponse）时不写入缓存，
+  有过期的缓存内容时返回它
+- 缓存内容的总大小不超过max_mb，超过时按最后访问时间淘汰（LRU）
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from app.config import get_config
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          'data', 'douban_cache.db')
+
+DEFAULT_MAX_MB = 64
+# 各类请求的有效期和过期后仍可返回的时间（秒）
+DEFAULT_TTL = {'search': 6 * 3600, 'detail': 7 * 86400}
+DEFAULT_STALE = {'search': 86400, 'detail': 30 * 86400}
+
+def cache_key(url, params=None):
+    """规范化的缓存键：协议和主机名小写，去掉片段，查询参数（含params）按名称排序"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((str(name), str(value)) for name, value in (params or {}).items())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/',
+                       urlencode(sorted(query)), ''))
+
+class UncacheableResponse(Exception):
+    """抓取成功但内容不应缓存（如跳转到验证码或登录页），body为抓取到的内容"""
+
+    def __init__(self, reason, body):
+        super().__init__(reason)
+        self.body = body
+
+class HttpCache:
+    """SQLite中的HTTP响应缓存，按最后访问时间淘汰"""
+
+    def __init__(self, path=CACHE_FILE, enabled=True, max_mb=DEFAULT_MAX_MB, ttl=None, stale=None):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.configure(enabled, max_mb, ttl, stale)
+
+    def configure(self, enabled=True, max_mb=DEFAULT_MAX_MB, ttl=None, stale=None):
+        """修改设置并清零统计（已缓存的内容保留）"""
+        self.enabled = bool(enabled)
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.stale = dict(DEFAULT_STALE, **(stale or {}))
+        self.hits = self.stale_hits = self.misses = self.revalidations = self.errors = self.evictions = 0
+        self.rejected = 0
+
+    def _connection(self):
+        """打开缓存数据库（调用方持有锁）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('PRAGMA busy_timeout = 5000')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """读取缓存内容并更新访问时间，返回(body, fetched_at)，没有时为None"""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('SELECT body, fetched_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+                conn.commit()
+        return row
+
+    def put(self, key, kind, body):
+        """保存响应内容，总大小超过上限时淘汰最久未访问的内容"""
+        size = len(body.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO responses (key, kind, body, size, fetched_at, accessed_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', (key, kind, body, size, now, now))
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            while total > self.max_bytes:
+                rows = conn.execute('SELECT key, size FROM responses WHERE key != ? ORDER BY accessed_at LIMIT 50',
+                                    (key,)).fetchall()
+                if not rows:
+                    break
+                for evicted, evicted_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute('DELETE FROM responses WHERE key = ?', (evicted,))
+                    total -= evicted_size
+                    self.evictions += 1
+            conn.commit()
+
+    def fetch(self, kind, url, params, fetcher):
+        """
+        读取缓存的响应，没有或已过期时调用fetcher抓取并缓存
+
+        参数:
+        kind (str): 请求类型（search或detail），决定有效期
+        url (str): 请求地址
+        params (dict): 查询参数
+        fetcher: 抓取响应内容的函数，失败时抛出异常，内容不应缓存时抛出UncacheableResponse
+        """
+        if not self.enabled:
+            try:
+                return fetcher()
+            except UncacheableResponse as e:
+                return e.body
+
+        key = cache_key(url, params)
+        try:
+            entry = self.get(key)
+        except sqlite3.Error as e:
+            logger.warning("读取豆瓣缓存失败: %s", e)
+            entry = None
+
+        if entry is not None:
+            body, fetched_at = entry
+            age = time.time() - fetched_at
+            if age <= self.ttl.get(kind, 0):
+                self.hits += 1
+                return body
+            if age <= self.ttl.get(kind, 0) + self.stale.get(kind, 0):
+                self.stale_hits += 1
+                self._revalidate(key, kind, fetcher)
+                return body
+
+        self.misses += 1
+        try:
+            body = fetcher()
+        except UncacheableResponse as e:
+            self.rejected += 1
+            if entry is None:
+                logger.warning("请求%s返回的页面不缓存: %s", url, e)
+                return e.body
+            logger.warning("请求%s返回的页面不缓存，使用过期的缓存: %s", url, e)
+            return entry[0]
+        except Exception as e:
+            if entry is None:
+                raise
+            self.errors += 1
+            logger.warning("请求%s失败，使用过期的缓存: %s", url, e)
+            return entry[0]
+        self._store(key, kind, body)
+        return body
+
+    def _store(self, key, kind, body):
+        try:
+            self.put(key, kind, body)
+        except sqlite3.Error as e:
+            logger.warning("保存豆瓣缓存失败: %s", e)
+
+    def _revalidate(self, key, kind, fetcher):
+        """在后台线程重新抓取，同一个键同时只有一个线程在抓取"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, kind, fetcher())
+                self.revalidations += 1
+            except Exception as e:
+                self.errors += 1
+                logger.warning("后台刷新豆瓣缓存失败: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='douban-cache-refresh', daemon=True).start()
+
+    def clear(self):
+        """删除全部缓存内容"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM responses')
+            conn.commit()
+
+    def close(self):
+        """关闭缓存数据库，下次使用时重新打开"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self):
+        """条目数、大小和命中统计（命中统计仅本进程）"""
+        try:
+            with self._lock:
+                entries, size = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        except sqlite3.Error as e:
+            logger.warning("读取豆瓣缓存统计失败: %s", e)
+            entries = size = 0
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'errors': self.errors,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+            'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+def configure_http_cache(enabled=None, max_mb=None):
+    """按参数设置豆瓣响应缓存，为None的参数以及有效期从config.json的douban.cache项读取"""
+    cache_config = (get_config('douban') or {}).get('cache') or {}
+    http_cache.configure(
+        cache_config.get('enabled', True) if enabled is None else enabled,
+        cache_config.get('max_mb', DEFAULT_MAX_MB) if max_mb is None else max_mb,
+        cache_config.get('ttl'),
+        cache_config.get('stale'),
+    )
+
+# 全局豆瓣响应缓存（首次使用时打开数据库文件）
+http_cache = HttpCache()
+configure_http_cache()
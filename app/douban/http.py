@@ -0,0 +1,89 @@
+"""
+豆瓣HTTP连接池
+
+搜索和详情页请求通过共享的连接池发送：同一主机（m.douban.com、movie.douban.com、book.douban.com、
+music.douban.com）的连接保持keep-alive并复用，不必每次请求都重新建立TCP和TLS连接。遇到429和5xx
+响应或连接错误时按指数退避自动重试，429响应带Retry-After时按其等待。
+
+urllib3的连接池是线程安全的；requests.Session的Cookie等状态不是，因此每个线程使用自己的Session，
+所有Session挂载同一个HTTPAdapter，共享同一组连接池。
+"""
+
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 每个主机保留的连接数（同时请求同一主机的线程数超过时，多出的连接用完即关闭）
+DEFAULT_POOL_SIZE = 10
+# 连接池数量，即同时保持连接的主机数
+POOL_HOSTS = 8
+# 重试次数和退避系数（第n次重试前等待backoff_factor * 2^(n-1)秒）
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def create_adapter(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR):
+    """创建带连接池和重试策略的HTTPAdapter"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        # 重试用尽后返回最后一次响应，由调用方的raise_for_status处理
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+
+def create_session(adapter=None):
+    """创建挂载adapter（默认新建）的Session"""
+    session = requests.Session()
+    adapter = adapter or create_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+def _configured_adapter(pool_size=None, retries=None, backoff_factor=None):
+    """按参数创建HTTPAdapter，为None的参数从config.json的douban项读取"""
+    douban_config = get_config('douban') or {}
+    return create_adapter(
+        douban_config.get('pool_size', DEFAULT_POOL_SIZE) if pool_size is None else pool_size,
+        douban_config.get('retries', DEFAULT_RETRIES) if retries is None else retries,
+        douban_config.get('backoff_factor', DEFAULT_BACKOFF_FACTOR) if backoff_factor is None else backoff_factor,
+    )
+
+def configure_http(pool_size=None, retries=None, backoff_factor=None):
+    """按参数重建共享的连接池（参数含义见_configured_adapter），旧连接池的连接被关闭"""
+    global _adapter
+    adapter = _configured_adapter(pool_size, retries, backoff_factor)
+    with _adapter_lock:
+        previous, _adapter = _adapter, adapter
+    if previous is not None:
+        previous.close()
+    return adapter
+
+def get_adapter():
+    """共享的HTTPAdapter，首次调用时按配置创建"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = _configured_adapter()
+    return _adapter
+
+def get_session():
+    """当前线程的Session，挂载共享的HTTPAdapter；连接池被重建后换用新的Session"""
+    adapter = get_adapter()
+    session = getattr(_local, 'session', None)
+    if session is None or session.get_adapter('https://') is not adapter:
+        session = _local.session = create_session(adapter)
+    return session
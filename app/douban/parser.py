@@ -0,0 +1,172 @@
+"""
+豆瓣页面解析
+
+详情页的大部分字段在application/ld+json脚本中：extract_json_ld直接从HTML中截取并解析，不依赖DOM。
+#info中的字段（国家、语言、出版社、曲目等）和JSON-LD中缺失的字段只能从DOM读取，所以详情页总要构建DOM，
+省下的时间来自解析方式；make_soup按配置的解析方式（douban.parser）构建DOM：
+- html.parser: 标准库解析器，最慢
+- lxml: C实现的解析器
+- partial（默认）: lxml加SoupStrainer，只构建详情方法会读取的元素（#info、曲目列表、标题、评分、
+  封面、简介、标签等），跳过导航、短评、推荐等页面的大部分内容
+未安装lxml时，lxml和partial使用html.parser。
+
+详情页的#info区块是一串“标签: 值”，每项以<br>结束：标签是<span class="pl">，值可以是文本、链接
+或带property属性的span，多个值用“/”分隔。parse_info只遍历一次#info，得到标签到值列表的字典，
+电影、图书、音乐详情的各个字段都从这个字典读取，不必每个字段重新搜索一次#info。
+"""
+
+import re
+import json
+import logging
+from bs4 import BeautifulSoup, SoupStrainer, Tag, Comment
+from app.config import get_config
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'partial')
+DEFAULT_BACKEND = 'partial'
+
+LD_JSON_RE = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+
+# partial方式保留的元素（匹配到的元素连同其全部子元素一起保留）
+DETAIL_IDS = {'info', 'mainpic', 'interest_sectl', 'interest_sect_level'}
+DETAIL_CLASSES = {'intro', 'track-list', 'tag', 'rating_num', 'nbg', 'all', 'song-singers'}
+SEARCH_CLASSES = {'search_results_subjects', 'subject-item'}
+
+# 出版年份在部分页面使用其他标签
+PUBLISH_DATE_LABELS = ("出版年", "出版年份", "出版时间", "出版日期")
+# 音乐的艺术家标签，按优先顺序
+ARTIST_LABELS = ("表演者", "艺术家", "歌手", "演唱者", "演奏者")
+# 标签与值之间的冒号（音乐页的表演者链接写在标签span里，标签取冒号之前的部分）
+LABEL_END_RE = re.compile(r'[:：]')
+# 作者、译者名字前的国籍标识
+NATIONALITY_MARKS = ("(美)", "(英)", "(法)", "（美）", "（英）", "（法）",
+                     "[美]", "[英]", "[法]", "[美国]", "[英国]", "[法国]")
+
+def _values(texts, links):
+    """一项的值：有链接时取链接文字，否则取文本按“/”分隔；空白规范化为单个空格"""
+    if not links:
+        links = ''.join(texts).lstrip().lstrip(':：').split('/')
+    return [' '.join(value.split()) for value in links if value.strip()]
+
+def parse_info(soup):
+    """
+    遍历一次#info区块
+
+    参数:
+    soup: 页面的BeautifulSoup对象（或包含#info的元素）
+
+    返回:
+    dict: {标签: [值, ...]}，标签为冒号之前的文字；同名标签保留第一个；没有#info时为空字典
+    """
+    info = soup.find("div", id="info")
+    fields = {}
+    if info is None:
+        return fields
+
+    label_tag = label = None
+    texts, links = [], []
+    for node in info.descendants:
+        if isinstance(node, Tag):
+            if node.name == 'br' or (node.name == 'span' and 'pl' in (node.get('class') or ())):
+                if label and label not in fields:
+                    fields[label] = _values(texts, links)
+                label_tag = label = None
+                texts, links = [], []
+                if node.name == 'span':
+                    label_tag = node
+                    label = LABEL_END_RE.split(node.get_text(), 1)[0].strip()
+            elif node.name == 'a' and label and not node.get('href', '').startswith('javascript'):
+                links.append(node.get_text())
+        elif label and not isinstance(node, Comment) and node.parent is not label_tag:
+            texts.append(str(node))
+    if label and label not in fields:
+        fields[label] = _values(texts, links)
+    return fields
+
+def info_text(info, *labels, sep=","):
+    """第一个有值的标签的值，多个值用sep连接；都没有时返回空字符串"""
+    for label in labels:
+        values = info.get(label)
+        if values:
+            return sep.join(values)
+    return ""
+
+def clean_person(name):
+    """去掉人名中的国籍标识并规范化空白"""
+    for mark in NATIONALITY_MARKS:
+        name = name.replace(mark, "")
+    return ' '.join(name.split())
+
+def info_people(info, label):
+    """作者、译者等人名列表，去掉国籍标识后用“, ”连接"""
+    return ", ".join(name for name in (clean_person(value) for value in info.get(label, ())) if name)
+
+def extract_json_ld(html):
+    """不构建DOM，从HTML中截取第一个能解析的JSON-LD对象；没有时返回None"""
+    for match in LD_JSON_RE.finditer(html):
+        try:
+            # 豆瓣的简介中可能有未转义的换行等控制字符
+            return json.loads(match.group(1), strict=False)
+        except ValueError as e:
+            logger.warning("解析JSON-LD数据失败: %s", e)
+    return None
+
+def _classes(attrs):
+    """SoupStrainer收到的是原始属性值，class还未拆分"""
+    return set(attrs.get('class', '').split())
+
+def _detail_part(name, attrs):
+    """详情页中详情方法会读取的元素"""
+    if name in ('h1', 'title') or attrs.get('id') in DETAIL_IDS or _classes(attrs) & DETAIL_CLASSES:
+        return True
+    if attrs.get('property', '').startswith('v:') or attrs.get('rel', '').startswith('v:'):
+        return True
+    if name == 'a':
+        return 'data-desc' in attrs or '/musician/' in attrs.get('href', '')
+    return name == 'meta' and attrs.get('name') == 'music:musician'
+
+def _search_part(name, attrs):
+    """搜索页中的搜索结果列表"""
+    return bool(_classes(attrs) & SEARCH_CLASSES)
+
+PAGE_PARTS = {
+    'search': _search_part,
+    'detail': _detail_part,
+}
+
+def make_soup(html, kind, backend=None):
+    """
+    按解析方式构建BeautifulSoup
+
+    参数:
+    html (str): 页面内容
+    kind (str): 页面类型（search或detail），决定partial方式保留的元素
+    backend (str): 解析方式，见PARSER_BACKENDS；为None时使用配置的解析方式
+    """
+    backend = backend or parser_backend
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"不支持的解析方式: {backend}")
+    features = 'lxml' if backend != 'html.parser' and LXML_AVAILABLE else 'html.parser'
+    parse_only = SoupStrainer(PAGE_PARTS[kind]) if backend == 'partial' else None
+    return BeautifulSoup(html, features, parse_only=parse_only)
+
+def configure_parser(backend=None):
+    """设置解析方式，为None时从config.json的douban.parser项读取；无效的值使用默认方式"""
+    global parser_backend
+    if backend is None:
+        backend = (get_config('douban') or {}).get('parser', DEFAULT_BACKEND)
+    if backend not in PARSER_BACKENDS:
+        logger.warning("不支持的豆瓣页面解析方式%s，使用%s", backend, DEFAULT_BACKEND)
+        backend = DEFAULT_BACKEND
+    parser_backend = backend
+    return backend
+
+parser_backend = DEFAULT_BACKEND
+configure_parser()
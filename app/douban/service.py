@@ -7,14 +7,17 @@ logger = logging.getLogger(__name__)
 class DoubanService:
     """豆瓣服务，用于处理豆瓣API返回的数据并转换为应用程序所需的格式"""
     
-    def __init__(self, headers=None):
+    def __init__(self, headers=None, session=None, cache=None, parser=None):
         """
         初始化豆瓣服务
         
         Args:
             headers: 请求头，可包含Cookie等信息用于模拟登录状态
+            session: 发送请求的requests.Session，默认使用共享连接池（见app/douban/http.py）
+            cache: 响应缓存，默认使用全局的豆瓣响应缓存（见app/douban/cache.py）
+            parser: 页面解析方式，默认使用配置的解析方式（见app/douban/parser.py）
         """
-        self.api = DoubanAPI(headers)
+        self.api = DoubanAPI(headers, session, cache, parser)
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Referer': 'https://movie.douban.com/',
@@ -59,11 +62,11 @@ class DoubanService:
                         if not hasattr(self, 'artist_cache'):
                             self.artist_cache = {}
                         self.artist_cache[str(result['id'])] = result['artist']
-                        logger.info(f"缓存搜索结果中的艺术家信息: ID={result['id']}, 艺术家={result['artist']}")
+                        logger.debug("缓存搜索结果中的艺术家信息: ID=%s, 艺术家=%s", result['id'], result['artist'])
             
             return results
         except Exception as e:
-            logger.error(f"搜索豆瓣内容失败: {e}")
+            logger.error("搜索豆瓣内容失败: %s", e)
             return []
     
     def get_movie_detail_for_import(self, movie_id):
@@ -147,7 +150,7 @@ class DoubanService:
         
         # 确保出版日期正确设置
         publish_date = book.get("publish_date", "")
-        logger.info(f"豆瓣API返回的出版日期: {publish_date}")
+        logger.debug("豆瓣API返回的出版日期: %s", publish_date)
         
         return {
             "id": book_id,  # 保留原始豆瓣ID，用于表单提交
@@ -213,7 +216,7 @@ class DoubanService:
         # 如果API返回的艺术家信息为空，尝试从缓存中获取
         if not artist and str(music_id) in self.artist_cache:
             artist = self.artist_cache[str(music_id)]
-            logger.info(f"从缓存中获取艺术家信息: ID={music_id}, 艺术家={artist}")
+            logger.debug("从缓存中获取艺术家信息: ID=%s, 艺术家=%s", music_id, artist)
         
         # 如果艺术家信息为空，尝试从描述中提取
         if not artist and "description" in music and music["description"]:
@@ -349,7 +352,7 @@ class DoubanService:
                         break
         
         # 记录导入的音乐信息，便于调试
-        logger.info(f"准备导入音乐 - 标题: {music.get('title', '')}, 艺术家: {artist}, 流派: {genre}")
+        logger.debug("准备导入音乐 - 标题: %s, 艺术家: %s, 流派: %s", music.get('title', ''), artist, genre)
         
         # 确保返回字段名与数据库表字段完全匹配
         return {
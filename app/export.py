@@ -0,0 +1,118 @@
+"""
+流式导出
+
+/api/export的响应体由生成器逐块产生：记录从数据库游标逐批读取（见BaseDAO.iter_rows），每凑够
+EXPORT_CHUNK_ROWS行编码一次并立即发送，整个书库不会同时出现在内存中，导出大量条目时第一批数据
+也能马上开始传输。支持NDJSON（每行一个JSON对象）、CSV和JSON数组三种格式，可选gzip压缩。
+"""
+
+import io
+import csv
+import json
+import zlib
+from flask import Response, stream_with_context
+
+# 导出格式 -> (MIME类型, 文件扩展名)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+}
+
+# 每次编码并发送的行数
+EXPORT_CHUNK_ROWS = 500
+
+# gzip压缩级别（zlib默认级别，兼顾速度和压缩率）
+GZIP_LEVEL = 6
+
+def batched(rows, size=EXPORT_CHUNK_ROWS):
+    """将记录迭代器按size行分组"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def to_json(row):
+    return json.dumps(row, ensure_ascii=False, default=str)
+
+def encode_ndjson(fields, rows):
+    for batch in batched(rows):
+        yield ''.join(to_json(row) + '\n' for row in batch)
+
+def encode_json(fields, rows):
+    """JSON数组，逐块输出，不在内存中构建整个列表"""
+    yield '['
+    separator = '\n'
+    for batch in batched(rows):
+        yield separator + ',\n'.join(to_json(row) for row in batch)
+        separator = ',\n'
+    yield '\n]\n'
+
+def encode_csv(fields, rows):
+    """CSV，首行为字段名；带UTF-8 BOM，Excel打开时中文不会乱码"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield '\ufeff' + buffer.getvalue()
+    for batch in batched(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row.get(field) for field in fields] for row in batch)
+        yield buffer.getvalue()
+
+ENCODERS = {
+    'ndjson': encode_ndjson,
+    'csv': encode_csv,
+    'json': encode_json,
+}
+
+def gzip_chunks(chunks):
+    """逐块gzip压缩，压缩器暂未输出数据时不发送空块"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+def export_response(fields, rows, fmt, filename, compress=False):
+    """
+    构建流式导出的响应
+
+    参数:
+    fields (list): 字段名（CSV的表头和列顺序）
+    rows: 记录字典的迭代器
+    fmt (str): 导出格式，见EXPORT_FORMATS
+    filename (str): 下载的文件名（不含扩展名）
+    compress (bool): 是否gzip压缩，压缩后作为.gz文件下载
+    """
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f'{filename}.{extension}'
+
+    def generate():
+        try:
+            for chunk in ENCODERS[fmt](fields, rows):
+                yield chunk.encode('utf-8')
+        finally:
+            # 客户端中途断开时也关闭记录迭代器，释放数据库连接
+            rows.close()
+
+    body = generate()
+    if compress:
+        body = gzip_chunks(body)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # 反向代理（nginx）不缓冲响应，数据逐块转发给客户端
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.cache_control.no_store = True
+    return response
@@ -0,0 +1,156 @@
+"""
+日志配置
+
+日志记录由根日志器上的QueueHandler放入队列，QueueListener在后台线程中写入控制台和日志文件，
+请求线程不等待I/O。配置项（config.json中的logging）:
+- level: 根日志级别
+- levels: 各模块的日志级别，例如 {"app.dao": "WARNING", "app.douban": "DEBUG"}
+- file: 日志文件路径（相对路径基于项目根目录），为空时只输出到控制台
+- trace_sample_rate: 调试跟踪的抽样比例（0~1）。大于0时，被抽样的请求输出app各模块的DEBUG日志，
+  其余请求仍按上面的级别过滤
+"""
+
+import os
+import atexit
+import queue
+import random
+import logging
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 调试跟踪作用的日志器（及其子日志器）
+TRACE_LOGGER = 'app'
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+# 当前请求是否被抽样进行调试跟踪
+_trace = contextvars.ContextVar('log_trace', default=False)
+
+_queue_handler = None
+_listener = None
+_configured_loggers = []
+_trace_sample_rate = 0.0
+
+def parse_level(value):
+    """将级别名称（如INFO）或数值转换为日志级别，无效时抛出ValueError"""
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"无效的日志级别: {value}")
+    return level
+
+class TraceFilter(logging.Filter):
+    """调试跟踪开启时app各模块的级别降为DEBUG，未被抽样的请求按配置的级别过滤"""
+
+    def __init__(self, levels, default_level):
+        super().__init__()
+        self.levels = levels
+        self.default_level = default_level
+        self._cache = {}
+
+    def level_for(self, name):
+        """日志器配置的级别，未配置时沿用最近的上级日志器的级别"""
+        level = self._cache.get(name)
+        if level is None:
+            level = self.default_level
+            part = name
+            while part:
+                if part in self.levels:
+                    level = self.levels[part]
+                    break
+                part = part.rpartition('.')[0]
+            self._cache[name] = level
+        return level
+
+    def filter(self, record):
+        return _trace.get() or record.levelno >= self.level_for(record.name)
+
+def setup_logging(config=None):
+    """
+    按配置设置日志（可重复调用，重新配置时停止之前的后台线程）
+
+    参数:
+    config (dict): 配置中的logging项，为空时使用INFO级别并只输出到控制台
+    """
+    global _queue_handler, _listener, _trace_sample_rate
+    config = config or {}
+    invalid = []
+
+    try:
+        level = parse_level(config.get('level') or logging.INFO)
+    except ValueError:
+        invalid.append(('level', config.get('level')))
+        level = logging.INFO
+    levels = {}
+    for name, value in (config.get('levels') or {}).items():
+        try:
+            levels[name] = parse_level(value)
+        except ValueError:
+            invalid.append((name, value))
+    try:
+        sample_rate = min(max(float(config.get('trace_sample_rate') or 0), 0.0), 1.0)
+    except (TypeError, ValueError):
+        invalid.append(('trace_sample_rate', config.get('trace_sample_rate')))
+        sample_rate = 0.0
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if config.get('file'):
+        path = os.path.join(PROJECT_DIR, config['file'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handlers.append(logging.FileHandler(path, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        root.removeHandler(_queue_handler)
+    for name in _configured_loggers:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    _configured_loggers.clear()
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root.setLevel(level)
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+        _configured_loggers.append(name)
+
+    _trace_sample_rate = sample_rate
+    if sample_rate > 0:
+        # 日志器先按级别丢弃记录，调试跟踪需要让app各模块产生DEBUG记录，再由过滤器决定是否输出
+        _queue_handler.addFilter(TraceFilter(levels, level))
+        for name in [TRACE_LOGGER] + [name for name in levels if name.startswith(TRACE_LOGGER + '.')]:
+            logging.getLogger(name).setLevel(logging.DEBUG)
+            if name not in _configured_loggers:
+                _configured_loggers.append(name)
+
+    root.addHandler(_queue_handler)
+    _listener.start()
+
+    for name, value in invalid:
+        logger.warning("忽略无效的日志配置: %s=%s", name, value)
+
+def sample_trace():
+    """为当前请求决定是否进行调试跟踪，返回是否被抽样"""
+    sampled = _trace_sample_rate > 0 and random.random() < _trace_sample_rate
+    _trace.set(sampled)
+    return sampled
+
+def stop_logging():
+    """停止后台线程，写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+
+atexit.register(stop_logging)
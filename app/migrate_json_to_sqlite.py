@@ -5,7 +5,12 @@ import sqlite3
 import time
 from datetime import datetime
 from pathlib import Path
-from app.database import get_db_connection, init_db
+from app.database import init_db
+from app.dao.base_dao import FAILED
+from app.dao.book_dao import BookDAO
+from app.dao.movie_dao import MovieDAO
+from app.dao.music_dao import MusicDAO
+from app.status import status_code, default_status
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -22,7 +27,7 @@ def load_json_data(file_path):
                 return json.load(f)
         return []
     except Exception as e:
-        logger.error(f"加载JSON文件失败: {file_path}, 错误: {e}")
+        logger.error("加载JSON文件失败: %s, 错误: %s", file_path, e)
         return []
 
 def backup_json_files():
@@ -38,13 +43,31 @@ def backup_json_files():
                 with open(source_path, 'r', encoding='utf-8') as src:
                     with open(target_path, 'w', encoding='utf-8') as dst:
                         dst.write(src.read())
-                logger.info(f"已备份文件: {file_name} -> {target_path}")
+                logger.info("已备份文件: %s -> %s", file_name, target_path)
         
         return backup_dir
     except Exception as e:
-        logger.error(f"备份JSON文件失败: {e}")
+        logger.error("备份JSON文件失败: %s", e)
         return None
 
+def join_tags(item):
+    """将标签列表转换为逗号分隔的字符串"""
+    return ','.join(item.get('tags', [])) if isinstance(item.get('tags'), list) else item.get('tags', '')
+
+def import_status(media_type, item):
+    """JSON中的状态转换为状态代码，无法识别时使用默认状态"""
+    return status_code(media_type, item.get('status')) or default_status(media_type)
+
+def migrate_items(dao, label, rows):
+    """批量写入条目，返回成功写入的条数（标签关联由DAO按tags字段同步写入）"""
+    outcomes = dao.create_many(rows, on_conflict='replace')
+    
+    count = len(outcomes) - outcomes.count(FAILED)
+    logger.info("成功迁移 %s 条%s数据", count, label)
+    if count < len(outcomes):
+        logger.warning("%s 条%s数据迁移失败", len(outcomes) - count, label)
+    return count
+
 def migrate_books():
     """迁移书籍数据"""
     books_file = os.path.join(DATA_DIR, 'books.json')
@@ -54,67 +77,22 @@ def migrate_books():
         logger.info("没有书籍数据需要迁移")
         return 0
     
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        count = 0
-        
-        for book in books:
-            # 准备数据
-            book_data = {
-                'id': book.get('id', ''),
-                'title': book.get('title', ''),
-                'author': book.get('author', ''),
-                'isbn': book.get('isbn', ''),
-                'publisher': book.get('publisher', ''),
-                'publish_date': book.get('publish_date', ''),
-                'pages': book.get('pages', 0),
-                'status': book.get('status', ''),
-                'rating': book.get('rating', 0),
-                'notes': book.get('notes', ''),
-                'cover_url': book.get('cover_url', ''),
-                'tags': ','.join(book.get('tags', [])) if isinstance(book.get('tags'), list) else book.get('tags', '')
-            }
-            
-            # 插入数据
-            cursor.execute('''
-            INSERT OR REPLACE INTO books 
-            (id, title, author, isbn, publisher, publish_date, pages, status, rating, notes, cover_url, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                book_data['id'], book_data['title'], book_data['author'], 
-                book_data['isbn'], book_data['publisher'], book_data['publish_date'], 
-                book_data['pages'], book_data['status'], book_data['rating'], 
-                book_data['notes'], book_data['cover_url'], book_data['tags']
-            ))
-            count += 1
-            
-            # 处理标签
-            if isinstance(book.get('tags'), list) and book.get('tags'):
-                for tag_name in book.get('tags'):
-                    # 确保标签存在
-                    cursor.execute('INSERT OR IGNORE INTO tags (id, name, type) VALUES (?, ?, ?)', 
-                                 (tag_name.lower().replace(' ', '_'), tag_name, 'book'))
-                    
-                    # 获取标签ID
-                    cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-                    tag_id = cursor.fetchone()[0]
-                    
-                    # 创建关联
-                    cursor.execute('''
-                    INSERT OR IGNORE INTO item_tags (item_id, tag_id, item_type)
-                    VALUES (?, ?, ?)
-                    ''', (book_data['id'], tag_id, 'book'))
-        
-        conn.commit()
-        logger.info(f"成功迁移 {count} 条书籍数据")
-        return count
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"迁移书籍数据失败: {e}")
-        return 0
-    finally:
-        conn.close()
+    rows = [{
+        'id': book.get('id', ''),
+        'title': book.get('title', ''),
+        'author': book.get('author', ''),
+        'isbn': book.get('isbn', ''),
+        'publisher': book.get('publisher', ''),
+        'publish_date': book.get('publish_date', ''),
+        'pages': book.get('pages', 0),
+        'status': import_status('book', book),
+        'rating': book.get('rating', 0),
+        'notes': book.get('notes', ''),
+        'cover_url': book.get('cover_url', ''),
+        'tags': join_tags(book)
+    } for book in books]
+    
+    return migrate_items(BookDAO(), '书籍', rows)
 
 def migrate_movies():
     """迁移电影数据"""
@@ -125,65 +103,20 @@ def migrate_movies():
         logger.info("没有电影数据需要迁移")
         return 0
     
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        count = 0
-        
-        for movie in movies:
-            # 准备数据
-            movie_data = {
-                'id': movie.get('id', ''),
-                'title': movie.get('title', ''),
-                'director': movie.get('director', ''),
-                'year': movie.get('year', 0),
-                'genre': movie.get('genre', ''),
-                'status': movie.get('status', ''),
-                'rating': movie.get('rating', 0),
-                'notes': movie.get('notes', ''),
-                'poster_url': movie.get('poster_url', ''),
-                'tags': ','.join(movie.get('tags', [])) if isinstance(movie.get('tags'), list) else movie.get('tags', '')
-            }
-            
-            # 插入数据
-            cursor.execute('''
-            INSERT OR REPLACE INTO movies 
-            (id, title, director, year, genre, status, rating, notes, poster_url, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                movie_data['id'], movie_data['title'], movie_data['director'], 
-                movie_data['year'], movie_data['genre'], movie_data['status'], 
-                movie_data['rating'], movie_data['notes'], movie_data['poster_url'], 
-                movie_data['tags']
-            ))
-            count += 1
-            
-            # 处理标签
-            if isinstance(movie.get('tags'), list) and movie.get('tags'):
-                for tag_name in movie.get('tags'):
-                    # 确保标签存在
-                    cursor.execute('INSERT OR IGNORE INTO tags (id, name, type) VALUES (?, ?, ?)', 
-                                 (tag_name.lower().replace(' ', '_'), tag_name, 'movie'))
-                    
-                    # 获取标签ID
-                    cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-                    tag_id = cursor.fetchone()[0]
-                    
-                    # 创建关联
-                    cursor.execute('''
-                    INSERT OR IGNORE INTO item_tags (item_id, tag_id, item_type)
-                    VALUES (?, ?, ?)
-                    ''', (movie_data['id'], tag_id, 'movie'))
-        
-        conn.commit()
-        logger.info(f"成功迁移 {count} 条电影数据")
-        return count
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"迁移电影数据失败: {e}")
-        return 0
-    finally:
-        conn.close()
+    rows = [{
+        'id': movie.get('id', ''),
+        'title': movie.get('title', ''),
+        'director': movie.get('director', ''),
+        'year': movie.get('year', 0),
+        'genre': movie.get('genre', ''),
+        'status': import_status('movie', movie),
+        'rating': movie.get('rating', 0),
+        'notes': movie.get('notes', ''),
+        'poster_url': movie.get('poster_url', ''),
+        'tags': join_tags(movie)
+    } for movie in movies]
+    
+    return migrate_items(MovieDAO(), '电影', rows)
 
 def migrate_music():
     """迁移音乐数据"""
@@ -194,65 +127,21 @@ def migrate_music():
         logger.info("没有音乐数据需要迁移")
         return 0
     
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        count = 0
-        
-        for music in music_items:
-            # 准备数据
-            music_data = {
-                'id': music.get('id', ''),
-                'title': music.get('title', ''),
-                'artist': music.get('artist', ''),
-                'album': music.get('album', ''),
-                'year': music.get('year', 0),
-                'genre': music.get('genre', ''),
-                'rating': music.get('rating', 0),
-                'notes': music.get('notes', ''),
-                'cover_url': music.get('cover_url', ''),
-                'tags': ','.join(music.get('tags', [])) if isinstance(music.get('tags'), list) else music.get('tags', '')
-            }
-            
-            # 插入数据
-            cursor.execute('''
-            INSERT OR REPLACE INTO music 
-            (id, title, artist, album, year, genre, rating, notes, cover_url, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                music_data['id'], music_data['title'], music_data['artist'], 
-                music_data['album'], music_data['year'], music_data['genre'], 
-                music_data['rating'], music_data['notes'], music_data['cover_url'], 
-                music_data['tags']
-            ))
-            count += 1
-            
-            # 处理标签
-            if isinstance(music.get('tags'), list) and music.get('tags'):
-                for tag_name in music.get('tags'):
-                    # 确保标签存在
-                    cursor.execute('INSERT OR IGNORE INTO tags (id, name, type) VALUES (?, ?, ?)', 
-                                 (tag_name.lower().replace(' ', '_'), tag_name, 'music'))
-                    
-                    # 获取标签ID
-                    cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-                    tag_id = cursor.fetchone()[0]
-                    
-                    # 创建关联
-                    cursor.execute('''
-                    INSERT OR IGNORE INTO item_tags (item_id, tag_id, item_type)
-                    VALUES (?, ?, ?)
-                    ''', (music_data['id'], tag_id, 'music'))
-        
-        conn.commit()
-        logger.info(f"成功迁移 {count} 条音乐数据")
-        return count
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"迁移音乐数据失败: {e}")
-        return 0
-    finally:
-        conn.close()
+    rows = [{
+        'id': music.get('id', ''),
+        'title': music.get('title', ''),
+        'artist': music.get('artist', ''),
+        'album': music.get('album', ''),
+        'year': music.get('year', 0),
+        'genre': music.get('genre', ''),
+        'status': import_status('music', music),
+        'rating': music.get('rating', 0),
+        'notes': music.get('notes', ''),
+        'cover_url': music.get('cover_url', ''),
+        'tags': join_tags(music)
+    } for music in music_items]
+    
+    return migrate_items(MusicDAO(), '音乐', rows)
 
 def run_migration():
     """执行完整的数据迁移"""
@@ -273,10 +162,10 @@ def run_migration():
     music_count = migrate_music()
     
     total_count = book_count + movie_count + music_count
-    logger.info(f"数据迁移完成，共迁移 {total_count} 条记录")
-    logger.info(f"- 书籍: {book_count} 条")
-    logger.info(f"- 电影: {movie_count} 条")
-    logger.info(f"- 音乐: {music_count} 条")
+    logger.info("数据迁移完成，共迁移 %s 条记录", total_count)
+    logger.info("- 书籍: %s 条", book_count)
+    logger.info("- 电影: %s 条", movie_count)
+    logger.info("- 音乐: %s 条", music_count)
     
     return True
 
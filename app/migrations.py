@@ -0,0 +1,595 @@
+"""
+数据库架构迁移
+
+每个迁移是一个带版本号的步骤，按版本号顺序执行一次。当前架构版本保存在
+PRAGMA user_version 中，启动时只需读取这一个值；已执行的迁移同时记录在
+schema_version 表中，便于排查。
+
+批处理迁移会分多个事务提交，中途会释放SQLite写锁。为避免多个进程同时启动时
+重复执行同一迁移，执行迁移的进程在第一个写事务中登记迁移标记（schema_version中
+版本号为0的行），其他进程等待标记清除后重新读取架构版本。
+
+新增字段、索引、触发器或数据回填时，在本文件末尾添加一个新的迁移函数，
+版本号递增，不要修改已发布的迁移。
+"""
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from app.database import get_db_connection
+from app.pinyin import pinyin_available, to_search_pinyin
+from app.dao.facets import rebuild_facets
+from app.dao.tags import split_tags, join_tags, sync_item_tags
+
+logger = logging.getLogger(__name__)
+
+# 数据回填时每批处理的行数
+BATCH_SIZE = 500
+
+# 已注册的迁移，按版本号排序
+MIGRATIONS = []
+
+# 同一进程内只允许一个线程执行迁移，跨进程由schema_version中的迁移标记保证
+_migrate_lock = threading.Lock()
+
+# 迁移标记的版本号：name为持有者，applied_at为最近一次心跳时间
+CLAIM_VERSION = 0
+# 持有者超过该秒数没有心跳时视为已中断（例如进程崩溃），其他进程可以接管
+CLAIM_TIMEOUT = 300
+# 等待其他进程完成迁移时的轮询间隔（秒）
+CLAIM_POLL_INTERVAL = 0.5
+
+# 当前进程持有的迁移标记，只在持有_migrate_lock时读写
+_claim_owner = None
+
+class MigrationClaimLost(RuntimeError):
+    """迁移标记已被其他进程接管"""
+
+class Migration:
+    """一个迁移步骤"""
+
+    def __init__(self, version, name, upgrade, batched=False):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        # 非批处理迁移在单个事务中执行；批处理迁移自行分批提交，必须可重复执行
+        self.batched = batched
+
+def migration(version, name, batched=False):
+    """注册迁移函数的装饰器"""
+    def decorator(func):
+        if version <= CLAIM_VERSION:
+            raise ValueError(f"迁移版本号必须大于{CLAIM_VERSION}: {version}")
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"重复的迁移版本号: {version}")
+        MIGRATIONS.append(Migration(version, name, func, batched))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+def latest_version():
+    """最新的架构版本号"""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+def get_schema_version(conn):
+    """读取数据库当前的架构版本号"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def _record_version(conn, m):
+    """记录已执行的迁移并更新架构版本号（需在事务中调用）"""
+    conn.execute('INSERT OR REPLACE INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)',
+                 (m.version, m.name, datetime.now().isoformat()))
+    conn.execute(f'PRAGMA user_version = {int(m.version)}')
+
+def _create_schema_version_table(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP NOT NULL
+    )
+    ''')
+
+def _try_claim(conn, owner):
+    """
+    在写事务中登记迁移标记
+
+    返回:
+    bool: 登记成功返回True；其他进程正在迁移（标记未超时）时返回False
+    """
+    row = conn.execute('SELECT name, applied_at FROM schema_version WHERE version = ?',
+                       (CLAIM_VERSION,)).fetchone()
+    if row is not None and row['name'] != owner:
+        age = (datetime.now() - datetime.fromisoformat(row['applied_at'])).total_seconds()
+        if age < CLAIM_TIMEOUT:
+            return False
+        logger.warning("迁移标记 %s 已有%d秒没有更新，视为中断并接管", row['name'], age)
+    conn.execute('INSERT OR REPLACE INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)',
+                 (CLAIM_VERSION, owner, datetime.now().isoformat()))
+    return True
+
+def heartbeat(conn):
+    """
+    更新当前进程迁移标记的心跳时间（需在事务中调用，随事务提交）
+
+    批处理迁移在每批提交前调用，长时间的回填不会被其他进程视为中断；
+    标记已被接管时抛出MigrationClaimLost，当前进程停止迁移。
+    """
+    if _claim_owner is None:
+        return
+    updated = conn.execute('UPDATE schema_version SET applied_at = ? WHERE version = ? AND name = ?',
+                           (datetime.now().isoformat(), CLAIM_VERSION, _claim_owner)).rowcount
+    if updated != 1:
+        raise MigrationClaimLost(f"迁移标记 {_claim_owner} 已被其他进程接管")
+
+def _release_claim(conn, owner):
+    """清除当前进程的迁移标记（需在事务中调用）"""
+    conn.execute('DELETE FROM schema_version WHERE version = ? AND name = ?', (CLAIM_VERSION, owner))
+
+def _begin_immediate(conn):
+    """开始写事务；其他连接长时间持有写锁（超过busy_timeout）时等待后重试"""
+    while True:
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            return
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            time.sleep(CLAIM_POLL_INTERVAL)
+
+def migrate(target=None):
+    """
+    执行所有未应用的迁移
+
+    参数:
+    target (int): 迁移到的目标版本，默认为最新版本
+
+    返回:
+    int: 迁移后的架构版本号
+    """
+    global _claim_owner
+    target = latest_version() if target is None else target
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    with _migrate_lock:
+        conn = get_db_connection()
+        try:
+            # 获取写锁后再检查版本，其他进程可能已经完成了迁移；
+            # 其他进程持有迁移标记时等待，标记清除后重新检查
+            waiting = False
+            while True:
+                _begin_immediate(conn)
+                current = get_schema_version(conn)
+                if current >= target:
+                    conn.rollback()
+                    return current
+                _create_schema_version_table(conn)
+                if _try_claim(conn, owner):
+                    break
+                conn.rollback()
+                if not waiting:
+                    logger.info("其他进程正在执行数据库迁移，等待其完成")
+                    waiting = True
+                time.sleep(CLAIM_POLL_INTERVAL)
+            conn.commit()
+            _claim_owner = owner
+
+            while True:
+                # 每次重新获取写锁后确认标记仍属于当前进程，并重新读取架构版本
+                _begin_immediate(conn)
+                heartbeat(conn)
+                current = get_schema_version(conn)
+                pending = [m for m in MIGRATIONS if current < m.version <= target]
+                if not pending:
+                    break
+                m = pending[0]
+
+                logger.info("执行数据库迁移 %s: %s", m.version, m.name)
+                if m.batched:
+                    # 批处理迁移自行提交，完成后再单独记录版本号
+                    conn.commit()
+                    m.upgrade(conn)
+                    conn.commit()
+                    _begin_immediate(conn)
+                    heartbeat(conn)
+                else:
+                    m.upgrade(conn)
+                _record_version(conn, m)
+                conn.commit()
+
+            _release_claim(conn, owner)
+            conn.commit()
+            logger.info("数据库架构已更新到版本 %s", current)
+            return current
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("数据库迁移失败: %s", e)
+            # 清除标记，其他进程无需等到超时即可重试
+            try:
+                _begin_immediate(conn)
+                _release_claim(conn, owner)
+                conn.commit()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            _claim_owner = None
+            conn.close()
+
+def ensure_schema():
+    """启动时检查架构版本，只有版本落后时才执行迁移"""
+    conn = get_db_connection()
+    try:
+        current = get_schema_version(conn)
+    finally:
+        conn.close()
+
+    if current >= latest_version():
+        return current
+    return migrate()
+
+# 迁移辅助函数
+
+def add_column_if_missing(conn, table, column, definition):
+    """为表添加字段（字段已存在时跳过），用于兼容由旧版本代码创建的数据库"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+    if column not in columns:
+        logger.info("添加%s表的%s字段", table, column)
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+def backfill_in_batches(conn, table, columns, transform, batch_size=BATCH_SIZE):
+    """
+    分批回填数据，每批一个事务，按rowid顺序推进
+
+    参数:
+    conn: 数据库连接
+    table (str): 表名
+    columns (list): 需要读取的字段
+    transform (callable): 接收一行（dict），返回需要更新的字段字典，无需更新时返回None
+    batch_size (int): 每批行数
+
+    返回:
+    int: 更新的行数
+    """
+    last_rowid = 0
+    updated = 0
+    select_sql = f'SELECT rowid AS _rowid, {", ".join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?'
+
+    while True:
+        rows = conn.execute(select_sql, (last_rowid, batch_size)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1]['_rowid']
+
+        # 按更新字段分组，同一组使用一条executemany
+        groups = {}
+        for row in rows:
+            changes = transform(dict(row))
+            if changes:
+                key = tuple(changes.keys())
+                groups.setdefault(key, []).append(tuple(changes.values()) + (row['_rowid'],))
+
+        for fields, params in groups.items():
+            set_clause = ', '.join(f'{field} = ?' for field in fields)
+            conn.executemany(f'UPDATE {table} SET {set_clause} WHERE rowid = ?', params)
+            updated += len(params)
+        heartbeat(conn)
+        conn.commit()
+
+    return updated
+
+def create_fts_table(conn, table, columns, tokenize):
+    """
+    为表创建外部内容FTS5全文索引及同步触发器，并从原表重建索引
+
+    索引表名为"{table}_fts"，以原表的rowid关联；只有被索引的字段变化时才更新索引。
+    """
+    fts = f'{table}_fts'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+
+    for suffix in ('ai', 'ad', 'au'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    conn.execute(f'DROP TABLE IF EXISTS {fts}')
+
+    conn.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, "
+                 f"content='{table}', content_rowid='rowid', tokenize='{tokenize}')")
+    conn.execute(f'''
+    CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+    END
+    ''')
+    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+# 迁移步骤
+
+@migration(1, '创建初始表结构')
+def _initial_schema(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS books (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        author TEXT,
+        isbn TEXT,
+        publisher TEXT,
+        publish_date TEXT,
+        pages INTEGER,
+        status TEXT,
+        rating REAL,
+        notes TEXT,
+        description TEXT,
+        cover_url TEXT,
+        tags TEXT,
+        is_owned BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS movies (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        director TEXT,
+        cast TEXT,
+        year INTEGER,
+        genre TEXT,
+        status TEXT,
+        rating REAL,
+        notes TEXT,
+        poster_url TEXT,
+        tags TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS music (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        artist TEXT,
+        album TEXT,
+        year INTEGER,
+        genre TEXT,
+        status TEXT,
+        rating REAL,
+        notes TEXT,
+        cover_url TEXT,
+        tags TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS tags (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        type TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS item_tags (
+        item_id TEXT NOT NULL,
+        tag_id TEXT NOT NULL,
+        item_type TEXT NOT NULL,
+        PRIMARY KEY (item_id, tag_id, item_type),
+        FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    )
+    ''')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_books_title ON books (title)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movies_title ON movies (title)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_music_title ON music (title)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tags_name ON tags (name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_item_tags_item_id ON item_tags (item_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_item_tags_tag_id ON item_tags (tag_id)')
+
+@migration(2, '补充书籍、电影和音乐表的字段')
+def _add_media_columns(conn):
+    # 由旧版本update_db_schema创建的数据库可能已经包含这些字段
+    add_column_if_missing(conn, 'books', 'description', 'TEXT')
+    add_column_if_missing(conn, 'books', 'is_owned', 'BOOLEAN DEFAULT 0')
+    add_column_if_missing(conn, 'books', 'series', 'TEXT')
+    add_column_if_missing(conn, 'books', 'translator', 'TEXT')
+    add_column_if_missing(conn, 'books', 'page_count', 'INTEGER')
+    add_column_if_missing(conn, 'books', 'price', 'TEXT')
+    add_column_if_missing(conn, 'movies', 'cast', 'TEXT')
+    add_column_if_missing(conn, 'music', 'status', 'TEXT')
+
+@migration(3, '添加分页排序索引')
+def _add_pagination_indexes(conn):
+    # 游标分页按(排序字段, id)定位，联合索引使每页查询只扫描当前页的行
+    sort_columns = {
+        'books': ['created_at', 'updated_at', 'title', 'rating', 'author'],
+        'movies': ['created_at', 'updated_at', 'title', 'rating', 'year'],
+        'music': ['created_at', 'updated_at', 'title', 'rating', 'artist', 'year'],
+    }
+    for table, columns in sort_columns.items():
+        for column in columns:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column}_id ON {table} ({column}, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_books_owned_created_at ON books (is_owned, created_at, id)')
+
+@migration(4, '添加书籍、电影和音乐的全文索引')
+def _add_fts_indexes(conn):
+    tokenize = 'unicode61 remove_diacritics 2'
+    create_fts_table(conn, 'books', ['title', 'author', 'isbn', 'publisher', 'tags', 'notes'], tokenize)
+    create_fts_table(conn, 'movies', ['title', 'director', 'genre', 'tags', 'notes'], tokenize)
+    create_fts_table(conn, 'music', ['title', 'artist', 'album', 'genre', 'tags', 'notes'], tokenize)
+
+@migration(5, '全文索引改用trigram分词并添加拼音搜索字段', batched=True)
+def _add_trigram_pinyin_search(conn):
+    # 生成拼音的来源字段
+    pinyin_sources = {
+        'books': ['title', 'author'],
+        'movies': ['title', 'director'],
+        'music': ['title', 'artist', 'album'],
+    }
+    for table in pinyin_sources:
+        add_column_if_missing(conn, table, 'search_pinyin', 'TEXT')
+    conn.commit()
+
+    if pinyin_available():
+        for table, columns in pinyin_sources.items():
+            def transform(row, columns=columns):
+                value = to_search_pinyin(*(row[column] for column in columns))
+                return {'search_pinyin': value} if value else None
+            backfill_in_batches(conn, table, columns, transform)
+    else:
+        logger.warning("未安装pypinyin，跳过拼音字段回填，安装后执行 python -m app.rebuild_search_index 生成拼音")
+
+    # trigram分词支持中文等无空格文本的任意子串匹配
+    create_fts_table(conn, 'books', ['title', 'author', 'isbn', 'publisher', 'tags', 'notes', 'search_pinyin'], 'trigram')
+    create_fts_table(conn, 'movies', ['title', 'director', 'genre', 'tags', 'notes', 'search_pinyin'], 'trigram')
+    create_fts_table(conn, 'music', ['title', 'artist', 'album', 'genre', 'tags', 'notes', 'search_pinyin'], 'trigram')
+
+@migration(6, '添加列表筛选索引')
+def _add_filter_indexes(conn):
+    # 等值筛选后按默认的创建时间排序分页，(筛选字段, created_at, id)联合索引使筛选和排序都走索引
+    filter_columns = {
+        'books': ['status', 'author'],
+        'movies': ['status', 'director'],
+        'music': ['status', 'artist', 'album'],
+    }
+    for table, columns in filter_columns.items():
+        for column in columns:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column}_created_at ON {table} ({column}, created_at, id)')
+    # 表格视图新增的排序字段，书籍的出版日期索引也用于年份范围筛选
+    for table, column in [('books', 'publish_date'), ('movies', 'director'), ('music', 'album')]:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column}_id ON {table} ({column}, id)')
+
+@migration(7, '添加筛选项计数表')
+def _add_facet_counts(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS facet_counts (
+        item_type TEXT NOT NULL,
+        facet TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (item_type, facet, value)
+    ) WITHOUT ROWID
+    ''')
+    # 须与各DAO的ITEM_TYPE和FACETS一致
+    facets = {
+        ('books', 'book'): {'tag': ('tags', True), 'author': ('author', False)},
+        ('movies', 'movie'): {'genre': ('genre', True), 'director': ('director', False), 'actor': ('cast', True)},
+        ('music', 'music'): {'genre': ('genre', True), 'artist': ('artist', False), 'album': ('album', False)},
+    }
+    for (table, item_type), table_facets in facets.items():
+        rebuild_facets(conn, table, item_type, table_facets)
+
+@migration(8, '以item_tags表为标签的唯一来源并回填关联', batched=True)
+def _backfill_item_tags(conn):
+    # 按标签筛选和标签云按(item_type, tag_id)查找条目，索引包含item_id，无需回表
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_item_tags_type_tag ON item_tags (item_type, tag_id, item_id)')
+    conn.commit()
+
+    def transform(row):
+        value = join_tags(split_tags(row['tags']))
+        return {'tags': value} if row['tags'] is not None and value != row['tags'] else None
+
+    for table, item_type in [('books', 'book'), ('movies', 'movie'), ('music', 'music')]:
+        # tags字段统一为', '分隔的规范化文本
+        backfill_in_batches(conn, table, ['tags'], transform)
+
+        # 按tags字段重写关联，清除已删除条目遗留的关联
+        last_rowid = 0
+        while True:
+            rows = conn.execute(f'SELECT rowid, id FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                                (last_rowid, BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1]['rowid']
+            sync_item_tags(conn, table, item_type, [row['id'] for row in rows])
+            heartbeat(conn)
+            conn.commit()
+        conn.execute(f'DELETE FROM item_tags WHERE item_type = ? AND item_id NOT IN (SELECT id FROM {table})',
+                     (item_type,))
+        conn.commit()
+
+@migration(9, '状态统一保存为状态代码')
+def _normalize_statuses(conn):
+    # 须与app/status.py中的STATUSES和LEGACY_STATUSES一致，第一个代码为默认状态
+    statuses = {
+        'books': (['unread', 'wish', 'reading', 'read'],
+                  {'未读': 'unread', '想读': 'wish', '在读': 'reading', '读过': 'read', '已读': 'read',
+                   'wanting': 'wish'}),
+        'movies': (['unwatched', 'wish', 'watched'],
+                   {'未看': 'unwatched', '想看': 'wish', '已看': 'watched', '看过': 'watched', '在看': 'wish',
+                    'watching': 'wish', 'wanting': 'wish'}),
+        'music': (['unlistened', 'wish', 'listened'],
+                  {'未听': 'unlistened', '想听': 'wish', '已听': 'listened', '听过': 'listened', '在听': 'wish',
+                   'listening': 'wish', 'wanting': 'wish'}),
+    }
+    for table, (codes, legacy) in statuses.items():
+        # 每个旧值一条UPDATE，通过状态索引只访问需要改写的行
+        conn.executemany(f'UPDATE {table} SET status = ? WHERE status = ?',
+                         [(code, value) for value, code in legacy.items()])
+        # 无法识别的状态在页面上一直按默认状态显示，统一改为默认状态
+        placeholders = ', '.join('?' for _ in codes)
+        conn.execute(f'UPDATE {table} SET status = ? WHERE status IS NULL OR status NOT IN ({placeholders})',
+                     (codes[0], *codes))
+
+@migration(10, '添加状态筛选项计数')
+def _add_status_facets(conn):
+    # 首页按状态统计条目数读取facet_counts表；须与各DAO的ITEM_TYPE和FACETS一致
+    facets = {
+        ('books', 'book'): {'status': ('status', False), 'tag': ('tags', True), 'author': ('author', False)},
+        ('movies', 'movie'): {'status': ('status', False), 'genre': ('genre', True),
+                              'director': ('director', False), 'actor': ('cast', True)},
+        ('music', 'music'): {'status': ('status', False), 'genre': ('genre', True),
+                             'artist': ('artist', False), 'album': ('album', False)},
+    }
+    for (table, item_type), table_facets in facets.items():
+        rebuild_facets(conn, table, item_type, table_facets)
+
+@migration(11, '添加查询缓存代数表')
+def _add_cache_generations(conn):
+    # 写入条目表时在同一事务中使该表的代数加1，各进程据此判断缓存的查询结果是否过期
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cache_generations (
+        name TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    conn.executemany('INSERT OR IGNORE INTO cache_generations (name, generation) VALUES (?, 0)',
+                     [('books',), ('movies',), ('music',)])
+
+@migration(12, '记录条目表的最后修改时间')
+def _add_generation_changed_at(conn):
+    # 条件GET的Last-Modified；已有数据的修改时间未知，按迁移时间计
+    add_column_if_missing(conn, 'cache_generations', 'changed_at', 'TIMESTAMP')
+    conn.execute('UPDATE cache_generations SET changed_at = CURRENT_TIMESTAMP WHERE changed_at IS NULL')
+
+@migration(13, '记录数据库实例标识')
+def _add_instance_id(conn):
+    # 条件GET的ETag包含实例标识，恢复备份后重新生成（见database.renew_instance_id）
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS database_info (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("INSERT OR IGNORE INTO database_info (key, value) VALUES ('instance_id', ?)",
+                 (uuid.uuid4().hex,))
@@ -4,6 +4,10 @@ from datetime import datetime
 from app.dao.book_dao import BookDAO
 from app.dao.movie_dao import MovieDAO
 from app.dao.music_dao import MusicDAO
+from app.dao.base_dao import DEFAULT_RECENT_LIMIT, BULK_BATCH_SIZE, CONFLICT_OUTCOMES, FAILED
+from app.dao import dashboard
+from app.dao.cache import query_cache
+from app.status import validate_status
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -19,109 +23,140 @@ def get_all_books():
     try:
         return book_dao.get_all()
     except Exception as e:
-        logger.error(f"获取所有书籍失败: {e}")
+        logger.error("获取所有书籍失败: %s", e)
         return []
 
-def get_book(book_id):
-    """通过ID获取特定书籍"""
+def get_books_page(order_by='created_at', after_cursor=None, limit=50, filters=None, columns=None):
+    """分页获取书籍，排序字段、筛选条件、游标或字段投影无效时抛出ValueError"""
     try:
-        return book_dao.get_by_id(book_id)
+        return book_dao.get_page(order_by, after_cursor, limit, filters, columns)
+    except ValueError:
+        raise
     except Exception as e:
-        logger.error(f"获取书籍(ID={book_id})失败: {e}")
+        logger.error("分页获取书籍失败: %s", e)
+        return {'items': [], 'next_cursor': None}
+
+def get_book_field_values(field, split=False):
+    """获取书籍某字段的所有不同取值，用于筛选列表"""
+    try:
+        return book_dao.get_distinct_values(field, split)
+    except Exception as e:
+        logger.error("获取书籍的%s字段取值失败: %s", field, e)
+        return []
+
+def get_book(book_id, columns=None):
+    """通过ID获取特定书籍，字段投影无效时抛出ValueError"""
+    try:
+        return book_dao.get_by_id(book_id, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("获取书籍(ID=%s)失败: %s", book_id, e)
         return None
 
+def prepare_book(book_data):
+    """
+    将表单、API或导入文件中的书籍数据映射为数据库记录（生成新ID和时间戳），add_book和批量导入共用
+
+    状态无效时抛出ValueError
+    """
+    # 创建一个新的数据字典，只包含数据库表中存在的字段
+    filtered_book_data = {}
+    
+    # 基本字段
+    filtered_book_data['id'] = str(uuid.uuid4())
+    filtered_book_data['created_at'] = datetime.now().isoformat()
+    filtered_book_data['updated_at'] = datetime.now().isoformat()
+    
+    # 复制标准字段
+    standard_fields = ['title', 'author', 'publisher', 'isbn', 'status', 'notes', 
+                      'cover_url', 'description', 'is_owned', 'series', 'translator', 
+                      'price', 'rating']
+    
+    for field in standard_fields:
+        if field in book_data:
+            filtered_book_data[field] = book_data[field]
+    
+    # 处理出版日期字段
+    if 'publish_date' in book_data:
+        filtered_book_data['publish_date'] = book_data['publish_date']
+        logger.debug("设置出版日期(publish_date): %s", filtered_book_data['publish_date'])
+    elif 'datePublished' in book_data:
+        filtered_book_data['publish_date'] = book_data['datePublished']
+        logger.debug("从datePublished设置出版日期: %s", filtered_book_data['publish_date'])
+    
+    # 处理标签
+    if 'tags' in book_data:
+        if isinstance(book_data['tags'], list):
+            filtered_book_data['tags'] = ','.join(book_data['tags'])
+        else:
+            filtered_book_data['tags'] = book_data['tags']
+    
+    # 处理myTags字段
+    if 'myTags' in book_data and book_data['myTags']:
+        if isinstance(book_data['myTags'], list):
+            tags = book_data['myTags']
+        else:
+            tags = book_data['myTags'].split(',')
+        
+        # 如果已有tags，添加myTags
+        if 'tags' in filtered_book_data and filtered_book_data['tags']:
+            existing_tags = filtered_book_data['tags'].split(',')
+            for tag in tags:
+                if tag.strip() and tag.strip() not in existing_tags:
+                    existing_tags.append(tag.strip())
+            filtered_book_data['tags'] = ','.join(existing_tags)
+        else:
+            filtered_book_data['tags'] = ','.join(tags)
+    
+    # 处理状态
+    if 'state' in book_data and book_data['state'] and 'status' not in filtered_book_data:
+        filtered_book_data['status'] = book_data['state']
+    filtered_book_data['status'] = validate_status('book', filtered_book_data.get('status'))
+    
+    # 处理评分
+    if 'myRating' in book_data and 'rating' not in filtered_book_data:
+        filtered_book_data['rating'] = float(book_data['myRating'])
+    
+    # 处理页数
+    if 'totalPage' in book_data and book_data['totalPage']:
+        try:
+            filtered_book_data['page_count'] = int(book_data['totalPage'])
+        except (ValueError, TypeError):
+            # 如果转换失败，尝试提取数字部分
+            import re
+            match = re.search(r'\d+', str(book_data['totalPage']))
+            if match:
+                filtered_book_data['page_count'] = int(match.group())
+    elif 'pages' in book_data and book_data['pages']:
+        try:
+            filtered_book_data['page_count'] = int(book_data['pages'])
+            logger.debug("从pages设置页数: %s", filtered_book_data['page_count'])
+        except (ValueError, TypeError):
+            logger.warning("页数转换失败: %s", book_data['pages'])
+    
+    # 处理描述
+    if 'desc' in book_data and 'description' not in filtered_book_data:
+        filtered_book_data['description'] = book_data['desc']
+    
+    return filtered_book_data
+
 def add_book(book_data):
-    """添加新书籍"""
+    """添加新书籍，状态无效时不写入并返回None"""
     try:
-        # 创建一个新的数据字典，只包含数据库表中存在的字段
-        filtered_book_data = {}
-        
-        # 基本字段
-        filtered_book_data['id'] = str(uuid.uuid4())
-        filtered_book_data['created_at'] = datetime.now().isoformat()
-        filtered_book_data['updated_at'] = datetime.now().isoformat()
-        
-        # 复制标准字段
-        standard_fields = ['title', 'author', 'publisher', 'isbn', 'status', 'notes', 
-                          'cover_url', 'description', 'is_owned', 'series', 'translator', 
-                          'price', 'rating']
-        
-        for field in standard_fields:
-            if field in book_data:
-                filtered_book_data[field] = book_data[field]
-        
-        # 处理出版日期字段
-        if 'publish_date' in book_data:
-            filtered_book_data['publish_date'] = book_data['publish_date']
-            logger.info(f"设置出版日期(publish_date): {filtered_book_data['publish_date']}")
-        elif 'datePublished' in book_data:
-            filtered_book_data['publish_date'] = book_data['datePublished']
-            logger.info(f"从datePublished设置出版日期: {filtered_book_data['publish_date']}")
-        
-        # 处理标签
-        if 'tags' in book_data:
-            if isinstance(book_data['tags'], list):
-                filtered_book_data['tags'] = ','.join(book_data['tags'])
-            else:
-                filtered_book_data['tags'] = book_data['tags']
-        
-        # 处理myTags字段
-        if 'myTags' in book_data and book_data['myTags']:
-            if isinstance(book_data['myTags'], list):
-                tags = book_data['myTags']
-            else:
-                tags = book_data['myTags'].split(',')
-            
-            # 如果已有tags，添加myTags
-            if 'tags' in filtered_book_data and filtered_book_data['tags']:
-                existing_tags = filtered_book_data['tags'].split(',')
-                for tag in tags:
-                    if tag.strip() and tag.strip() not in existing_tags:
-                        existing_tags.append(tag.strip())
-                filtered_book_data['tags'] = ','.join(existing_tags)
-            else:
-                filtered_book_data['tags'] = ','.join(tags)
-        
-        # 处理状态
-        if 'state' in book_data and book_data['state'] and 'status' not in filtered_book_data:
-            filtered_book_data['status'] = book_data['state']
-        
-        # 处理评分
-        if 'myRating' in book_data and 'rating' not in filtered_book_data:
-            filtered_book_data['rating'] = float(book_data['myRating'])
-        
-        # 处理页数
-        if 'totalPage' in book_data and book_data['totalPage']:
-            try:
-                filtered_book_data['page_count'] = int(book_data['totalPage'])
-            except (ValueError, TypeError):
-                # 如果转换失败，尝试提取数字部分
-                import re
-                match = re.search(r'\d+', str(book_data['totalPage']))
-                if match:
-                    filtered_book_data['page_count'] = int(match.group())
-        elif 'pages' in book_data and book_data['pages']:
-            try:
-                filtered_book_data['page_count'] = int(book_data['pages'])
-                logger.info(f"从pages设置页数: {filtered_book_data['page_count']}")
-            except (ValueError, TypeError):
-                logger.warning(f"页数转换失败: {book_data['pages']}")
-        
-        # 处理描述
-        if 'desc' in book_data and 'description' not in filtered_book_data:
-            filtered_book_data['description'] = book_data['desc']
+        filtered_book_data = prepare_book(book_data)
         
         # 记录最终要保存的数据
-        logger.info(f"最终要保存到数据库的图书数据: {filtered_book_data}")
+        logger.debug("最终要保存到数据库的图书数据: %s", filtered_book_data)
         
         success = book_dao.create(filtered_book_data)
         return filtered_book_data['id'] if success else None
     except Exception as e:
-        logger.error(f"添加书籍失败: {e}")
+        logger.error("添加书籍失败: %s", e)
         return None
 
 def update_book(book_id, book_data):
-    """更新书籍信息"""
+    """更新书籍信息，状态无效时不写入并返回False"""
     try:
         # 确保ID不被更改
         book_data['id'] = book_id
@@ -139,15 +174,9 @@ def update_book(book_id, book_data):
         if 'state' in book_data and 'status' not in book_data:
             book_data['status'] = book_data['state']
         
-        # 确保中文状态值被正确保存
+        # 状态保存为状态代码
         if 'status' in book_data:
-            # 打印状态值，帮助调试
-            logger.info(f"保存书籍状态: {book_data['status']}")
-            # 确保状态值是有效的中文状态
-            if book_data['status'] not in ['未读', '想读', '在读', '读过']:
-                # 如果不是有效的中文状态，则设为默认值"未读"
-                logger.warning(f"无效的状态值: {book_data['status']}，设为默认值: 未读")
-                book_data['status'] = '未读'
+            book_data['status'] = validate_status('book', book_data['status'])
         
         if 'myRating' in book_data and 'rating' not in book_data:
             book_data['rating'] = book_data['myRating']
@@ -164,10 +193,10 @@ def update_book(book_id, book_data):
         # 调用数据库更新操作
         result = book_dao.update(book_id, book_data)
         # 打印更新结果，帮助调试
-        logger.info(f"更新书籍结果: {result}")
+        logger.debug("更新书籍结果: %s", result)
         return result
     except Exception as e:
-        logger.error(f"更新书籍(ID={book_id})失败: {e}")
+        logger.error("更新书籍(ID=%s)失败: %s", book_id, e)
         return False
 
 def delete_book(book_id):
@@ -175,15 +204,17 @@ def delete_book(book_id):
     try:
         return book_dao.delete(book_id)
     except Exception as e:
-        logger.error(f"删除书籍(ID={book_id})失败: {e}")
+        logger.error("删除书籍(ID=%s)失败: %s", book_id, e)
         return False
 
-def search_books(query):
-    """搜索书籍"""
+def search_books(query, limit=20, offset=0, filters=None):
+    """全文搜索书籍，支持中文子串和拼音，按相关度排序，筛选条件无效时抛出ValueError"""
     try:
-        return book_dao.search_books(query)
+        return book_dao.search_books(query, limit, offset, filters)
+    except ValueError:
+        raise
     except Exception as e:
-        logger.error(f"搜索书籍失败: {e}")
+        logger.error("搜索书籍失败: %s", e)
         return []
 
 def get_books_by_tag(tag):
@@ -191,7 +222,7 @@ def get_books_by_tag(tag):
     try:
         return book_dao.get_books_by_tag(tag)
     except Exception as e:
-        logger.error(f"获取标签为'{tag}'的书籍失败: {e}")
+        logger.error("获取标签为'%s'的书籍失败: %s", tag, e)
         return []
 
 def get_books_by_status(status):
@@ -199,7 +230,7 @@ def get_books_by_status(status):
     try:
         return book_dao.get_books_by_status(status)
     except Exception as e:
-        logger.error(f"获取状态为'{status}'的书籍失败: {e}")
+        logger.error("获取状态为'%s'的书籍失败: %s", status, e)
         return []
 
 def get_book_tags():
@@ -207,7 +238,7 @@ def get_book_tags():
     try:
         return book_dao.get_all_tags()
     except Exception as e:
-        logger.error(f"获取所有书籍标签失败: {e}")
+        logger.error("获取所有书籍标签失败: %s", e)
         return []
 
 # 电影相关函数
@@ -216,106 +247,122 @@ def get_all_movies():
     try:
         return movie_dao.get_all()
     except Exception as e:
-        logger.error(f"获取所有电影失败: {e}")
+        logger.error("获取所有电影失败: %s", e)
         return []
 
-def get_movie(movie_id):
-    """通过ID获取特定电影"""
+def get_movies_page(order_by='created_at', after_cursor=None, limit=50, filters=None, columns=None):
+    """分页获取电影，排序字段、筛选条件、游标或字段投影无效时抛出ValueError"""
+    try:
+        return movie_dao.get_page(order_by, after_cursor, limit, filters, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("分页获取电影失败: %s", e)
+        return {'items': [], 'next_cursor': None}
+
+def get_movie_field_values(field, split=False):
+    """获取电影某字段的所有不同取值，用于筛选列表"""
     try:
-        return movie_dao.get_by_id(movie_id)
+        return movie_dao.get_distinct_values(field, split)
     except Exception as e:
-        logger.error(f"获取电影(ID={movie_id})失败: {e}")
+        logger.error("获取电影的%s字段取值失败: %s", field, e)
+        return []
+
+def get_movie(movie_id, columns=None):
+    """通过ID获取特定电影，字段投影无效时抛出ValueError"""
+    try:
+        return movie_dao.get_by_id(movie_id, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("获取电影(ID=%s)失败: %s", movie_id, e)
         return None
 
+def prepare_movie(movie_data):
+    """
+    将表单、API或导入文件中的电影数据映射为数据库记录（在原字典上修改，生成新ID和时间戳），
+    add_movie和批量导入共用
+
+    状态无效时抛出ValueError
+    """
+    movie_id = str(uuid.uuid4())
+    movie_data['id'] = movie_id
+    movie_data['created_at'] = datetime.now().isoformat()
+    movie_data['updated_at'] = datetime.now().isoformat()
+    
+    # 处理标签
+    if 'tags' in movie_data and isinstance(movie_data['tags'], list):
+        movie_data['tags'] = ','.join([tag.strip() for tag in movie_data['tags'] if tag.strip()])
+    elif 'tags' in movie_data and isinstance(movie_data['tags'], str):
+        tags = movie_data['tags'].split(',') if movie_data['tags'] else []
+        movie_data['tags'] = ','.join([tag.strip() for tag in tags if tag.strip()])
+        
+    # 处理导演字段，确保使用逗号分隔且没有空格
+    if 'director' in movie_data and isinstance(movie_data['director'], str):
+        directors = movie_data['director'].split(',') if movie_data['director'] else []
+        movie_data['director'] = ','.join([d.strip() for d in directors if d.strip()])
+        
+    # 处理演员字段，确保使用逗号分隔且没有空格
+    if 'cast' in movie_data and isinstance(movie_data['cast'], str):
+        actors = movie_data['cast'].split(',') if movie_data['cast'] else []
+        movie_data['cast'] = ','.join([a.strip() for a in actors if a.strip()])
+        
+    # 处理类型字段，确保使用逗号分隔且没有空格
+    if 'genre' in movie_data and isinstance(movie_data['genre'], str):
+        genres = movie_data['genre'].split(',') if movie_data['genre'] else []
+        movie_data['genre'] = ','.join([g.strip() for g in genres if g.strip()])
+    
+    # 状态保存为状态代码，缺少时为未看
+    movie_data['status'] = validate_status('movie', movie_data.get('status'))
+    
+    # 处理评分值
+    if 'rating' in movie_data:
+        try:
+            # 确保评分是浮点数
+            rating = float(movie_data['rating'])
+            # 确保评分在0-5之间
+            rating = max(0, min(5, rating))
+            # 保留一位小数
+            rating = round(rating * 10) / 10
+            movie_data['rating'] = rating
+            logger.debug("电影评分值(处理后): %s", movie_data['rating'])
+        except (ValueError, TypeError):
+            movie_data['rating'] = 0.0
+            logger.warning("评分转换失败，使用默认值0")
+    
+    # 移除不存在于数据库表中的字段
+    valid_fields = ['id', 'title', 'director', 'cast', 'year', 'genre', 'status', 
+                    'rating', 'notes', 'poster_url', 'tags', 'created_at', 'updated_at']
+    movie_data_copy = movie_data.copy()
+    for key in movie_data_copy:
+        if key not in valid_fields:
+            logger.debug("从电影数据中移除非数据库字段: %s", key)
+            del movie_data[key]
+    
+    return movie_data
+
 def add_movie(movie_data):
-    """添加新电影"""
+    """添加新电影，状态无效时不写入并返回None"""
     try:
-        movie_id = str(uuid.uuid4())
-        movie_data['id'] = movie_id
-        movie_data['created_at'] = datetime.now().isoformat()
-        movie_data['updated_at'] = datetime.now().isoformat()
-        
-        # 处理标签
-        if 'tags' in movie_data and isinstance(movie_data['tags'], list):
-            movie_data['tags'] = ','.join([tag.strip() for tag in movie_data['tags'] if tag.strip()])
-        elif 'tags' in movie_data and isinstance(movie_data['tags'], str):
-            tags = movie_data['tags'].split(',') if movie_data['tags'] else []
-            movie_data['tags'] = ','.join([tag.strip() for tag in tags if tag.strip()])
-            
-        # 处理导演字段，确保使用逗号分隔且没有空格
-        if 'director' in movie_data and isinstance(movie_data['director'], str):
-            directors = movie_data['director'].split(',') if movie_data['director'] else []
-            movie_data['director'] = ','.join([d.strip() for d in directors if d.strip()])
-            
-        # 处理演员字段，确保使用逗号分隔且没有空格
-        if 'cast' in movie_data and isinstance(movie_data['cast'], str):
-            actors = movie_data['cast'].split(',') if movie_data['cast'] else []
-            movie_data['cast'] = ','.join([a.strip() for a in actors if a.strip()])
-            
-        # 处理类型字段，确保使用逗号分隔且没有空格
-        if 'genre' in movie_data and isinstance(movie_data['genre'], str):
-            genres = movie_data['genre'].split(',') if movie_data['genre'] else []
-            movie_data['genre'] = ','.join([g.strip() for g in genres if g.strip()])
-        
-        # 记录状态值，帮助调试
-        if 'status' in movie_data:
-            logger.info(f"电影状态值: {movie_data['status']}")
-        else:
-            logger.warning("电影数据中缺少状态字段")
-            movie_data['status'] = '未看'  # 设置默认状态
-        
-        # 处理中文状态值
-        if movie_data.get('status') == '已看':
-            movie_data['status'] = 'watched'
-        elif movie_data.get('status') == '想看':
-            movie_data['status'] = 'wanting'
-        elif movie_data.get('status') == '未看':
-            movie_data['status'] = 'unwatched'
-        elif movie_data.get('status') not in ['watched', 'watching', 'unwatched', 'wanting']:
-            # 如果不是已知的英文状态，则设置默认值
-            logger.info(f"将未知电影状态 '{movie_data.get('status')}' 设置为 'unwatched'")
-            movie_data['status'] = 'unwatched'
-        
-        # 处理评分值
-        if 'rating' in movie_data:
-            try:
-                # 确保评分是浮点数
-                rating = float(movie_data['rating'])
-                # 确保评分在0-5之间
-                rating = max(0, min(5, rating))
-                # 保留一位小数
-                rating = round(rating * 10) / 10
-                movie_data['rating'] = rating
-                logger.info(f"电影评分值(处理后): {movie_data['rating']}")
-            except (ValueError, TypeError):
-                movie_data['rating'] = 0.0
-                logger.warning(f"评分转换失败，使用默认值0")
-        
-        # 移除不存在于数据库表中的字段
-        valid_fields = ['id', 'title', 'director', 'cast', 'year', 'genre', 'status', 
-                        'rating', 'notes', 'poster_url', 'tags', 'created_at', 'updated_at']
-        movie_data_copy = movie_data.copy()
-        for key in movie_data_copy:
-            if key not in valid_fields:
-                logger.info(f"从电影数据中移除非数据库字段: {key}")
-                del movie_data[key]
+        movie_data = prepare_movie(movie_data)
+        movie_id = movie_data['id']
         
         # 记录详细信息
-        logger.info(f"准备添加电影: {movie_data}")
+        logger.debug("准备添加电影: %s", movie_data)
         
         success = movie_dao.create(movie_data)
         if success:
-            logger.info(f"成功添加电影 ID={movie_id}")
+            logger.info("成功添加电影 ID=%s", movie_id)
             return movie_id
         else:
-            logger.error(f"添加电影失败，数据库操作未成功")
+            logger.error("添加电影失败，数据库操作未成功")
             return None
     except Exception as e:
-        logger.error(f"添加电影失败: {e}", exc_info=True)
+        logger.error("添加电影失败: %s", e, exc_info=True)
         return None
 
 def update_movie(movie_id, movie_data):
-    """更新电影信息"""
+    """更新电影信息，状态无效时不写入并返回False"""
     try:
         # 确保ID不被更改
         movie_data['id'] = movie_id
@@ -343,13 +390,9 @@ def update_movie(movie_id, movie_data):
             genres = movie_data['genre'].split(',') if movie_data['genre'] else []
             movie_data['genre'] = ','.join([g.strip() for g in genres if g.strip()])
         
-        # 处理中文状态值
-        if movie_data.get('status') == '已看':
-            movie_data['status'] = 'watched'
-        elif movie_data.get('status') == '想看':
-            movie_data['status'] = 'wanting'
-        elif movie_data.get('status') == '未看':
-            movie_data['status'] = 'unwatched'
+        # 状态保存为状态代码
+        if 'status' in movie_data:
+            movie_data['status'] = validate_status('movie', movie_data['status'])
         
         # 处理评分值
         if 'rating' in movie_data:
@@ -361,18 +404,14 @@ def update_movie(movie_id, movie_data):
                 # 保留一位小数
                 rating = round(rating * 10) / 10
                 movie_data['rating'] = rating
-                logger.info(f"更新电影评分值(处理后): {movie_data['rating']}")
+                logger.debug("更新电影评分值(处理后): %s", movie_data['rating'])
             except (ValueError, TypeError):
                 movie_data['rating'] = 0.0
-                logger.warning(f"更新评分转换失败，使用默认值0")
-        
-        # 记录状态值，帮助调试
-        if 'status' in movie_data:
-            logger.info(f"更新电影状态值: {movie_data['status']}")
+                logger.warning("更新评分转换失败，使用默认值0")
         
         return movie_dao.update(movie_id, movie_data)
     except Exception as e:
-        logger.error(f"更新电影(ID={movie_id})失败: {e}")
+        logger.error("更新电影(ID=%s)失败: %s", movie_id, e)
         return False
 
 def delete_movie(movie_id):
@@ -380,15 +419,17 @@ def delete_movie(movie_id):
     try:
         return movie_dao.delete(movie_id)
     except Exception as e:
-        logger.error(f"删除电影(ID={movie_id})失败: {e}")
+        logger.error("删除电影(ID=%s)失败: %s", movie_id, e)
         return False
 
-def search_movies(query):
-    """搜索电影"""
+def search_movies(query, limit=20, offset=0, filters=None):
+    """全文搜索电影，支持中文子串和拼音，按相关度排序，筛选条件无效时抛出ValueError"""
     try:
-        return movie_dao.search_movies(query)
+        return movie_dao.search_movies(query, limit, offset, filters)
+    except ValueError:
+        raise
     except Exception as e:
-        logger.error(f"搜索电影失败: {e}")
+        logger.error("搜索电影失败: %s", e)
         return []
 
 def get_movies_by_tag(tag):
@@ -396,7 +437,7 @@ def get_movies_by_tag(tag):
     try:
         return movie_dao.get_movies_by_tag(tag)
     except Exception as e:
-        logger.error(f"获取标签为'{tag}'的电影失败: {e}")
+        logger.error("获取标签为'%s'的电影失败: %s", tag, e)
         return []
 
 def get_movies_by_status(status):
@@ -404,7 +445,7 @@ def get_movies_by_status(status):
     try:
         return movie_dao.get_movies_by_status(status)
     except Exception as e:
-        logger.error(f"获取状态为'{status}'的电影失败: {e}")
+        logger.error("获取状态为'%s'的电影失败: %s", status, e)
         return []
 
 def get_movie_tags():
@@ -412,7 +453,7 @@ def get_movie_tags():
     try:
         return movie_dao.get_all_tags()
     except Exception as e:
-        logger.error(f"获取所有电影标签失败: {e}")
+        logger.error("获取所有电影标签失败: %s", e)
         return []
 
 # 音乐相关函数
@@ -421,111 +462,127 @@ def get_all_music():
     try:
         return music_dao.get_all()
     except Exception as e:
-        logger.error(f"获取所有音乐失败: {e}")
+        logger.error("获取所有音乐失败: %s", e)
         return []
 
-def get_music(music_id):
-    """通过ID获取特定音乐"""
+def get_music_page(order_by='created_at', after_cursor=None, limit=50, filters=None, columns=None):
+    """分页获取音乐，排序字段、筛选条件、游标或字段投影无效时抛出ValueError"""
+    try:
+        return music_dao.get_page(order_by, after_cursor, limit, filters, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("分页获取音乐失败: %s", e)
+        return {'items': [], 'next_cursor': None}
+
+def get_music_field_values(field, split=False):
+    """获取音乐某字段的所有不同取值，用于筛选列表"""
     try:
-        return music_dao.get_by_id(music_id)
+        return music_dao.get_distinct_values(field, split)
     except Exception as e:
-        logger.error(f"获取音乐(ID={music_id})失败: {e}")
+        logger.error("获取音乐的%s字段取值失败: %s", field, e)
+        return []
+
+def get_music(music_id, columns=None):
+    """通过ID获取特定音乐，字段投影无效时抛出ValueError"""
+    try:
+        return music_dao.get_by_id(music_id, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("获取音乐(ID=%s)失败: %s", music_id, e)
         return None
 
+def prepare_music(music_data):
+    """
+    将表单、API或导入文件中的音乐数据映射为数据库记录（在原字典上修改，生成新ID和时间戳），
+    add_music和批量导入共用
+
+    状态无效时抛出ValueError
+    """
+    music_id = str(uuid.uuid4())
+    music_data['id'] = music_id
+    music_data['created_at'] = datetime.now().isoformat()
+    music_data['updated_at'] = datetime.now().isoformat()
+    
+    # 处理标签
+    if 'tags' in music_data and isinstance(music_data['tags'], str):
+        # 如果tags是字符串，确保它是逗号分隔的，且没有空格
+        if music_data['tags']:
+            # 先分割标签
+            tags = music_data['tags'].replace(", ", ",").split(',')
+            # 去除每个标签前后空格，并过滤空标签
+            clean_tags = [tag.strip() for tag in tags if tag.strip()]
+            # 重新组合成逗号分隔的字符串，不带空格
+            music_data['tags'] = ','.join(clean_tags)
+    elif 'tags' in music_data and isinstance(music_data['tags'], list):
+        # 如果是列表，确保每个元素都没有前后空格
+        clean_tags = [tag.strip() for tag in music_data['tags'] if tag.strip()]
+        music_data['tags'] = ','.join(clean_tags)
+    
+    # 同样处理genre字段，确保与tags保持一致的格式
+    if 'genre' in music_data and isinstance(music_data['genre'], str):
+        if music_data['genre']:
+            # 处理genre字符串，确保没有空格
+            genre = music_data['genre'].replace(", ", ",").split(',')
+            clean_genre = [g.strip() for g in genre if g.strip()]
+            music_data['genre'] = ','.join(clean_genre)
+    
+    # 确保有title字段
+    if 'album' in music_data and not music_data.get('title'):
+        music_data['title'] = music_data['album']
+    
+    # 状态保存为状态代码，缺少时为未听
+    music_data['status'] = validate_status('music', music_data.get('status'))
+    
+    # 处理评分值
+    if 'rating' in music_data:
+        try:
+            # 确保评分是浮点数
+            rating = float(music_data['rating'])
+            # 确保评分在0-5之间
+            rating = max(0, min(5, rating))
+            # 保留一位小数
+            rating = round(rating * 10) / 10
+            music_data['rating'] = rating
+            logger.debug("音乐评分值(处理后): %s", music_data['rating'])
+        except (ValueError, TypeError):
+            music_data['rating'] = 0.0
+            logger.warning("评分转换失败，使用默认值0")
+    
+    # 移除不存在于数据库表中的字段
+    valid_fields = ['id', 'title', 'artist', 'album', 'year', 'genre', 'status', 
+                    'rating', 'notes', 'cover_url', 'tags', 'created_at', 'updated_at']
+    music_data_copy = music_data.copy()
+    for key in music_data_copy:
+        if key not in valid_fields:
+            logger.debug("从音乐数据中移除非数据库字段: %s", key)
+            del music_data[key]
+    
+    return music_data
+
 def add_music(music_data):
-    """添加新音乐"""
+    """添加新音乐，状态无效时不写入并返回None"""
     try:
-        music_id = str(uuid.uuid4())
-        music_data['id'] = music_id
-        music_data['created_at'] = datetime.now().isoformat()
-        music_data['updated_at'] = datetime.now().isoformat()
-        
-        # 处理标签
-        if 'tags' in music_data and isinstance(music_data['tags'], str):
-            # 如果tags是字符串，确保它是逗号分隔的，且没有空格
-            if music_data['tags']:
-                # 先分割标签
-                tags = music_data['tags'].replace(", ", ",").split(',')
-                # 去除每个标签前后空格，并过滤空标签
-                clean_tags = [tag.strip() for tag in tags if tag.strip()]
-                # 重新组合成逗号分隔的字符串，不带空格
-                music_data['tags'] = ','.join(clean_tags)
-        elif 'tags' in music_data and isinstance(music_data['tags'], list):
-            # 如果是列表，确保每个元素都没有前后空格
-            clean_tags = [tag.strip() for tag in music_data['tags'] if tag.strip()]
-            music_data['tags'] = ','.join(clean_tags)
-        
-        # 同样处理genre字段，确保与tags保持一致的格式
-        if 'genre' in music_data and isinstance(music_data['genre'], str):
-            if music_data['genre']:
-                # 处理genre字符串，确保没有空格
-                genre = music_data['genre'].replace(", ", ",").split(',')
-                clean_genre = [g.strip() for g in genre if g.strip()]
-                music_data['genre'] = ','.join(clean_genre)
-        
-        # 确保有title字段
-        if 'album' in music_data and not music_data.get('title'):
-            music_data['title'] = music_data['album']
-        
-        # 记录状态值，帮助调试
-        if 'status' in music_data:
-            logger.info(f"音乐状态值: {music_data['status']}")
-        else:
-            logger.warning("音乐数据中缺少状态字段")
-            music_data['status'] = '未听'  # 设置默认状态
-        
-        # 处理中文状态值
-        if music_data.get('status') == '已听':
-            music_data['status'] = 'listened'
-        elif music_data.get('status') == '想听':
-            music_data['status'] = 'wanting'
-        elif music_data.get('status') == '未听':
-            music_data['status'] = 'unlistened'
-        elif music_data.get('status') not in ['listened', 'listening', 'unlistened', 'wanting']:
-            # 如果不是已知的英文状态，则设置默认值
-            logger.info(f"将未知音乐状态 '{music_data.get('status')}' 设置为 'unlistened'")
-            music_data['status'] = 'unlistened'
-        
-        # 处理评分值
-        if 'rating' in music_data:
-            try:
-                # 确保评分是浮点数
-                rating = float(music_data['rating'])
-                # 确保评分在0-5之间
-                rating = max(0, min(5, rating))
-                # 保留一位小数
-                rating = round(rating * 10) / 10
-                music_data['rating'] = rating
-                logger.info(f"音乐评分值(处理后): {music_data['rating']}")
-            except (ValueError, TypeError):
-                music_data['rating'] = 0.0
-                logger.warning(f"评分转换失败，使用默认值0")
-        
-        # 移除不存在于数据库表中的字段
-        valid_fields = ['id', 'title', 'artist', 'album', 'year', 'genre', 'status', 
-                        'rating', 'notes', 'cover_url', 'tags', 'created_at', 'updated_at']
-        music_data_copy = music_data.copy()
-        for key in music_data_copy:
-            if key not in valid_fields:
-                logger.info(f"从音乐数据中移除非数据库字段: {key}")
-                del music_data[key]
+        music_data = prepare_music(music_data)
+        music_id = music_data['id']
         
         # 记录详细信息
-        logger.info(f"准备添加音乐: {music_data}")
+        logger.debug("准备添加音乐: %s", music_data)
         
         success = music_dao.create(music_data)
         if success:
-            logger.info(f"成功添加音乐 ID={music_id}")
+            logger.info("成功添加音乐 ID=%s", music_id)
             return music_id
         else:
-            logger.error(f"添加音乐失败，数据库操作未成功")
+            logger.error("添加音乐失败，数据库操作未成功")
             return None
     except Exception as e:
-        logger.error(f"添加音乐失败: {e}", exc_info=True)
+        logger.error("添加音乐失败: %s", e, exc_info=True)
         return None
 
 def update_music(music_id, music_data):
-    """更新音乐信息"""
+    """更新音乐信息，状态无效时不写入并返回False"""
     try:
         # 确保ID不被更改
         music_data['id'] = music_id
@@ -539,13 +596,9 @@ def update_music(music_id, music_data):
         if 'album' in music_data and not music_data.get('title'):
             music_data['title'] = music_data['album']
             
-        # 处理中文状态值
-        if music_data.get('status') == '已听':
-            music_data['status'] = 'listened'
-        elif music_data.get('status') == '想听':
-            music_data['status'] = 'wanting'
-        elif music_data.get('status') == '未听':
-            music_data['status'] = 'unlistened'
+        # 状态保存为状态代码
+        if 'status' in music_data:
+            music_data['status'] = validate_status('music', music_data['status'])
         
         # 处理评分值
         if 'rating' in music_data:
@@ -557,18 +610,14 @@ def update_music(music_id, music_data):
                 # 保留一位小数
                 rating = round(rating * 10) / 10
                 music_data['rating'] = rating
-                logger.info(f"更新音乐评分值(处理后): {music_data['rating']}")
+                logger.debug("更新音乐评分值(处理后): %s", music_data['rating'])
             except (ValueError, TypeError):
                 music_data['rating'] = 0.0
-                logger.warning(f"更新评分转换失败，使用默认值0")
-        
-        # 记录状态值，帮助调试
-        if 'status' in music_data:
-            logger.info(f"更新音乐状态值: {music_data['status']}")
+                logger.warning("更新评分转换失败，使用默认值0")
         
         return music_dao.update(music_id, music_data)
     except Exception as e:
-        logger.error(f"更新音乐(ID={music_id})失败: {e}")
+        logger.error("更新音乐(ID=%s)失败: %s", music_id, e)
         return False
 
 def delete_music(music_id):
@@ -576,15 +625,17 @@ def delete_music(music_id):
     try:
         return music_dao.delete(music_id)
     except Exception as e:
-        logger.error(f"删除音乐(ID={music_id})失败: {e}")
+        logger.error("删除音乐(ID=%s)失败: %s", music_id, e)
         return False
 
-def search_music(query):
-    """搜索音乐"""
+def search_music(query, limit=20, offset=0, filters=None):
+    """全文搜索音乐，支持中文子串和拼音，按相关度排序，筛选条件无效时抛出ValueError"""
     try:
-        return music_dao.search_music(query)
+        return music_dao.search_music(query, limit, offset, filters)
+    except ValueError:
+        raise
     except Exception as e:
-        logger.error(f"搜索音乐失败: {e}")
+        logger.error("搜索音乐失败: %s", e)
         return []
 
 def get_music_by_tag(tag):
@@ -592,7 +643,7 @@ def get_music_by_tag(tag):
     try:
         return music_dao.get_music_by_tag(tag)
     except Exception as e:
-        logger.error(f"获取标签为'{tag}'的音乐失败: {e}")
+        logger.error("获取标签为'%s'的音乐失败: %s", tag, e)
         return []
 
 def get_music_by_artist(artist):
@@ -600,7 +651,7 @@ def get_music_by_artist(artist):
     try:
         return music_dao.get_music_by_artist(artist)
     except Exception as e:
-        logger.error(f"获取艺术家为'{artist}'的音乐失败: {e}")
+        logger.error("获取艺术家为'%s'的音乐失败: %s", artist, e)
         return []
 
 def get_music_by_album(album):
@@ -608,7 +659,7 @@ def get_music_by_album(album):
     try:
         return music_dao.get_music_by_album(album)
     except Exception as e:
-        logger.error(f"获取专辑为'{album}'的音乐失败: {e}")
+        logger.error("获取专辑为'%s'的音乐失败: %s", album, e)
         return []
 
 def get_music_tags():
@@ -616,7 +667,7 @@ def get_music_tags():
     try:
         return music_dao.get_all_tags()
     except Exception as e:
-        logger.error(f"获取所有音乐标签失败: {e}")
+        logger.error("获取所有音乐标签失败: %s", e)
         return []
 
 def get_music_artists():
@@ -624,7 +675,7 @@ def get_music_artists():
     try:
         return music_dao.get_all_artists()
     except Exception as e:
-        logger.error(f"获取所有艺术家失败: {e}")
+        logger.error("获取所有艺术家失败: %s", e)
         return []
 
 def get_music_albums():
@@ -632,5 +683,207 @@ def get_music_albums():
     try:
         return music_dao.get_all_albums()
     except Exception as e:
-        logger.error(f"获取所有专辑失败: {e}")
-        return [] 
\ No newline at end of file
+        logger.error("获取所有专辑失败: %s", e)
+        return [] 
+# 筛选项
+FACET_DAOS = {'book': book_dao, 'movie': movie_dao, 'music': music_dao}
+
+def filter_names(media_type):
+    """某类条目支持的筛选条件名（DAO的FILTERS）"""
+    return tuple(FACET_DAOS[media_type].FILTERS)
+
+def get_facets(media_type, filters=None, names=None):
+    """
+    获取某类条目筛选项的取值及条目数，用于列表页的筛选下拉框
+
+    参数:
+    media_type (str): book、movie或music
+    filters (dict): 只统计符合筛选条件的条目
+    names (list): 筛选项名，默认为全部筛选项
+
+    返回:
+    dict: 筛选项名 -> [{'value': 取值, 'count': 条目数}, ...]
+
+    条目类型、筛选项名或筛选条件无效时抛出ValueError
+    """
+    dao = FACET_DAOS.get(media_type)
+    if dao is None:
+        raise ValueError(f"不支持的条目类型: {media_type}")
+    try:
+        return dao.get_facets(names, filters)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("获取%s的筛选项失败: %s", media_type, e)
+        return {}
+
+def get_media_dao(media_type):
+    """按条目类型（book、movie、music）或表名（books、movies、music）获取DAO，未知时抛出ValueError"""
+    dao = FACET_DAOS.get(media_type)
+    if dao is None:
+        dao = next((dao for dao in FACET_DAOS.values() if dao.table_name == media_type), None)
+    if dao is None:
+        raise ValueError(f"不支持的条目类型: {media_type}")
+    return dao
+
+# 导出
+def export_items(media_type, columns=None, filters=None):
+    """
+    逐批读取某类条目，用于流式导出（见BaseDAO.iter_rows）
+
+    参数:
+    media_type (str): book、movie、music或对应的表名books、movies、music
+    columns: 字段投影或字段名列表，None表示全部字段
+    filters (dict): 筛选条件
+
+    返回:
+    tuple: (字段名列表, 记录字典的迭代器)
+
+    条目类型、字段或筛选条件无效时抛出ValueError
+    """
+    return get_media_dao(media_type).iter_rows(columns, filters)
+
+# 批量获取
+def get_items(media_type, ids, columns=None):
+    """
+    按ID列表获取多条记录（见BaseDAO.get_many）
+
+    返回:
+    dict: {'items': 找到的记录（按ids的顺序）, 'missing': 不存在的ID列表}
+
+    条目类型或字段投影无效时抛出ValueError
+    """
+    dao = get_media_dao(media_type)
+    try:
+        items = dao.get_many(ids, columns)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("批量获取%s失败: %s", media_type, e)
+        items = []
+    found = {item['id'] for item in items}
+    return {'items': items, 'missing': [id for id in dict.fromkeys(ids) if id not in found]}
+
+# 批量修改
+def batch_update_items(media_type, ids, changes=None, add_tags=(), remove_tags=()):
+    """
+    在一个事务中批量修改多条记录的字段（状态、评分、是否拥有等）并添加/移除标签（见BaseDAO.update_many）
+
+    参数:
+    media_type (str): book、movie、music或对应的表名
+    ids (list): 记录ID
+    changes (dict): 字段 -> 新值，状态可以是代码或名称
+    add_tags (list): 添加的标签
+    remove_tags (list): 移除的标签
+
+    返回:
+    dict: {'updated': 找到的记录数, 'missing': 不存在的ID列表}，写入失败时为None
+
+    条目类型、字段或取值无效时抛出ValueError
+    """
+    dao = get_media_dao(media_type)
+    changes = dict(changes or {})
+    if 'status' in changes:
+        changes['status'] = validate_status(dao.ITEM_TYPE, changes['status'])
+    if changes.get('rating') is not None:
+        try:
+            changes['rating'] = float(changes['rating'])
+        except (TypeError, ValueError):
+            raise ValueError(f"无效的评分: {changes['rating']}")
+    if changes or add_tags or remove_tags:
+        changes['updated_at'] = datetime.now().isoformat()
+    try:
+        return dao.update_many(ids, changes, add_tags, remove_tags)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error("批量修改%s失败: %s", media_type, e)
+        return None
+
+# 批量导入
+PREPARE_FUNCTIONS = {'book': prepare_book, 'movie': prepare_movie, 'music': prepare_music}
+
+# 导入的记录中保留原值的字段（prepare_*会生成新值）
+IMPORT_KEPT_FIELDS = ('id', 'created_at', 'updated_at')
+# prepare_*为缺少的字段填入默认值的字段 -> 提供该字段的输入字段；on_conflict='update'时，已有记录
+# 的导入记录中没有这些输入字段则不写入默认值，保留原来的取值
+IMPORT_DEFAULTED_FIELDS = {'created_at': ('created_at',), 'status': ('status', 'state')}
+
+def import_items(media_type, records, on_conflict='ignore', batch_size=BULK_BATCH_SIZE):
+    """
+    批量导入某类条目
+
+    参数:
+    media_type (str): book、movie、music或对应的表名
+    records: (行号, 记录字典, 错误信息)的迭代器，见app/bulk_import.py
+    on_conflict (str): 记录带有已存在的ID时的处理方式，见BaseDAO.create_many
+    batch_size (int): 每个事务写入的记录数
+
+    返回:
+    迭代器: 每条记录的处理结果{'line': 行号, 'id': ID, 'result': inserted/ignored/replaced/updated/failed,
+            'error': 失败原因}，每批写入提交后按输入顺序产生该批的结果
+
+    条目类型或冲突处理方式无效时立即抛出ValueError
+    """
+    dao = get_media_dao(media_type)
+    if on_conflict not in CONFLICT_OUTCOMES:
+        raise ValueError(f"不支持的冲突处理方式: {on_conflict}")
+    return _import_batches(dao, PREPARE_FUNCTIONS[dao.ITEM_TYPE], records, on_conflict, max(1, int(batch_size)))
+
+def _import_batches(dao, prepare, records, on_conflict, batch_size):
+    pending = []  # 当前批次中每条记录的结果，待写入的记录result为None
+    rows = []
+    for line, record, error in records:
+        if record is not None:
+            try:
+                kept = {field: record[field] for field in IMPORT_KEPT_FIELDS if record.get(field)}
+                if 'id' in kept:
+                    # JSON中的数字ID（如{"id": 5}）按文本处理，与表中TEXT类型的ID比较
+                    kept['id'] = str(kept['id'])
+                row = prepare(dict(record))
+                row.update(kept)
+                defaulted = [field for field, sources in IMPORT_DEFAULTED_FIELDS.items()
+                             if not any(record.get(source) for source in sources)]
+            except Exception as e:
+                error = str(e)
+        if error:
+            pending.append({'line': line, 'id': record.get('id') if record else None, 'result': FAILED, 'error': error})
+        else:
+            pending.append({'line': line, 'id': row['id'], 'result': None})
+            rows.append((row, defaulted))
+        if len(rows) >= batch_size:
+            yield from _flush_import_batch(dao, rows, pending, on_conflict)
+            pending, rows = [], []
+    yield from _flush_import_batch(dao, rows, pending, on_conflict)
+
+def _flush_import_batch(dao, rows, pending, on_conflict):
+    if on_conflict == 'update' and rows:
+        # 更新已有记录时不用默认值覆盖原来的取值
+        existing = dao.existing_ids([row['id'] for row, _ in rows])
+        for row, defaulted in rows:
+            if row['id'] in existing:
+                for field in defaulted:
+                    row.pop(field, None)
+    rows = [row for row, _ in rows]
+    outcomes = iter(dao.create_many(rows, on_conflict=on_conflict) if rows else [])
+    for entry in pending:
+        if entry['result'] is None:
+            entry['result'] = next(outcomes)
+            if entry['result'] == FAILED:
+                entry['error'] = '写入数据库失败'
+        yield entry
+
+# 首页概览
+def get_dashboard_summary(limit=DEFAULT_RECENT_LIMIT):
+    """
+    获取首页概览：各类条目最近添加的记录、条目总数和各状态的条目数（见app/dao/dashboard.py）
+
+    结果在查询缓存中保存到任一类条目被写入为止
+    """
+    tables = tuple(dao.table_name for dao in FACET_DAOS.values())
+    try:
+        return query_cache.get_or_compute(tables, 'dashboard', limit,
+                                          lambda: dashboard.get_dashboard_summary(FACET_DAOS, limit))
+    except Exception as e:
+        logger.error("获取首页概览失败: %s", e)
+        return {media_type: {'recent': [], 'total': 0, 'statuses': []} for media_type in FACET_DAOS}
@@ -0,0 +1,49 @@
+"""
+拼音搜索文本
+
+为标题、作者等字段预先生成全拼和首字母，写入search_pinyin字段并加入全文索引，
+搜索"santi"或"st"即可找到"三体"。pypinyin列在requirements.txt中；未安装时不生成拼音
+（启动时记录警告），搜索仍可按原文（包括中文子串）匹配。
+"""
+
+import re
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# 包含汉字的文本才需要生成拼音
+HAN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+
+def pinyin_available():
+    """是否已安装pypinyin"""
+    return lazy_pinyin is not None
+
+def warn_if_unavailable(logger):
+    """未安装pypinyin时记录警告，否则拼音搜索会在没有任何提示的情况下失效"""
+    if lazy_pinyin is None:
+        logger.warning("未安装pypinyin，不会生成拼音索引，拼音和首字母搜索不可用；请执行 pip install -r requirements.txt")
+
+def to_search_pinyin(*texts):
+    """
+    生成搜索用的拼音文本
+
+    每段包含汉字的文本生成"全拼 首字母"，例如("三体", "刘慈欣") -> "santi st liucixin lcx"；
+    文本中的英文单词按原样拼接，首字母取每个单词的首字母。
+
+    返回:
+    str: 拼音文本，未安装pypinyin或没有包含汉字的文本时返回None
+    """
+    if lazy_pinyin is None:
+        return None
+
+    parts = []
+    for text in texts:
+        if not text or not HAN_PATTERN.search(str(text)):
+            continue
+        words = [word.lower() for chunk in lazy_pinyin(str(text)) for word in chunk.split()]
+        if words:
+            parts.append(''.join(words))
+            parts.append(''.join(word[0] for word in words))
+    return ' '.join(parts) or None
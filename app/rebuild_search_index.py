@@ -0,0 +1,38 @@
+import sys
+import logging
+import argparse
+from app.dao.book_dao import BookDAO
+from app.dao.movie_dao import MovieDAO
+from app.dao.music_dao import MusicDAO
+from app.pinyin import warn_if_unavailable
+
+# 设置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def rebuild_search_index(check_only=False):
+    """
+    重建书籍、电影和音乐的全文索引
+
+    参数:
+    check_only (bool): 只检查索引是否与数据一致，不重建
+
+    返回:
+    bool: 全部成功（或全部一致）时返回True
+    """
+    warn_if_unavailable(logger)
+    success = True
+    for dao in (BookDAO(), MovieDAO(), MusicDAO()):
+        if check_only:
+            consistent = dao.check_search_index()
+            logger.info("%s全文索引%s", dao.table_name, '一致' if consistent else '不一致')
+            success = success and consistent
+        else:
+            success = dao.rebuild_search_index() and success
+    return success
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='重建全文搜索索引')
+    parser.add_argument('--check', action='store_true', help='只检查索引是否与数据一致')
+    args = parser.parse_args()
+    sys.exit(0 if rebuild_search_index(args.check) else 1)
@@ -1,16 +1,27 @@
-from flask import render_template, request, jsonify, redirect, url_for, flash, send_from_directory, abort
+from flask import (render_template, request, jsonify, redirect, url_for, flash, send_from_directory, abort,
+                   stream_with_context)
 from app import app
-from app.models import (get_all_books, get_book, add_book, update_book, delete_book,
-                       get_all_movies, get_movie, add_movie, update_movie, delete_movie,
-                       get_all_music, get_music, add_music, update_music, delete_music,
-                       search_books, search_movies, search_music)
+from app.models import (get_book, add_book, update_book, delete_book,
+                       get_movie, add_movie, update_movie, delete_movie,
+                       get_music, add_music, update_music, delete_music,
+                       search_books, search_movies, search_music,
+                       get_books_page, get_movies_page, get_music_page,
+                       get_facets, filter_names, get_dashboard_summary, export_items, import_items,
+                       batch_update_items, get_items)
 from datetime import datetime
 import os
+import json
 from werkzeug.utils import secure_filename
 import time
 from app.utils import get_common_genres, get_image_url, format_date
+from app.status import default_status, status_label, status_options
+from app.dao.cache import query_cache
+from app.conditional import conditional
+from app.export import EXPORT_FORMATS, export_response
+from app.bulk_import import detect_format, parse_records
 # 导入豆瓣服务
 from app.douban.service import DoubanService
+from app.douban.cache import http_cache
 
 # 初始化豆瓣服务
 douban_service = DoubanService()
@@ -28,6 +39,89 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# 列表页每页条数
+PAGE_SIZE = 60
+# API列表接口默认和最大每页条数
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+
+def get_page_args(default_limit, max_limit, default_sort='created_at'):
+    """从查询参数中读取分页参数(sort, cursor, limit)"""
+    order_by = request.args.get('sort', default_sort)
+    cursor = request.args.get('cursor') or None
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        limit = default_limit
+    return order_by, cursor, min(max(limit, 1), max_limit)
+
+# 字段投影名称，见BaseDAO.select_columns
+PROJECTIONS = ('list', 'card', 'detail')
+
+def get_fields_arg(default):
+    """从查询参数fields读取字段投影：投影名称或逗号分隔的字段名，未指定时返回default"""
+    fields = request.args.get('fields', '').strip()
+    if not fields:
+        return default
+    if fields in PROJECTIONS:
+        return fields
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+# 不属于筛选条件的查询参数
+RESERVED_ARGS = ('q', 'sort', 'cursor', 'limit', 'offset', 'fields', 'type', 'facets', 'format', 'gzip', 'ids')
+
+def get_filter_args(allowed=None):
+    """
+    从查询参数中读取筛选条件，同名参数出现多次时取值为列表（如tag=科幻&tag=小说）
+    
+    API未指定allowed，条件名由DAO校验，未知的参数返回400；HTML页面传入该类条目的条件名（filter_names），
+    忽略其他参数（如utm_source、page），外部链接带上跟踪参数时页面仍可正常显示
+    """
+    filters = {}
+    for name in request.args:
+        if name in RESERVED_ARGS or (allowed is not None and name not in allowed):
+            continue
+        values = [value.strip() for value in request.args.getlist(name) if value.strip()]
+        if values:
+            filters[name] = values if len(values) > 1 else values[0]
+    return filters
+
+def get_ids_arg():
+    """从查询参数ids读取ID列表（逗号分隔，也可以重复ids参数）"""
+    return [id.strip() for value in request.args.getlist('ids') for id in value.split(',') if id.strip()]
+
+def items_json(table, ids, fields):
+    """按ID列表批量获取记录的JSON响应：{'items': 按请求顺序的记录, 'missing': 不存在的ID}"""
+    try:
+        return jsonify(get_items(table, ids, columns=fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+def facet_options(media_type, *names):
+    """筛选下拉框和表单的取值列表（读取facet_counts表，覆盖全部条目而不仅是当前页）"""
+    facets = get_facets(media_type, names=names)
+    return [[facet['value'] for facet in facets.get(name, [])] for name in names]
+
+def search_page(search_func, query, cursor, limit, filters=None):
+    """列表页的搜索结果分页，游标为结果偏移量"""
+    try:
+        offset = max(int(cursor or 0), 0)
+    except ValueError:
+        abort(400)
+    items = search_func(query, limit + 1, offset, filters=filters)
+    next_cursor = str(offset + limit) if len(items) > limit else None
+    return {'items': items[:limit], 'next_cursor': next_cursor}
+
+def paged_json(page):
+    """分页列表的JSON响应，下一页游标通过X-Next-Cursor和Link响应头返回"""
+    response = jsonify(page['items'])
+    if page['next_cursor']:
+        args = request.args.to_dict(flat=False)
+        args['cursor'] = page['next_cursor']
+        response.headers['X-Next-Cursor'] = page['next_cursor']
+        response.headers['Link'] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return response
+
 # 添加全局上下文处理器，为所有模板添加now变量
 @app.context_processor
 def inject_now():
@@ -43,82 +137,50 @@ def inject_image_url():
 def inject_format_date():
     return {'format_date': format_date}
 
+# 添加全局上下文处理器，为所有模板添加状态的显示名称和选项
+@app.context_processor
+def inject_status():
+    return {'status_label': status_label, 'status_options': status_options}
+
 # 页面路由
 @app.route('/')
+@conditional()
 def index():
-    recent_books = sorted(get_all_books(), key=lambda x: x.get('created_at', ''), reverse=True)[:3]
-    recent_movies = sorted(get_all_movies(), key=lambda x: x.get('created_at', ''), reverse=True)[:3]
-    recent_music = sorted(get_all_music(), key=lambda x: x.get('created_at', ''), reverse=True)[:3]
+    summary = get_dashboard_summary()
     return render_template('index.html', 
-                           recent_books=recent_books,
-                           recent_movies=recent_movies,
-                           recent_music=recent_music)
+                           recent_books=summary['book']['recent'],
+                           recent_movies=summary['movie']['recent'],
+                           recent_music=summary['music']['recent'],
+                           summary=summary)
 
 @app.route('/books')
+@conditional('books')
 def books():
-    books = get_all_books()
-    
-    # 处理状态显示
-    for book in books:
-        # 打印原始状态值，帮助调试
-        logger.info(f"图书页面 - 原始状态值: {book.get('status')}")
-        
-        # 将旧的状态值映射到新的状态值
-        if book.get('status') == 'unread':
-            book['status'] = '未读'
-        elif book.get('status') == 'reading':
-            book['status'] = '在读'
-        elif book.get('status') == 'read':
-            book['status'] = '读过'
-        # 确保"想读"、"在读"和"读过"状态保持不变
-        elif book.get('status') != '想读' and book.get('status') != '在读' and book.get('status') != '读过' and book.get('status') != '未读':
-            # 如果状态不是已知的中文状态，则默认设为"未读"
-            logger.info(f"图书页面 - 状态值不是已知的中文状态，设为未读: {book.get('status')}")
-            book['status'] = '未读'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"图书页面 - 处理后状态值: {book.get('status')}")
-    
-    # 获取所有唯一的分类标签
-    all_genres = set()
-    for book in books:
-        if book.get('tags'):
-            genres = [tag.strip() for tag in book['tags'].split(',')]
-            all_genres.update(genres)
+    order_by, cursor, limit = get_page_args(PAGE_SIZE, PAGE_SIZE)
+    query = request.args.get('q', '').strip()
+    filters = get_filter_args(filter_names('book'))
+    try:
+        if query:
+            page = search_page(search_books, query, cursor, limit, filters=filters)
+        else:
+            page = get_books_page(order_by, cursor, limit, filters=filters, columns='list')
+    except ValueError:
+        abort(400)
+    books = page['items']
     
-    # 获取所有唯一的作者
-    all_authors = set()
-    for book in books:
-        if book.get('author'):
-            all_authors.add(book['author'])
+    # 筛选列表覆盖所有书籍，而不仅是当前页
+    genres, authors = facet_options('book', 'tag', 'author')
     
-    return render_template('books.html', books=books, genres=sorted(all_genres), authors=sorted(all_authors))
+    return render_template('books.html', books=books, genres=genres, authors=authors,
+                           next_cursor=page['next_cursor'])
 
 @app.route('/books/<string:book_id>')
+@conditional('books')
 def book_detail(book_id):
     book = get_book(book_id)
     if not book:
         abort(404)
     
-    # 打印原始状态值，帮助调试
-    logger.info(f"书籍详情页 - 原始状态值: {book.get('status')}")
-    
-    # 处理状态显示
-    if book.get('status') == 'unread':
-        book['status'] = '未读'
-    elif book.get('status') == 'reading':
-        book['status'] = '在读'
-    elif book.get('status') == 'read':
-        book['status'] = '读过'
-    # 确保"想读"状态保持不变
-    elif book.get('status') != '想读' and book.get('status') != '在读' and book.get('status') != '读过' and book.get('status') != '未读':
-        # 如果状态不是已知的中文状态，则默认设为"未读"
-        logger.info(f"书籍详情页 - 状态值不是已知的中文状态，设为未读: {book.get('status')}")
-        book['status'] = '未读'
-    
-    # 打印处理后的状态值，帮助调试
-    logger.info(f"书籍详情页 - 处理后状态值: {book.get('status')}")
-    
     return render_template('book_detail.html', book=book)
 
 @app.route('/books/add', methods=['GET', 'POST'])
@@ -190,15 +252,7 @@ def add_book_route():
             flash('添加图书失败，请检查输入数据。', 'danger')
     
     # 获取所有唯一的分类标签用于表单复选框
-    all_books = get_all_books()
-    unique_genres = set()
-    for book in all_books:
-        if book.get('tags'):
-            genres = [g.strip() for g in book.get('tags').split(',')]
-            for genre in genres:
-                if genre:
-                    unique_genres.add(genre)
-    unique_genres = sorted(list(unique_genres))
+    unique_genres, = facet_options('book', 'tag')
     
     # 创建空的book对象，避免模板中的book变量未定义错误
     empty_book = {
@@ -206,7 +260,7 @@ def add_book_route():
         'author': '',
         'publisher': '',
         'publish_date': '',
-        'status': '未读',
+        'status': default_status('book'),
         'rating': 0,
         'notes': '',
         'cover_url': '',
@@ -267,40 +321,14 @@ def toggle_book_favorite(book_id):
 def edit_book(book_id):
     book = get_book(book_id)
     
-    # 在GET请求时，确保状态显示正确
-    if request.method == 'GET' and book:
-        # 打印原始状态值，帮助调试
-        print(f"编辑书籍 - 原始状态值: {book.get('status')}")
-        
-        # 处理状态显示
-        if book.get('status') == 'unread':
-            book['status'] = '未读'
-        elif book.get('status') == 'reading':
-            book['status'] = '在读'
-        elif book.get('status') == 'read':
-            book['status'] = '读过'
-        # 确保"想读"状态保持不变
-        elif book.get('status') != '想读' and book.get('status') != '在读' and book.get('status') != '读过' and book.get('status') != '未读':
-            # 如果状态不是已知的中文状态，则默认设为"未读"
-            book['status'] = '未读'
-        
-        # 打印处理后的状态值，帮助调试
-        print(f"编辑书籍 - 处理后状态值: {book.get('status')}")
-    
     if request.method == 'POST':
         # 获取表单数据
         title = request.form.get('title')
         author = request.form.get('author')
         publish_date = request.form.get('year', '')
         
-        # 获取状态值
+        # 获取状态值（由update_book校验）
         status = request.form.get('status')
-        print(f"表单提交 - 状态值: {status}")
-        
-        # 如果状态不是有效的选项之一，则设为默认值"未读"
-        if status not in ['未读', '想读', '在读', '读过']:
-            status = '未读'
-            print(f"状态值无效，设为默认值: {status}")
         
         # 处理分类标签（包括复选框和自定义输入）
         genre_tags = request.form.getlist('genre_tags')
@@ -336,7 +364,7 @@ def edit_book(book_id):
             'author': author,
             'publisher': request.form.get('publisher', ''),
             'publish_date': publish_date,
-            'status': status,  # 直接使用表单中的状态值
+            'status': status,
             'rating': rating,
             'notes': request.form.get('notes', ''),
             'cover_url': request.form.get('cover_url', ''),
@@ -350,105 +378,53 @@ def edit_book(book_id):
             'price': request.form.get('price', '')
         }
         
-        # 更新图书信息
-        update_book(book_id, book_data)
-        
-        flash('图书更新成功！', 'success')
-        return redirect(url_for('book_detail', book_id=book_id))
+        # 更新图书信息，状态无效或图书不存在时不写入，保留填写的内容重新显示表单
+        if update_book(book_id, book_data):
+            flash('图书更新成功！', 'success')
+            return redirect(url_for('book_detail', book_id=book_id))
+        flash('更新图书失败，请检查输入数据。', 'danger')
+        book = dict(book_data, id=book_id)
     
     # 获取所有唯一的分类标签
-    unique_genres = set()
-    all_books = get_all_books()
-    for b in all_books:
-        if b.get('tags'):
-            genres = [tag.strip() for tag in b['tags'].split(',')]
-            unique_genres.update(genres)
+    unique_genres, = facet_options('book', 'tag')
     
     # 获取图书的分类标签
     book_genres = []
     if book and book.get('tags'):
         book_genres = [tag.strip() for tag in book['tags'].split(',')]
     
-    return render_template('book_form.html', genres=sorted(unique_genres), book=book, book_genres=book_genres, title="编辑书籍")
+    return render_template('book_form.html', genres=unique_genres, book=book, book_genres=book_genres, title="编辑书籍")
 
 @app.route('/movies')
+@conditional('movies')
 def movies():
     """电影页面"""
-    movies = get_all_movies()
+    order_by, cursor, limit = get_page_args(PAGE_SIZE, PAGE_SIZE)
+    query = request.args.get('q', '').strip()
+    filters = get_filter_args(filter_names('movie'))
+    try:
+        if query:
+            page = search_page(search_movies, query, cursor, limit, filters=filters)
+        else:
+            page = get_movies_page(order_by, cursor, limit, filters=filters, columns='list')
+    except ValueError:
+        abort(400)
+    movies = page['items']
     
-    # 处理状态显示
-    for movie in movies:
-        # 打印原始状态值，帮助调试
-        logger.info(f"电影页面 - 原始状态值: {movie.get('status')}")
-        
-        # 将英文状态值映射到中文状态值
-        if movie.get('status') == 'watched':
-            movie['status'] = '已看'
-        elif movie.get('status') == 'watching':
-            movie['status'] = '想看'
-        elif movie.get('status') == 'wanting':
-            movie['status'] = '想看'
-        elif movie.get('status') == 'unwatched':
-            movie['status'] = '未看'
-        # 确保中文状态保持不变
-        elif movie.get('status') != '已看' and movie.get('status') != '想看' and movie.get('status') != '未看':
-            # 如果状态不是已知的中文状态，则默认设为"未看"
-            logger.info(f"电影页面 - 状态值不是已知的中文状态，设为未看: {movie.get('status')}")
-            movie['status'] = '未看'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"电影页面 - 处理后状态值: {movie.get('status')}")
-    
-    # 获取所有导演
-    directors = set()
-    for movie in movies:
-        if movie.get('director'):
-            directors.add(movie['director'])
-    
-    # 获取所有演员
-    actors = set()
-    for movie in movies:
-        if movie.get('cast'):
-            cast_list = [actor.strip() for actor in movie['cast'].split(',')]
-            actors.update(cast_list)
-    
-    # 获取所有电影分类
-    genres = set()
-    for movie in movies:
-        if movie.get('genre'):
-            genre_list = [genre.strip() for genre in movie['genre'].split(',')]
-            genres.update(genre_list)
-    
-    return render_template('movies.html', movies=movies, genres=sorted(genres), directors=sorted(directors), actors=sorted(actors))
+    # 筛选列表覆盖所有电影，而不仅是当前页
+    genres, directors, actors = facet_options('movie', 'genre', 'director', 'actor')
+    
+    return render_template('movies.html', movies=movies, genres=genres, directors=directors, actors=actors,
+                           next_cursor=page['next_cursor'])
 
 @app.route('/movies/<string:movie_id>')
+@conditional('movies')
 def movie_detail(movie_id):
     """电影详情页面"""
     movie = get_movie(movie_id)
     if not movie:
         abort(404)
     
-    # 打印原始状态值，帮助调试
-    logger.info(f"电影详情页 - 原始状态值: {movie.get('status')}")
-    
-    # 将英文状态值映射到中文状态值
-    if movie.get('status') == 'watched':
-        movie['status'] = '已看'
-    elif movie.get('status') == 'watching':
-        movie['status'] = '想看'
-    elif movie.get('status') == 'wanting':
-        movie['status'] = '想看'
-    elif movie.get('status') == 'unwatched':
-        movie['status'] = '未看'
-    # 确保中文状态保持不变
-    elif movie.get('status') != '已看' and movie.get('status') != '想看' and movie.get('status') != '未看':
-        # 如果状态不是已知的中文状态，则默认设为"未看"
-        logger.info(f"电影详情页 - 状态值不是已知的中文状态，设为未看: {movie.get('status')}")
-        movie['status'] = '未看'
-    
-    # 打印处理后的状态值，帮助调试
-    logger.info(f"电影详情页 - 处理后状态值: {movie.get('status')}")
-    
     return render_template('movie_detail.html', movie=movie)
 
 @app.route('/movies/add', methods=['GET', 'POST'])
@@ -479,7 +455,7 @@ def add_movie_route():
         }
         
         # 记录评分值，帮助调试
-        logger.info(f"添加电影 - 评分值: {rating}")
+        logger.debug("添加电影 - 评分值: %s", rating)
         
         # 处理海报上传
         if 'poster' in request.files and request.files['poster'].filename:
@@ -508,32 +484,6 @@ def add_movie_route():
 def edit_movie_route(movie_id):
     movie = get_movie(movie_id)
     
-    # 在GET请求时，确保状态显示正确
-    if request.method == 'GET' and movie:
-        # 打印原始状态值，帮助调试
-        logger.info(f"编辑电影 - 原始状态值: {movie.get('status')}")
-        
-        # 将英文状态值映射到中文状态值
-        if movie.get('status') == 'watched':
-            movie['status'] = '已看'
-        elif movie.get('status') == 'watching':
-            movie['status'] = '想看'
-        elif movie.get('status') == 'wanting':
-            movie['status'] = '想看'
-        elif movie.get('status') == 'unwatched':
-            movie['status'] = '未看'
-        # 确保中文状态保持不变
-        elif movie.get('status') != '已看' and movie.get('status') != '想看' and movie.get('status') != '未看':
-            # 如果状态不是已知的中文状态，则默认设为"未看"
-            logger.info(f"编辑电影 - 状态值不是已知的中文状态，设为未看: {movie.get('status')}")
-            movie['status'] = '未看'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"编辑电影 - 处理后状态值: {movie.get('status')}")
-        
-        # 打印评分值，帮助调试
-        logger.info(f"编辑电影 - 评分值: {movie.get('rating')}")
-    
     if request.method == 'POST' and movie:
         # 获取评分值
         rating_value = request.form.get('rating', '')
@@ -543,10 +493,10 @@ def edit_movie_route(movie_id):
             rating = max(0, min(5, rating))
             # 保留一位小数
             rating = round(rating * 10) / 10
-            logger.info(f"编辑电影表单提交 - 评分值: {rating}")
+            logger.debug("编辑电影表单提交 - 评分值: %s", rating)
         except (ValueError, TypeError):
             rating = 0.0
-            logger.warning(f"编辑电影表单提交 - 评分转换失败，使用默认值0: {rating_value}")
+            logger.warning("编辑电影表单提交 - 评分转换失败，使用默认值0: %s", rating_value)
             
         # 准备更新数据
         updated_movie = movie.copy()
@@ -564,7 +514,7 @@ def edit_movie_route(movie_id):
         })
         
         # 记录状态值，帮助调试
-        logger.info(f"电影编辑表单提交 - 状态值: {updated_movie.get('status')}")
+        logger.debug("电影编辑表单提交 - 状态值: %s", updated_movie.get('status'))
         
         # 处理海报上传
         if 'poster' in request.files and request.files['poster'].filename:
@@ -588,8 +538,8 @@ def edit_movie_route(movie_id):
             flash('电影已成功更新！', 'success')
             return redirect(url_for('movie_detail', movie_id=movie_id))
         else:
-            flash('更新电影失败。', 'danger')
-            return redirect(url_for('movies'))
+            flash('更新电影失败，请检查输入数据。', 'danger')
+            return render_template('movie_form.html', movie=updated_movie)
     return render_template('movie_form.html', movie=movie)
 
 @app.route('/movies/<string:movie_id>/delete', methods=['POST'])
@@ -611,78 +561,35 @@ def delete_movie_route(movie_id):
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'}), 500
 
 @app.route('/music')
+@conditional('music')
 def music():
     """音乐页面"""
-    musics = get_all_music()
+    order_by, cursor, limit = get_page_args(PAGE_SIZE, PAGE_SIZE)
+    query = request.args.get('q', '').strip()
+    filters = get_filter_args(filter_names('music'))
+    try:
+        if query:
+            page = search_page(search_music, query, cursor, limit, filters=filters)
+        else:
+            page = get_music_page(order_by, cursor, limit, filters=filters, columns='list')
+    except ValueError:
+        abort(400)
+    musics = page['items']
     
-    # 处理状态显示
-    for music in musics:
-        # 打印原始状态值，帮助调试
-        logger.info(f"音乐页面 - 原始状态值: {music.get('status')}")
-        
-        # 将英文状态值映射到中文状态值
-        if music.get('status') == 'listened':
-            music['status'] = '已听'
-        elif music.get('status') == 'listening' or music.get('status') == 'wanting':
-            music['status'] = '想听'
-        elif music.get('status') == 'unlistened':
-            music['status'] = '未听'
-        # 确保中文状态保持不变
-        elif music.get('status') != '已听' and music.get('status') != '想听' and music.get('status') != '未听':
-            # 如果状态不是已知的中文状态，则默认设为"未听"
-            logger.info(f"音乐页面 - 状态值不是已知的中文状态，设为未听: {music.get('status')}")
-            music['status'] = '未听'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"音乐页面 - 处理后状态值: {music.get('status')}")
-    
-    # 获取所有艺术家
-    artists = set()
-    for music in musics:
-        if music.get('artist'):
-            artists.add(music['artist'])
-    
-    # 获取所有专辑
-    albums = set()
-    for music in musics:
-        if music.get('album'):
-            albums.add(music['album'])
-    
-    # 获取所有音乐分类
-    genres = set()
-    for music in musics:
-        if music.get('genre'):
-            genre_list = [genre.strip() for genre in music['genre'].split(',')]
-            genres.update(genre_list)
-    
-    return render_template('music.html', musics=musics, genres=sorted(genres), artists=sorted(artists), albums=sorted(albums))
+    # 筛选列表覆盖所有音乐，而不仅是当前页
+    genres, artists, albums = facet_options('music', 'genre', 'artist', 'album')
+    
+    return render_template('music.html', musics=musics, genres=genres, artists=artists, albums=albums,
+                           next_cursor=page['next_cursor'])
 
 @app.route('/music/<string:music_id>')
+@conditional('music')
 def music_detail(music_id):
     """音乐详情页面"""
     music = get_music(music_id)
     if not music:
         abort(404)
     
-    # 打印原始状态值，帮助调试
-    logger.info(f"音乐详情页 - 原始状态值: {music.get('status')}")
-    
-    # 将英文状态值映射到中文状态值
-    if music.get('status') == 'listened':
-        music['status'] = '已听'
-    elif music.get('status') == 'listening' or music.get('status') == 'wanting':
-        music['status'] = '想听'
-    elif music.get('status') == 'unlistened':
-        music['status'] = '未听'
-    # 确保中文状态保持不变
-    elif music.get('status') != '已听' and music.get('status') != '想听' and music.get('status') != '未听':
-        # 如果状态不是已知的中文状态，则默认设为"未听"
-        logger.info(f"音乐详情页 - 状态值不是已知的中文状态，设为未听: {music.get('status')}")
-        music['status'] = '未听'
-    
-    # 打印处理后的状态值，帮助调试
-    logger.info(f"音乐详情页 - 处理后状态值: {music.get('status')}")
-    
     return render_template('music_detail.html', music=music)
 
 @app.route('/music/add', methods=['GET', 'POST'])
@@ -713,7 +620,7 @@ def add_music_route():
         }
         
         # 记录评分值，帮助调试
-        logger.info(f"添加音乐 - 评分值: {rating}")
+        logger.debug("添加音乐 - 评分值: %s", rating)
         
         # 处理封面上传
         if 'cover' in request.files and request.files['cover'].filename:
@@ -742,32 +649,6 @@ def add_music_route():
 def edit_music_route(music_id):
     music_item = get_music(music_id)
     
-    # 在GET请求时，确保状态显示正确
-    if request.method == 'GET' and music_item:
-        # 打印原始状态值，帮助调试
-        logger.info(f"编辑音乐 - 原始状态值: {music_item.get('status')}")
-        
-        # 将英文状态值映射到中文状态值
-        if music_item.get('status') == 'listened':
-            music_item['status'] = '已听'
-        elif music_item.get('status') == 'listening':
-            music_item['status'] = '想听'
-        elif music_item.get('status') == 'wanting':
-            music_item['status'] = '想听'
-        elif music_item.get('status') == 'unlistened':
-            music_item['status'] = '未听'
-        # 确保中文状态保持不变
-        elif music_item.get('status') != '已听' and music_item.get('status') != '想听' and music_item.get('status') != '未听':
-            # 如果状态不是已知的中文状态，则默认设为"未听"
-            logger.info(f"编辑音乐 - 状态值不是已知的中文状态，设为未听: {music_item.get('status')}")
-            music_item['status'] = '未听'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"编辑音乐 - 处理后状态值: {music_item.get('status')}")
-        
-        # 打印评分值，帮助调试
-        logger.info(f"编辑音乐 - 评分值: {music_item.get('rating')}")
-    
     if request.method == 'POST' and music_item:
         # 获取评分值
         rating_value = request.form.get('rating', '')
@@ -777,10 +658,10 @@ def edit_music_route(music_id):
             rating = max(0, min(5, rating))
             # 保留一位小数
             rating = round(rating * 10) / 10
-            logger.info(f"编辑音乐表单提交 - 评分值: {rating}")
+            logger.debug("编辑音乐表单提交 - 评分值: %s", rating)
         except (ValueError, TypeError):
             rating = 0.0
-            logger.warning(f"编辑音乐表单提交 - 评分转换失败，使用默认值0: {rating_value}")
+            logger.warning("编辑音乐表单提交 - 评分转换失败，使用默认值0: %s", rating_value)
             
         # 准备更新数据
         updated_music = music_item.copy()
@@ -798,7 +679,7 @@ def edit_music_route(music_id):
         })
         
         # 记录状态值，帮助调试
-        logger.info(f"音乐编辑表单提交 - 状态值: {updated_music.get('status')}")
+        logger.debug("音乐编辑表单提交 - 状态值: %s", updated_music.get('status'))
         
         # 处理封面上传
         if 'cover' in request.files and request.files['cover'].filename:
@@ -822,8 +703,8 @@ def edit_music_route(music_id):
             flash('音乐已成功更新！', 'success')
             return redirect(url_for('music_detail', music_id=music_id))
         else:
-            flash('更新音乐失败。', 'danger')
-            return redirect(url_for('music'))
+            flash('更新音乐失败，请检查输入数据。', 'danger')
+            return render_template('music_form.html', music=updated_music)
     return render_template('music_form.html', music=music_item)
 
 @app.route('/music/<string:music_id>/delete', methods=['POST'])
@@ -846,12 +727,24 @@ def delete_music_route(music_id):
 
 # API路由
 @app.route('/api/books', methods=['GET'])
+@conditional('books')
 def api_get_books():
-    return jsonify(get_all_books())
+    if 'ids' in request.args:
+        return items_json('books', get_ids_arg(), get_fields_arg('detail'))
+    order_by, cursor, limit = get_page_args(API_PAGE_SIZE, API_MAX_PAGE_SIZE)
+    try:
+        page = get_books_page(order_by, cursor, limit, filters=get_filter_args(), columns=get_fields_arg('list'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return paged_json(page)
 
 @app.route('/api/books/<string:book_id>', methods=['GET'])
+@conditional('books')
 def api_get_book(book_id):
-    return jsonify(get_book(book_id))
+    try:
+        return jsonify(get_book(book_id, columns=get_fields_arg('detail')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/books', methods=['POST'])
 def api_add_book():
@@ -871,12 +764,24 @@ def api_delete_book(book_id):
     return jsonify({'message': 'Book deleted successfully'})
 
 @app.route('/api/movies', methods=['GET'])
+@conditional('movies')
 def api_get_movies():
-    return jsonify(get_all_movies())
+    if 'ids' in request.args:
+        return items_json('movies', get_ids_arg(), get_fields_arg('detail'))
+    order_by, cursor, limit = get_page_args(API_PAGE_SIZE, API_MAX_PAGE_SIZE)
+    try:
+        page = get_movies_page(order_by, cursor, limit, filters=get_filter_args(), columns=get_fields_arg('list'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return paged_json(page)
 
 @app.route('/api/movies/<string:movie_id>', methods=['GET'])
+@conditional('movies')
 def api_get_movie(movie_id):
-    return jsonify(get_movie(movie_id))
+    try:
+        return jsonify(get_movie(movie_id, columns=get_fields_arg('detail')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/movies', methods=['POST'])
 def api_add_movie():
@@ -896,12 +801,24 @@ def api_delete_movie(movie_id):
     return jsonify({'message': 'Movie deleted successfully'})
 
 @app.route('/api/music', methods=['GET'])
+@conditional('music')
 def api_get_music():
-    return jsonify(get_all_music())
+    if 'ids' in request.args:
+        return items_json('music', get_ids_arg(), get_fields_arg('detail'))
+    order_by, cursor, limit = get_page_args(API_PAGE_SIZE, API_MAX_PAGE_SIZE)
+    try:
+        page = get_music_page(order_by, cursor, limit, filters=get_filter_args(), columns=get_fields_arg('list'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return paged_json(page)
 
 @app.route('/api/music/<string:music_id>', methods=['GET'])
+@conditional('music')
 def api_get_music_item(music_id):
-    return jsonify(get_music(music_id))
+    try:
+        return jsonify(get_music(music_id, columns=get_fields_arg('detail')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/music', methods=['POST'])
 def api_add_music():
@@ -951,56 +868,161 @@ def api_delete_music(music_id):
     delete_music(music_id)
     return jsonify({'message': 'Music deleted successfully'})
 
+# 全文搜索接口
+SEARCH_FUNCTIONS = {
+    'book': search_books,
+    'movie': search_movies,
+    'music': search_music,
+}
+
+@app.route('/api/search', methods=['GET'])
+@conditional()
+def api_search():
+    """全文搜索，参数: q 搜索词, type 媒体类型(book/movie/music), limit 条数, offset 偏移，其余参数为筛选条件"""
+    query = request.args.get('q', '').strip()
+    item_type = request.args.get('type', 'book')
+    if item_type not in SEARCH_FUNCTIONS:
+        return jsonify({'error': f'不支持的类型: {item_type}'}), 400
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), API_MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit和offset必须是整数'}), 400
+    
+    try:
+        return jsonify(SEARCH_FUNCTIONS[item_type](query, limit, offset, filters=get_filter_args()))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/facets', methods=['GET'])
+@conditional()
+def api_facets():
+    """筛选项取值及条目数，参数: type 媒体类型(book/movie/music), facets 筛选项名(可重复)，其余参数为筛选条件"""
+    item_type = request.args.get('type', 'book')
+    names = request.args.getlist('facets') or None
+    try:
+        return jsonify(get_facets(item_type, filters=get_filter_args(), names=names))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/douban/cache/stats', methods=['GET'])
+def api_douban_cache_stats():
+    """豆瓣响应缓存的条目数、大小和命中率（命中统计仅处理本请求的进程）"""
+    return jsonify(http_cache.stats())
+
+@app.route('/api/export', methods=['GET'])
+def api_export():
+    """
+    流式导出一类条目的全部记录，参数: type 类型(books/movies/music), format 格式(ndjson/csv/json),
+    fields 字段投影或逗号分隔的字段名(默认全部字段), gzip=1 压缩为.gz文件，其余参数为筛选条件
+    """
+    item_type = request.args.get('type', 'books')
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'不支持的导出格式: {fmt}'}), 400
+    try:
+        fields, rows = export_items(item_type, columns=get_fields_arg(None), filters=get_filter_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    filename = f"{item_type}-{datetime.now().strftime('%Y%m%d')}"
+    return export_response(fields, rows, fmt, filename, compress)
+
+@app.route('/api/<any(books, movies, music):table>/lookup', methods=['POST'])
+def api_lookup(table):
+    """
+    按ID列表批量获取记录，用于GET ?ids=放不下的长列表，请求体: {"ids": [ID, ...], "fields": 字段投影或字段名列表}，
+    返回与GET /api/books?ids=相同
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('ids'), list):
+        return jsonify({'error': '请求体须是包含ids列表的JSON对象'}), 400
+    fields = data.get('fields') or get_fields_arg('detail')
+    return items_json(table, [str(id) for id in data['ids']], fields)
+
+@app.route('/api/<any(books, movies, music):table>/bulk', methods=['POST'])
+def api_bulk_import(table):
+    """
+    批量导入，请求体为NDJSON或CSV（按format参数或Content-Type识别），逐行解析、按批写入；
+    参数: on_conflict 记录ID已存在时的处理方式(ignore/replace/update), stream=1 以NDJSON流式返回每行的结果
+    """
+    try:
+        fmt = detect_format(request.args.get('format'), request.content_type)
+        results = import_items(table, parse_records(request.stream, fmt),
+                               on_conflict=request.args.get('on_conflict', 'ignore'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        def generate():
+            summary = {}
+            try:
+                for entry in results:
+                    summary[entry['result']] = summary.get(entry['result'], 0) + 1
+                    yield json.dumps(entry, ensure_ascii=False) + '\n'
+            except Exception as e:
+                # 响应头已经发出，无法再返回错误状态码，最后一行附带中断原因，客户端不会收到截断的响应
+                logger.error("批量导入%s中断: %s", table, e)
+                yield json.dumps({'summary': summary, 'error': f'导入中断: {e}'}, ensure_ascii=False) + '\n'
+                return
+            yield json.dumps({'summary': summary}, ensure_ascii=False) + '\n'
+        return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    rows = list(results)
+    summary = {}
+    for entry in rows:
+        summary[entry['result']] = summary.get(entry['result'], 0) + 1
+    return jsonify({'summary': summary, 'rows': rows})
+
+@app.route('/api/<any(books, movies, music):table>/batch', methods=['PATCH'])
+def api_batch_update(table):
+    """
+    批量修改，请求体: {"ids": [ID, ...], "set": {字段: 新值}, "add_tags": [标签], "remove_tags": [标签]}，
+    所有修改在一个事务中执行；返回找到的记录数和不存在的ID
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('ids'), list):
+        return jsonify({'error': '请求体须是包含ids列表的JSON对象'}), 400
+    changes = data.get('set') or {}
+    if not isinstance(changes, dict):
+        return jsonify({'error': 'set须是JSON对象'}), 400
+    try:
+        result = batch_update_items(table, [str(id) for id in data['ids']], changes,
+                                    data.get('add_tags') or [], data.get('remove_tags') or [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': '批量修改失败'}), 500
+    return jsonify(result)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """查询缓存的条目数、占用内存和命中率（仅处理本请求的进程）"""
+    return jsonify(query_cache.stats())
+
 @app.route('/bookshelf')
+@conditional('books')
 def bookshelf():
-    # 获取所有书籍，但只显示拥有的书籍
-    all_books = get_all_books()
-    owned_books = [book for book in all_books if book.get('is_owned')]
-    
-    # 处理状态显示
-    for book in owned_books:
-        # 打印原始状态值，帮助调试
-        logger.info(f"书架页面 - 原始状态值: {book.get('status')}")
-        
-        # 将旧的状态值映射到新的状态值
-        if book.get('status') == 'unread':
-            book['status'] = '未读'
-        elif book.get('status') == 'reading':
-            book['status'] = '在读'
-        elif book.get('status') == 'read':
-            book['status'] = '读过'
-        # 确保"想读"、"在读"和"读过"状态保持不变
-        elif book.get('status') != '想读' and book.get('status') != '在读' and book.get('status') != '读过' and book.get('status') != '未读':
-            # 如果状态不是已知的中文状态，则默认设为"未读"
-            logger.info(f"书架页面 - 状态值不是已知的中文状态，设为未读: {book.get('status')}")
-            book['status'] = '未读'
-        
-        # 打印处理后的状态值，帮助调试
-        logger.info(f"书架页面 - 处理后状态值: {book.get('status')}")
-    
-    # 获取所有书籍中的唯一分类标签（支持逗号分隔的多个标签）
-    unique_genres = set()
-    for book in all_books:
-        if book.get('tags'):
-            # 分割每本书的分类，并去除首尾空格
-            genres = [g.strip() for g in book.get('tags').split(',')]
-            for genre in genres:
-                if genre:  # 确保标签不为空
-                    unique_genres.add(genre)
-    
-    # 获取所有书籍中的唯一作者
-    unique_authors = set()
-    for book in all_books:
-        if book.get('author'):
-            author = book.get('author').strip()
-            if author:  # 确保作者不为空
-                unique_authors.add(author)
-    
-    # 将集合转换为排序列表
-    unique_genres = sorted(list(unique_genres))
-    unique_authors = sorted(list(unique_authors))
-    
-    return render_template('bookshelf.html', books=owned_books, genres=unique_genres, authors=unique_authors)
+    # 只显示拥有的书籍，默认按标题排序
+    order_by, cursor, limit = get_page_args(PAGE_SIZE, PAGE_SIZE, default_sort='title')
+    query = request.args.get('q', '').strip()
+    filters = get_filter_args(filter_names('book'))
+    filters['is_owned'] = 1
+    try:
+        if query:
+            page = search_page(search_books, query, cursor, limit, filters=filters)
+        else:
+            page = get_books_page(order_by, cursor, limit, filters=filters, columns='list')
+    except ValueError:
+        abort(400)
+    owned_books = page['items']
+    
+    # 获取所有书籍中的唯一分类标签（支持逗号分隔的多个标签）和作者
+    unique_genres, unique_authors = facet_options('book', 'tag', 'author')
+    
+    return render_template('bookshelf.html', books=owned_books, genres=unique_genres, authors=unique_authors,
+                           next_cursor=page['next_cursor'])
 
 @app.route('/private/novels')
 def private_novels():
@@ -1022,8 +1044,6 @@ import threading
 from app.config import get_config, update_config
 from app.webdav_sync import sync_data, test_connection, get_available_backups
 
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # 自定义过滤器，将时间戳转换为ISO格式
@@ -1044,17 +1064,29 @@ def settings():
     config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config')
     
     # 统计数据
+    summary = get_dashboard_summary()
     stats = {
-        'books': len(get_all_books()),
-        'movies': len(get_all_movies()),
-        'music': len(get_all_music())
+        'books': summary['book']['total'],
+        'movies': summary['movie']['total'],
+        'music': summary['music']['total']
     }
     
     return render_template('settings.html', 
                           config=config, 
                           data_dir=data_dir, 
                           config_dir=config_dir,
-                          stats=stats)
+                          stats=stats,
+                          douban_cache=http_cache.stats())
+
+# 清空豆瓣响应缓存
+@app.route('/settings/douban-cache/clear', methods=['POST'])
+def clear_douban_cache():
+    try:
+        http_cache.clear()
+        flash('豆瓣缓存已清空', 'success')
+    except Exception as e:
+        flash(f'清空豆瓣缓存失败: {str(e)}', 'danger')
+    return redirect(url_for('settings'))
 
 # WebDAV设置保存
 @app.route('/settings/webdav/save', methods=['POST'])
@@ -1102,7 +1134,7 @@ def toggle_webdav():
         
         return jsonify({'success': True, 'enabled': enabled})
     except Exception as e:
-        logger.error(f"切换WebDAV状态失败: {e}")
+        logger.error("切换WebDAV状态失败: %s", e)
         return jsonify({'success': False, 'message': str(e)})
 
 # 测试WebDAV连接
@@ -1124,7 +1156,7 @@ def test_webdav_connection():
         
         return jsonify({'success': success, 'message': message})
     except Exception as e:
-        logger.error(f"测试WebDAV连接失败: {e}")
+        logger.error("测试WebDAV连接失败: %s", e)
         return jsonify({'success': False, 'message': str(e)})
 
 # 捕获同步日志
@@ -1159,7 +1191,7 @@ def get_webdav_backups():
         backups = get_available_backups()
         return jsonify({'success': True, 'backups': backups})
     except Exception as e:
-        logger.error(f"获取备份列表失败: {e}")
+        logger.error("获取备份列表失败: %s", e)
         return jsonify({'success': False, 'message': str(e)})
 
 # 仅上传同步
@@ -1181,7 +1213,7 @@ def upload_webdav_now():
         else:
             return jsonify({'success': False, 'message': '上传失败，请检查日志', 'log': log})
     except Exception as e:
-        logger.error(f"上传失败: {e}")
+        logger.error("上传失败: %s", e)
         return jsonify({'success': False, 'message': str(e)})
 
 # 仅下载同步
@@ -1207,7 +1239,7 @@ def download_webdav_now():
         else:
             return jsonify({'success': False, 'message': '下载失败，请检查日志', 'log': log})
     except Exception as e:
-        logger.error(f"下载失败: {e}")
+        logger.error("下载失败: %s", e)
         return jsonify({'success': False, 'message': str(e)})
 
 # 添加导航栏链接
@@ -1230,10 +1262,10 @@ def douban_search():
     """豆瓣搜索页面"""
     try:
         # 添加日志记录
-        logger.info("访问豆瓣搜索页面")
+        logger.debug("访问豆瓣搜索页面")
         return render_template('douban/search.html')
     except Exception as e:
-        logger.error(f"渲染豆瓣搜索页面失败: {str(e)}")
+        logger.error("渲染豆瓣搜索页面失败: %s", str(e))
         flash('页面加载失败，请稍后再试', 'danger')
         return redirect(url_for('index'))
 
@@ -1247,7 +1279,7 @@ def api_douban_search():
         page = int(request.args.get('page', 1))
         count = int(request.args.get('count', 20))
         
-        logger.info(f"豆瓣搜索API请求: keyword={keyword}, type={item_type}, page={page}, count={count}")
+        logger.debug("豆瓣搜索API请求: keyword=%s, type=%s, page=%s, count=%s", keyword, item_type, page, count)
         
         if not keyword:
             logger.warning("豆瓣搜索API请求缺少关键词")
@@ -1265,10 +1297,10 @@ def api_douban_search():
                         # 将艺术家信息添加到结果中
                         result['artist'] = parts[0].strip()
         
-        logger.info(f"豆瓣搜索API返回结果: {len(results)}个结果")
+        logger.debug("豆瓣搜索API返回结果: %s个结果", len(results))
         return jsonify({'success': True, 'results': results})
     except Exception as e:
-        logger.error(f"豆瓣搜索API异常: {str(e)}")
+        logger.error("豆瓣搜索API异常: %s", str(e))
         return jsonify({'success': False, 'message': f'搜索失败: {str(e)}', 'results': []}), 500
 
 # 豆瓣电影详情页面
@@ -1286,7 +1318,7 @@ def douban_movie_detail(movie_id):
 def import_douban_book(book_id):
     """导入豆瓣图书"""
     # 验证ID
-    logger.info(f"开始导入豆瓣图书，ID: {book_id}")
+    logger.info("开始导入豆瓣图书，ID: %s", book_id)
     
     if not book_id or book_id.strip() == '':
         logger.error("导入图书失败: 无效的图书ID (为空)")
@@ -1295,52 +1327,52 @@ def import_douban_book(book_id):
     
     book = douban_service.get_book_detail_for_import(book_id)
     if not book:
-        logger.error(f"导入图书失败: 无法获取图书信息，ID: {book_id}")
+        logger.error("导入图书失败: 无法获取图书信息，ID: %s", book_id)
         flash('无法获取图书信息，请稍后再试', 'danger')
         return redirect(url_for('douban_search'))
     
     # 记录详细信息，用于调试
-    logger.info(f"准备导入豆瓣图书，原始API数据: {book}")
+    logger.debug("准备导入豆瓣图书，原始API数据: %s", book)
     
     # 用户可以修改的字段
-    status = request.form.get('status', '想读')
-    logger.info(f"用户选择的状态: {status}")
+    status = request.form.get('status', 'wish')
+    logger.debug("用户选择的状态: %s", status)
     book['status'] = status  # 使用status字段而不是state字段
     
     # 处理评分 - 保持用户输入的评分
     rating = request.form.get('rating', '0')
     try:
         book['rating'] = float(rating)  # 直接使用表单中的评分
-        logger.info(f"用户评分: {book['rating']}")
+        logger.debug("用户评分: %s", book['rating'])
     except (ValueError, TypeError):
         book['rating'] = 0.0
-        logger.warning(f"评分转换失败，使用默认值0: {rating}")
+        logger.warning("评分转换失败，使用默认值0: %s", rating)
     
     # 处理是否拥有
     book['is_owned'] = 'is_owned' in request.form
-    logger.info(f"是否拥有: {book['is_owned']}")
+    logger.debug("是否拥有: %s", book['is_owned'])
     
     # 不保存封面图片，将cover_url设为空
     book['cover_url'] = ''
     
     # 确保出版日期字段正确映射
     if 'publish_date' in book:
-        logger.info(f"出版日期(publish_date): {book['publish_date']}")
+        logger.debug("出版日期(publish_date): %s", book['publish_date'])
     else:
         logger.warning("未找到publish_date字段")
     
     # 删除豆瓣ID，让系统生成新的UUID
     if 'id' in book:
-        logger.info(f"删除豆瓣图书ID: {book['id']}，准备生成新UUID")
+        logger.debug("删除豆瓣图书ID: %s，准备生成新UUID", book['id'])
         del book['id']
     
     # 添加图书
     try:
         # 记录最终要保存到数据库的数据
-        logger.info(f"最终保存到数据库的图书数据: {book}")
+        logger.debug("最终保存到数据库的图书数据: %s", book)
         book_id = add_book(book)
         if book_id:
-            logger.info(f"图书导入成功，新ID: {book_id}")
+            logger.info("图书导入成功，新ID: %s", book_id)
             flash('图书已成功导入！', 'success')
             return redirect(url_for('book_detail', book_id=book_id))
         else:
@@ -1348,7 +1380,7 @@ def import_douban_book(book_id):
             flash('导入图书失败，请稍后再试', 'danger')
             return redirect(url_for('douban_search'))
     except Exception as e:
-        logger.error(f"图书导入异常: {str(e)}")
+        logger.error("图书导入异常: %s", str(e))
         flash(f'导入图书失败: {str(e)}', 'danger')
         return redirect(url_for('douban_search'))
 
@@ -1367,12 +1399,12 @@ def douban_music_detail(music_id):
         return redirect(url_for('douban_search'))
     
     # 记录详细信息，用于调试
-    logger.info(f"豆瓣音乐详情: {music}")
+    logger.debug("豆瓣音乐详情: %s", music)
     
     # 如果URL参数中包含艺术家信息，优先使用
     if artist_from_search:
         music['artist'] = artist_from_search
-        logger.info(f"从URL参数获取艺术家信息: {artist_from_search}")
+        logger.debug("从URL参数获取艺术家信息: %s", artist_from_search)
     
     # 确保艺术家信息存在
     if not music.get('artist'):
@@ -1421,7 +1453,7 @@ def douban_music_detail(music_id):
                 music['artist'] = special_albums[title]
     
     # 记录最终的艺术家信息
-    logger.info(f"最终艺术家信息: {music.get('artist', '未知')}")
+    logger.debug("最终艺术家信息: %s", music.get('artist', '未知'))
     
     return render_template('douban/music_detail.html', music=music)
 
@@ -1430,7 +1462,7 @@ def douban_music_detail(music_id):
 def import_douban_movie(movie_id):
     """导入豆瓣电影"""
     # 验证ID
-    logger.info(f"开始导入豆瓣电影，ID: {movie_id}")
+    logger.info("开始导入豆瓣电影，ID: %s", movie_id)
     
     if not movie_id or movie_id.strip() == '':
         logger.error("导入电影失败: 无效的电影ID (为空)")
@@ -1439,21 +1471,16 @@ def import_douban_movie(movie_id):
     
     movie = douban_service.get_movie_detail_for_import(movie_id)
     if not movie:
-        logger.error(f"导入电影失败: 无法获取电影信息，ID: {movie_id}")
+        logger.error("导入电影失败: 无法获取电影信息，ID: %s", movie_id)
         flash('无法获取电影信息，请稍后再试', 'danger')
         return redirect(url_for('douban_search'))
     
     # 记录详细信息，用于调试
-    logger.info(f"准备导入豆瓣电影，原始API数据: {movie}")
+    logger.debug("准备导入豆瓣电影，原始API数据: %s", movie)
     
     # 用户可以修改的字段
-    status = request.form.get('status', '未看')
-    logger.info(f"用户选择的状态: {status}")
-    
-    # 确保状态是有效的中文状态值
-    if status not in ['未看', '想看', '已看']:
-        status = '未看'
-        logger.warning(f"无效的状态值，使用默认值: {status}")
+    status = request.form.get('status', 'unwatched')
+    logger.debug("用户选择的状态: %s", status)
     
     movie['status'] = status
     
@@ -1466,10 +1493,10 @@ def import_douban_movie(movie_id):
         # 保留一位小数
         rating = round(rating * 10) / 10
         movie['rating'] = rating
-        logger.info(f"用户评分(处理后): {movie['rating']}")
+        logger.debug("用户评分(处理后): %s", movie['rating'])
     except (ValueError, TypeError):
         movie['rating'] = 0.0
-        logger.warning(f"评分转换失败，使用默认值0: {rating_value}")
+        logger.warning("评分转换失败，使用默认值0: %s", rating_value)
     
     movie['notes'] = request.form.get('notes', '')
     
@@ -1479,7 +1506,7 @@ def import_douban_movie(movie_id):
     # 删除豆瓣ID，让系统生成新的UUID
     if 'id' in movie:
         # 删除豆瓣ID前记录日志
-        logger.info(f"删除豆瓣电影ID: {movie['id']}，准备生成新UUID")
+        logger.debug("删除豆瓣电影ID: %s，准备生成新UUID", movie['id'])
         del movie['id']
     
     # 添加电影
@@ -1496,7 +1523,7 @@ def import_douban_movie(movie_id):
 def import_douban_music(music_id):
     """导入豆瓣音乐"""
     # 验证ID
-    logger.info(f"开始导入豆瓣音乐，ID: {music_id}")
+    logger.info("开始导入豆瓣音乐，ID: %s", music_id)
     
     if not music_id or music_id.strip() == '':
         logger.error("导入音乐失败: 无效的音乐ID (为空)")
@@ -1505,21 +1532,16 @@ def import_douban_music(music_id):
     
     music = douban_service.get_music_detail_for_import(music_id)
     if not music:
-        logger.error(f"导入音乐失败: 无法获取音乐信息，ID: {music_id}")
+        logger.error("导入音乐失败: 无法获取音乐信息，ID: %s", music_id)
         flash('无法获取音乐信息，请稍后再试', 'danger')
         return redirect(url_for('douban_search'))
     
     # 记录详细信息，用于调试
-    logger.info(f"准备导入豆瓣音乐: {music}")
+    logger.debug("准备导入豆瓣音乐: %s", music)
     
     # 用户可以修改的字段
-    status = request.form.get('status', '未听')
-    logger.info(f"用户选择的状态: {status}")
-    
-    # 确保状态是有效的中文状态值
-    if status not in ['未听', '想听', '已听']:
-        status = '未听'
-        logger.warning(f"无效的状态值，使用默认值: {status}")
+    status = request.form.get('status', 'unlistened')
+    logger.debug("用户选择的状态: %s", status)
     
     music['status'] = status
     
@@ -1532,10 +1554,10 @@ def import_douban_music(music_id):
         # 保留一位小数
         rating = round(rating * 10) / 10
         music['rating'] = rating
-        logger.info(f"用户评分(处理后): {music['rating']}")
+        logger.debug("用户评分(处理后): %s", music['rating'])
     except (ValueError, TypeError):
         music['rating'] = 0.0
-        logger.warning(f"评分转换失败，使用默认值0: {rating_value}")
+        logger.warning("评分转换失败，使用默认值0: %s", rating_value)
     
     music['notes'] = request.form.get('notes', '')
     
@@ -1543,7 +1565,7 @@ def import_douban_music(music_id):
     music['artist'] = request.form.get('artist', '')
     
     # 记录用户提供的艺术家信息
-    logger.info(f"用户提供的艺术家信息: {music['artist']}")
+    logger.debug("用户提供的艺术家信息: %s", music['artist'])
     
     # 不保存图片URL
     music['cover_url'] = ''
@@ -1551,7 +1573,7 @@ def import_douban_music(music_id):
     # 删除豆瓣ID，让系统生成新的UUID
     if 'id' in music:
         # 删除豆瓣ID前记录日志
-        logger.info(f"删除豆瓣音乐ID: {music['id']}，准备生成新UUID")
+        logger.debug("删除豆瓣音乐ID: %s，准备生成新UUID", music['id'])
         del music['id']
     
     # 添加音乐
@@ -1603,6 +1625,6 @@ def douban_book_detail(book_id):
         return redirect(url_for('douban_search'))
     
     # 记录详细信息，用于调试
-    logger.info(f"豆瓣图书详情: {book}")
+    logger.debug("豆瓣图书详情: %s", book)
     
     return render_template('douban/book_detail.html', book=book) 
\ No newline at end of file
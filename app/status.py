@@ -0,0 +1,56 @@
+"""
+条目状态
+
+状态以简短的英文代码保存（如read、wish），写入时由models.py中的add_*/update_*函数
+校验并将中文名称或旧版本的状态值转换为代码；页面通过模板中的status_label显示中文名称。
+"""
+
+# 各类条目的状态代码及显示名称，第一个为默认状态
+STATUSES = {
+    'book': (('unread', '未读'), ('wish', '想读'), ('reading', '在读'), ('read', '读过')),
+    'movie': (('unwatched', '未看'), ('wish', '想看'), ('watched', '已看')),
+    'music': (('unlistened', '未听'), ('wish', '想听'), ('listened', '已听')),
+}
+
+# 旧版本写入过或页面曾使用的其他状态值
+LEGACY_STATUSES = {
+    'book': {'已读': 'read', 'wanting': 'wish'},
+    'movie': {'watching': 'wish', 'wanting': 'wish', '在看': 'wish', '看过': 'watched'},
+    'music': {'listening': 'wish', 'wanting': 'wish', '在听': 'wish', '听过': 'listened'},
+}
+
+def default_status(media_type):
+    """默认状态代码"""
+    return STATUSES[media_type][0][0]
+
+def status_options(media_type):
+    """状态选项，用于表单和筛选下拉框"""
+    return [{'value': code, 'label': label} for code, label in STATUSES[media_type]]
+
+def status_label(media_type, code):
+    """状态代码的显示名称，未知的代码按默认状态显示"""
+    labels = dict(STATUSES[media_type])
+    return labels.get(code, labels[default_status(media_type)])
+
+def status_code(media_type, value):
+    """将状态代码、显示名称或旧的状态值转换为状态代码，无法识别时返回None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    for code, label in STATUSES[media_type]:
+        if value in (code, label):
+            return code
+    return LEGACY_STATUSES[media_type].get(value)
+
+def validate_status(media_type, value):
+    """
+    校验写入的状态并返回状态代码，为空时使用默认状态
+
+    无法识别的状态抛出ValueError
+    """
+    if value is None or str(value).strip() == '':
+        return default_status(media_type)
+    code = status_code(media_type, value)
+    if code is None:
+        raise ValueError(f"无效的状态: {value}")
+    return code
@@ -3,6 +3,7 @@ from datetime import datetime
 import os
 from flask import Markup
 from app import app
+from app.status import status_options
 
 def format_date(date_str):
     """格式化日期字符串为易读格式"""
@@ -45,19 +46,11 @@ def get_rating_options():
 
 def get_book_status_options():
     """获取书籍状态选项"""
-    return [
-        {"value": "unread", "label": "未读"},
-        {"value": "reading", "label": "在读"},
-        {"value": "read", "label": "已读"}
-    ]
+    return status_options('book')
 
 def get_movie_status_options():
     """获取电影状态选项"""
-    return [
-        {"value": "unwatched", "label": "未看"},
-        {"value": "watching", "label": "在看"},
-        {"value": "watched", "label": "已看"}
-    ]
+    return status_options('movie')
 
 def get_common_genres():
     """获取常见分类"""
@@ -7,6 +7,7 @@ import tempfile
 from datetime import datetime
 from webdav3.client import Client
 from app.config import get_config, update_config
+from app.database import reset_pool, checkpoint, backup_database, renew_instance_id
 
 # 数据目录路径
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
@@ -82,17 +83,27 @@ def create_zip_backup(backup_path):
     """创建数据文件的ZIP备份"""
     try:
         # 数据文件列表
-        data_files = ['books.json', 'movies.json', 'music.json', 'media_manager.db']
+        data_files = ['books.json', 'movies.json', 'music.json']
         
-        # 创建ZIP文件
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in data_files:
-                file_path = os.path.join(DATA_DIR, file)
-                if os.path.exists(file_path):
-                    print(f"添加文件到ZIP: {file}")
-                    zipf.write(file_path, file)
-                else:
-                    print(f"文件不存在，跳过: {file}")
+        # 数据库通过在线备份接口复制到临时文件，包含WAL中的最新数据，且复制期间的写入不会混入
+        fd, db_snapshot = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            backup_database(db_snapshot)
+            
+            # 创建ZIP文件
+            with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for file in data_files:
+                    file_path = os.path.join(DATA_DIR, file)
+                    if os.path.exists(file_path):
+                        print(f"添加文件到ZIP: {file}")
+                        zipf.write(file_path, file)
+                    else:
+                        print(f"文件不存在，跳过: {file}")
+                print("添加数据库快照到ZIP: media_manager.db")
+                zipf.write(db_snapshot, 'media_manager.db')
+        finally:
+            os.remove(db_snapshot)
         
         print(f"ZIP备份创建成功: {backup_path}")
         return True
@@ -397,10 +408,28 @@ def sync_data(force=False, direction='both', backup_path=None):
             print("下载ZIP备份失败")
             return False
         
+        # 替换数据库文件前合并WAL日志并关闭空闲连接，避免旧日志被应用到新文件；
+        # 日志未能全部写回时不替换
+        try:
+            checkpoint()
+        except Exception as e:
+            print(f"合并WAL日志失败，取消恢复: {e}")
+            os.remove(temp_zip_path)
+            return False
+        reset_pool()
+        
         # 解压ZIP文件
         if not extract_zip_backup(temp_zip_path, DATA_DIR):
             print("解压ZIP备份失败")
             success = False
+        else:
+            # 数据库文件已被替换，丢弃连接池中的旧连接
+            reset_pool()
+            # 备份可能来自旧版本，执行未应用的迁移；重新生成实例标识，
+            # 客户端缓存的ETag/Last-Modified不会与恢复后的数据混淆
+            from app.migrations import ensure_schema
+            ensure_schema()
+            renew_instance_id()
         
         # 清理临时文件
         try:
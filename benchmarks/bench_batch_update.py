@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+批量修改基准测试
+
+在合成书库上修改一批书籍的状态和评分并添加一个标签，比较:
+- 逐条调用models.update_book和BaseDAO.add_tag（编辑表单的方式，每条记录多次提交）
+- models.batch_update_items（PATCH /api/books/batch，一个事务中按ID批量UPDATE）
+"""
+
+import sys
+import time
+import logging
+import argparse
+from app import models
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def one_by_one(book_dao, ids, tag):
+    """逐条修改"""
+    for id in ids:
+        models.update_book(id, {'status': 'read', 'rating': 4.0})
+        book_dao.add_tag(id, tag)
+
+def batched(book_dao, ids, tag):
+    """一次批量修改"""
+    models.batch_update_items('book', ids, {'status': 'read', 'rating': 4.0}, add_tags=[tag])
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='批量修改基准测试')
+    parser.add_argument('--items', type=int, default=20000, help='书籍条目数')
+    parser.add_argument('--batch', type=int, default=500, help='每次修改的条目数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items)
+        book_dao = BookDAO()
+        book_dao.rebuild_facet_counts()
+        book_dao.rebuild_item_tags()
+        ids = [item['id'] for item in book_dao.get_page(limit=args.batch * 2, columns=['title'])['items']]
+
+        print(f"条目数: {args.items}, 每次修改: {args.batch}")
+        print(f"{'方式':<12}{'耗时(ms)':>12}")
+        for name, func, chunk, tag in [('逐条修改', one_by_one, ids[:args.batch], '逐条标签'),
+                                       ('批量修改', batched, ids[args.batch:], '批量标签')]:
+            start = time.perf_counter()
+            func(book_dao, chunk, tag)
+            print(f"{name:<12}{(time.perf_counter() - start) * 1000:>12.1f}")
+            assert len(book_dao.get_by_tag(tag, columns=['title'])) == len(chunk), f"{name}的结果不正确"
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+批量写入基准测试
+
+导入合成书籍数据，比较:
+- 逐条调用BaseDAO.create（每行一次提交）
+- BaseDAO.create_many（一个事务内分批executemany）
+- 逐条调用models.add_book（与POST /api/books相同的字段映射，每行一次提交）
+- POST /api/books/bulk导入NDJSON（同样的字段映射，逐行解析、每批一个事务）
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+from app import app, database, models
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, make_books
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def run(name, rows, load):
+    """在新的临时数据库中执行导入，返回耗时（秒）"""
+    path = use_temp_database()
+    try:
+        start = time.perf_counter()
+        load(BookDAO(), rows)
+        elapsed = time.perf_counter() - start
+        assert BookDAO().count() == len(rows), f"{name}导入的行数不正确"
+        return elapsed
+    finally:
+        remove_database(path)
+
+def post_bulk(body):
+    """通过测试客户端调用批量导入接口"""
+    response = app.test_client().post('/api/books/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200, f"导入接口返回{response.status_code}"
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='批量写入基准测试')
+    parser.add_argument('--items', type=int, default=20000, help='导入的书籍条目数')
+    parser.add_argument('--batch-size', type=int, default=500, help='create_many每批行数')
+    args = parser.parse_args()
+
+    rows = make_books(args.items)
+    body = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+    scenarios = [
+        ('逐条create', lambda dao, rows: [dao.create(row) for row in rows]),
+        ('create_many', lambda dao, rows: dao.create_many(rows, batch_size=args.batch_size)),
+        ('逐条add_book', lambda dao, rows: [models.add_book(dict(row)) for row in rows]),
+        ('导入接口', lambda dao, rows: post_bulk(body)),
+    ]
+
+    print(f"书籍数: {args.items}, 存储档案PRAGMA: {database.get_storage_pragmas()}")
+    print(f"{'场景':<16}{'耗时(s)':>10}{'行/秒':>12}")
+    for name, load in scenarios:
+        elapsed = run(name, rows, load)
+        print(f"{name:<16}{elapsed:>10.2f}{args.items / elapsed:>12.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
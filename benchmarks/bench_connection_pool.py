@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+连接池基准测试
+
+模拟首页请求的数据库访问（三次列表查询加若干次按ID查询），比较:
+- 每次调用新建连接（旧行为，连接池大小为0）
+- 连接池复用连接
+- 连接池 + 请求级绑定（一个请求共用一个连接）
+"""
+
+import sys
+import logging
+import argparse
+from app import app, database
+from app.dao.book_dao import BookDAO
+from app.dao.movie_dao import MovieDAO
+from app.dao.music_dao import MusicDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='连接池基准测试')
+    parser.add_argument('--items', type=int, default=50, help='每种媒体的条目数')
+    parser.add_argument('--requests', type=int, default=500, help='模拟请求次数')
+    args = parser.parse_args()
+    
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items, movies=args.items, music=args.items)
+        book_dao, movie_dao, music_dao = BookDAO(), MovieDAO(), MusicDAO()
+        book_ids = [b['id'] for b in book_dao.get_all()][:5]
+        
+        def simulated_request():
+            book_dao.get_all()
+            movie_dao.get_all()
+            music_dao.get_all()
+            for book_id in book_ids:
+                book_dao.get_by_id(book_id)
+        
+        def simulated_bound_request():
+            with app.test_request_context('/'):
+                simulated_request()
+                database.close_request_connection()
+        
+        scenarios = [
+            ('每次新建连接', 0, simulated_request),
+            ('连接池', database.POOL_SIZE, simulated_request),
+            ('连接池+请求绑定', database.POOL_SIZE, simulated_bound_request),
+        ]
+        
+        print(f"{'场景':<16}{'平均(ms)':>12}{'p95(ms)':>12}")
+        for name, size, func in scenarios:
+            database.pool = database.ConnectionPool(size)
+            func()  # 预热
+            mean, p95 = summarize(timed(func, args.requests))
+            print(f"{name:<16}{mean:>12.3f}{p95:>12.3f}")
+        
+        database.pool = database.ConnectionPool()
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
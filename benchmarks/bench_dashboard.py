@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+首页概览基准测试
+
+在合成书库上比较首页数据的两种读取方式:
+- 旧的方式（get_all读取三类条目的全部记录，在Python中按created_at排序取前几条并计数）
+- get_dashboard_summary（一个连接中按索引读取最近记录，状态计数读取facet_counts表）
+"""
+
+import sys
+import logging
+import argparse
+from app.dao.book_dao import BookDAO
+from app.dao.movie_dao import MovieDAO
+from app.dao.music_dao import MusicDAO
+from app.dao.dashboard import get_dashboard_summary
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def load_all(daos, limit):
+    """旧版首页：读取全部记录后排序"""
+    result = {}
+    for item_type, dao in daos.items():
+        items = dao.get_all()
+        items.sort(key=lambda item: item.get('created_at') or '', reverse=True)
+        result[item_type] = {'recent': items[:limit], 'total': len(items)}
+    return result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='首页概览基准测试')
+    parser.add_argument('--items', type=int, default=50000, help='书籍、电影和音乐各自的条目数')
+    parser.add_argument('--repeat', type=int, default=20, help='每种方式重复次数')
+    parser.add_argument('--limit', type=int, default=3, help='每类条目的最近记录数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items, movies=args.items, music=args.items)
+        daos = {'book': BookDAO(), 'movie': MovieDAO(), 'music': MusicDAO()}
+        # 合成数据直接写入表中，需要重新统计一次计数
+        for dao in daos.values():
+            dao.rebuild_facet_counts()
+
+        print(f"条目数: 每类{args.items}")
+        print(f"{'方式':<12}{'平均(ms)':>12}{'p95(ms)':>12}")
+        for name, func in [('全部读取', lambda: load_all(daos, args.limit)),
+                           ('首页概览', lambda: get_dashboard_summary(daos, args.limit))]:
+            mean, p95 = summarize(timed(func, args.repeat))
+            print(f"{name:<12}{mean:>12.2f}{p95:>12.2f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+豆瓣响应缓存基准测试
+
+在本机替身HTTP服务器（见bench_douban_http）上模拟豆瓣的响应延迟，按预览、导入、重复搜索的
+访问模式反复请求一组页面，比较:
+- 不使用缓存（每次都请求服务器）
+- 使用响应缓存（app/douban/cache.py，首次请求后读取本地SQLite）
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from app.douban.http import create_adapter, create_session
+from app.douban.cache import HttpCache
+from benchmarks.bench_douban_http import StandInHandler
+from benchmarks.common import summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+class SlowHandler(StandInHandler):
+    """每个请求等待固定时间，模拟豆瓣的响应延迟"""
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='豆瓣响应缓存基准测试')
+    parser.add_argument('--pages', type=int, default=20, help='不同页面数')
+    parser.add_argument('--requests', type=int, default=200, help='请求总数')
+    parser.add_argument('--latency-ms', type=float, default=150, help='模拟豆瓣的响应时间（毫秒）')
+    parser.add_argument('--page-kb', type=int, default=100, help='页面大小（KB）')
+    args = parser.parse_args()
+
+    SlowHandler.latency = args.latency_ms / 1000
+    SlowHandler.body = b'<html>' + '页'.encode('utf-8') * (args.page_kb * 1024 // 3) + b'</html>'
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}/subject'
+    session = create_session(create_adapter())
+    rng = random.Random(0)
+    urls = [f'{base}/{rng.randrange(args.pages)}/' for _ in range(args.requests)]
+
+    path = os.path.join(tempfile.mkdtemp(), 'douban_cache.db')
+    cache = HttpCache(path)
+    try:
+        def fetch_uncached(url):
+            return session.get(url, timeout=10).text
+
+        def fetch_cached(url):
+            return cache.fetch('detail', url, None, lambda: fetch_uncached(url))
+
+        print(f"请求数: {args.requests}, 不同页面: {args.pages}, 模拟响应时间: {args.latency_ms}ms")
+        print(f"{'方式':<10}{'平均(ms)':>12}{'p95(ms)':>12}{'总耗时(s)':>12}")
+        for name, fetch in [('不使用缓存', fetch_uncached), ('响应缓存', fetch_cached)]:
+            timings = []
+            for url in urls:
+                start = time.perf_counter()
+                fetch(url)
+                timings.append(time.perf_counter() - start)
+            mean, p95 = summarize(timings)
+            print(f"{name:<10}{mean:>12.2f}{p95:>12.2f}{sum(timings):>12.2f}")
+        print(f"缓存统计: {cache.stats()}")
+        return 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        cache.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(os.path.dirname(path))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+豆瓣离线样本集基准测试
+
+按样本清单benchmarks/fixtures/douban/corpus.json，在离线保存的搜索页和详情页上
+调用search、get_*_detail和_get_music_artist，对每个样本:
+- 检查解析结果与清单中的期望一致（不一致时返回非零退出码）
+- 统计每次调用的CPU时间（time.process_time）
+- 用tracemalloc统计单次调用的内存峰值，以及调用结束后尚未释放的内存块数
+  （BeautifulSoup的树含循环引用，要等到垃圾回收才释放，这一列反映留给GC的负担）
+
+样本覆盖了搜索结果的各种页面结构（每种结构对应search中的一个选择器，
+可以看出回退选择器的开销），以及有无JSON-LD、作者为链接或纯文本、
+表演者在标签span内外等详情页写法。页面预先放入临时的响应缓存，不访问网络。
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from app.douban.api import DoubanAPI
+from app.douban.parser import PARSER_BACKENDS, make_soup
+from benchmarks.common import (load_douban_corpus, load_douban_fixture, douban_corpus_cache,
+                               run_douban_case, corpus_mismatches)
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+# 部分样本故意没有JSON-LD，详情方法每次都会记录回退警告
+logging.getLogger('app.douban.api').setLevel(logging.ERROR)
+
+def cpu_ms(func, repeat):
+    """预热一次后执行func repeat次，返回每次的平均CPU时间（毫秒）和最后一次的结果"""
+    func()
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - start) / repeat * 1000, result
+
+def allocations(func):
+    """在tracemalloc下执行一次func，返回(内存峰值KB, 调用结束后尚未释放的内存块数)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return peak / 1024, blocks
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='豆瓣离线样本集基准测试')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS + ('all',), default='all',
+                        help='解析方式，默认逐一测试全部方式')
+    parser.add_argument('--repeat', type=int, default=20, help='每个样本的调用次数')
+    args = parser.parse_args()
+    backends = PARSER_BACKENDS if args.parser == 'all' else (args.parser,)
+
+    corpus = load_douban_corpus()
+    directory = tempfile.mkdtemp(prefix='bench_douban_')
+    cache = douban_corpus_cache(os.path.join(directory, 'douban_cache.db'), corpus)
+    failures = 0
+    try:
+        print(f"样本数: {len(corpus)}，重复次数: {args.repeat}")
+        for backend in backends:
+            api = DoubanAPI(cache=cache, parser=backend)
+            print(f"\n解析方式: {backend}")
+            print(f"{'页面':<22}{'解析方法':<20}{'CPU(ms)':>10}{'峰值(KB)':>12}{'留存块':>10}  结果")
+            total = 0.0
+            for case in corpus:
+                # 直接解析页面的方法在预先构建的soup上计时，只统计方法本身
+                soup = None
+                if not case.get('url'):
+                    soup = make_soup(load_douban_fixture(case['page']), 'detail', backend)
+                call = lambda: run_douban_case(api, case, soup)
+                elapsed, result = cpu_ms(call, args.repeat)
+                peak, blocks = allocations(call)
+                mismatches = corpus_mismatches(result, case['expect'])
+                total += elapsed
+                print(f"{case['page']:<22}{case['method']:<20}{elapsed:>10.2f}{peak:>12.1f}{blocks:>10}  "
+                      f"{'通过' if not mismatches else '不一致'}")
+                for mismatch in mismatches:
+                    print(f"    {mismatch}")
+                failures += bool(mismatches)
+            print(f"{'合计':<42}{total:>10.2f}")
+        if failures:
+            print(f"\n{failures}个样本的解析结果与期望不一致")
+            return 1
+        return 0
+    finally:
+        cache.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+豆瓣HTTP连接池基准测试
+
+在本机启动一个替身HTTP服务器（HTTP/1.1 keep-alive，返回固定大小的页面），比较每次抓取的耗时:
+- 每次请求调用requests.get（每次新建连接，原来的DoubanAPI的方式）
+- 通过共享连接池的Session（app/douban/http.py，复用连接）
+
+真实的豆瓣请求每次新建连接都要完成TCP和TLS握手（至少两个往返），--handshake-ms在服务器接受每个
+新连接时等待相应的时间，模拟这部分开销。
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.douban.http import create_adapter, create_session
+from benchmarks.common import timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """替身服务器：每个新连接先等待握手时间，之后同一连接上的请求直接返回页面"""
+    protocol_version = 'HTTP/1.1'
+    handshake = 0.0
+    body = b''
+
+    def setup(self):
+        time.sleep(self.handshake)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='豆瓣HTTP连接池基准测试')
+    parser.add_argument('--requests', type=int, default=200, help='每种方式的请求数')
+    parser.add_argument('--handshake-ms', type=float, default=20, help='模拟每个新连接的握手耗时（毫秒）')
+    parser.add_argument('--page-kb', type=int, default=100, help='页面大小（KB）')
+    args = parser.parse_args()
+
+    StandInHandler.handshake = args.handshake_ms / 1000
+    StandInHandler.body = b'<html>' + b'x' * (args.page_kb * 1024) + b'</html>'
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/subject/1/'
+
+    try:
+        session = create_session(create_adapter())
+        print(f"请求数: {args.requests}, 模拟握手: {args.handshake_ms}ms, 页面: {args.page_kb}KB")
+        print(f"{'方式':<14}{'平均(ms)':>12}{'p95(ms)':>12}")
+        for name, fetch in [('requests.get', lambda: requests.get(url, timeout=10).raise_for_status()),
+                            ('连接池Session', lambda: session.get(url, timeout=10).raise_for_status())]:
+            mean, p95 = summarize(timed(fetch, args.requests))
+            print(f"{name:<14}{mean:>12.2f}{p95:>12.2f}")
+        return 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
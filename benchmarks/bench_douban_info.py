@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+豆瓣#info解析基准测试
+
+在离线保存的详情页样本（benchmarks/fixtures/douban/）上比较提取#info字段的耗时:
+- 逐个字段搜索（原来的_get_info_item/_get_author_or_translator，每个字段用find(text=...)重新搜索#info）
+- 单次遍历（app/douban/parser.py的parse_info，遍历一次得到全部字段）
+两种方式使用同一个已构建的BeautifulSoup对象，只比较字段提取本身；另外给出构建BeautifulSoup的耗时作参照。
+"""
+
+import sys
+import logging
+import argparse
+from bs4 import BeautifulSoup
+from app.douban.parser import parse_info, info_text, info_people, PUBLISH_DATE_LABELS
+from benchmarks.common import timed, summarize, load_douban_fixture
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def legacy_info_item(soup, label):
+    """原来的_get_info_item：每次调用都重新查找#info并搜索标签"""
+    info = soup.find("div", id="info")
+    if not info:
+        return ""
+    span = info.find("span", text=lambda t: t and label in t)
+    if not span and label == "出版年":
+        for alt_label in PUBLISH_DATE_LABELS[1:]:
+            span = info.find("span", text=lambda t: t and alt_label in t)
+            if span:
+                break
+    if not span:
+        return ""
+    content = span.next_sibling
+    if not content or not content.strip():
+        content = span.find_next_sibling()
+    return content.text.strip().replace("/", ",") if content else ""
+
+def legacy_people(soup, label):
+    """原来的_get_author_or_translator（链接部分）"""
+    info = soup.find("div", id="info")
+    if not info:
+        return ""
+    span = info.find("span", text=lambda t: t and label in t)
+    if not span:
+        return ""
+    names = []
+    element = span.next_sibling
+    while element and not (element.name == "span" and element.text.strip()):
+        if element.name == "a":
+            names.append(' '.join(element.text.split()))
+        element = element.next_sibling
+    return ", ".join(names)
+
+def legacy_music_item(soup, label):
+    """原来get_music_detail中的写法：在#info中搜索标签，取其后的文本"""
+    info = soup.find("div", {"id": "info"})
+    span = info.find("span", text=lambda t: t and label in t) if info else None
+    return span.next_sibling.strip() if span and span.next_sibling else ""
+
+def legacy_fields(soup, people, labels, item):
+    """逐个字段搜索"""
+    return [legacy_people(soup, label) for label in people] + [item(soup, label) for label in labels]
+
+def single_pass_fields(soup, people, labels):
+    """单次遍历后按标签读取"""
+    info = parse_info(soup)
+    return [info_people(info, label) for label in people] + [info_text(info, label) for label in labels]
+
+# (页面样本, 人名字段, 其他字段, 原来的取值方式)，与详情方法提取的字段相同
+CASES = [
+    ('movie_1292052.html', (), ("制片国家/地区", "语言", "片长", "IMDb"), legacy_info_item),
+    ('book_4820710.html', ("作者", "译者"), ("丛书", "出版社", "出版年", "页数", "定价", "ISBN"), legacy_info_item),
+    ('music_1418215.html', (), ("发行时间", "流派", "出版者", "介质"), legacy_music_item),
+]
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='豆瓣#info解析基准测试')
+    parser.add_argument('--repeat', type=int, default=500, help='每种方式的重复次数')
+    args = parser.parse_args()
+
+    print(f"重复次数: {args.repeat}")
+    print(f"{'页面':<22}{'构建soup(ms)':>14}{'逐个搜索(ms)':>14}{'单次遍历(ms)':>14}{'加速':>8}")
+    for name, people, labels, item in CASES:
+        html = load_douban_fixture(name)
+        build, _ = summarize(timed(lambda: BeautifulSoup(html, "html.parser"), max(1, args.repeat // 10)))
+        soup = BeautifulSoup(html, "html.parser")
+        before, _ = summarize(timed(lambda: legacy_fields(soup, people, labels, item), args.repeat))
+        after, _ = summarize(timed(lambda: single_pass_fields(soup, people, labels), args.repeat))
+        print(f"{name:<22}{build:>14.3f}{before:>14.3f}{after:>14.3f}{before / after:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
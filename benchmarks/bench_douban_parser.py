@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+豆瓣页面解析方式基准测试
+
+在离线保存的详情页样本（benchmarks/fixtures/douban/）上，用三种解析方式（app/douban/parser.py）
+调用get_movie_detail、get_book_detail和get_music_detail，比较每页的CPU时间:
+- html.parser: 原来的方式，构建整个页面的DOM
+- lxml: C实现的解析器，构建整个页面的DOM
+- partial: lxml加SoupStrainer，只构建详情方法会读取的元素
+页面预先放入临时的响应缓存，不访问网络；同时检查三种方式提取的结果相同。
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from app.douban.api import DoubanAPI
+from app.douban.cache import HttpCache, cache_key
+from app.douban.parser import PARSER_BACKENDS
+from benchmarks.common import load_douban_fixture
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+# (页面样本, 详情方法, 条目ID, 页面地址)
+PAGES = [
+    ('movie_1292052.html', 'get_movie_detail', '1292052', 'https://movie.douban.com/subject/1292052/'),
+    ('book_4820710.html', 'get_book_detail', '4820710', 'https://book.douban.com/subject/4820710/'),
+    ('music_1418215.html', 'get_music_detail', '1418215', 'https://music.douban.com/subject/1418215/'),
+]
+
+def cpu_ms(func, repeat):
+    """预热一次后执行func repeat次，返回每次的平均CPU时间（毫秒）和最后一次的结果"""
+    func()
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - start) / repeat * 1000, result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='豆瓣页面解析方式基准测试')
+    parser.add_argument('--repeat', type=int, default=50, help='每个页面每种方式的解析次数')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench_douban_')
+    cache = HttpCache(os.path.join(directory, 'douban_cache.db'))
+    try:
+        for name, _, _, url in PAGES:
+            cache.put(cache_key(url), 'detail', load_douban_fixture(name))
+
+        print(f"重复次数: {args.repeat}")
+        print(f"{'页面':<22}" + ''.join(f"{backend + '(ms)':>18}" for backend in PARSER_BACKENDS) + f"{'加速':>8}")
+        for name, method, item_id, _ in PAGES:
+            timings, results = [], []
+            for backend in PARSER_BACKENDS:
+                api = DoubanAPI(cache=cache, parser=backend)
+                elapsed, result = cpu_ms(lambda: getattr(api, method)(item_id), args.repeat)
+                timings.append(elapsed)
+                results.append(result)
+            assert all(result == results[0] for result in results), f"{name}: 各解析方式的结果不同"
+            print(f"{name:<22}" + ''.join(f"{elapsed:>18.2f}" for elapsed in timings) +
+                  f"{timings[0] / timings[-1]:>7.1f}x")
+        return 0
+    finally:
+        cache.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+导出基准测试
+
+在合成书库上通过测试客户端请求导出，比较两种方式的首字节时间、总耗时和Python内存峰值（tracemalloc）:
+- 一次性导出（get_all读取全部记录后json.dumps为一个响应）
+- 流式导出（/api/export，游标逐批读取，生成器逐块发送），分别测试ndjson、csv和gzip压缩的ndjson
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+from app import app
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def export_all(book_dao):
+    """一次性导出：整个响应体在内存中构建完成后才能发送"""
+    yield json.dumps(book_dao.get_all(), ensure_ascii=False).encode('utf-8')
+
+def export_stream(client, query):
+    """流式导出：逐块读取响应体"""
+    response = client.get(f'/api/export?type=books&{query}', buffered=False)
+    try:
+        yield from response.response
+    finally:
+        response.close()
+
+def measure(chunks):
+    """返回(首字节毫秒, 总耗时毫秒, 字节数, 内存峰值MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first * 1000, total * 1000, size, peak / 1024 / 1024
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='导出基准测试')
+    parser.add_argument('--items', type=int, default=100000, help='书籍条目数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items)
+        book_dao = BookDAO()
+        client = app.test_client()
+
+        print(f"条目数: {args.items}")
+        print(f"{'方式':<16}{'首字节(ms)':>12}{'总耗时(ms)':>12}{'大小(MB)':>10}{'内存峰值(MB)':>14}")
+        cases = [
+            ('一次性JSON', lambda: export_all(book_dao)),
+            ('流式NDJSON', lambda: export_stream(client, 'format=ndjson')),
+            ('流式CSV', lambda: export_stream(client, 'format=csv')),
+            ('流式NDJSON+gzip', lambda: export_stream(client, 'format=ndjson&gzip=1')),
+        ]
+        for name, func in cases:
+            first, total, size, peak = measure(func())
+            print(f"{name:<16}{first:>12.1f}{total:>12.1f}{size / 1024 / 1024:>10.1f}{peak:>14.1f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
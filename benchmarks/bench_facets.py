@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+筛选项基准测试
+
+在合成书库上比较列表页读取筛选下拉框取值的两种方式:
+- 旧的扫描方式（get_distinct_values，读取整列并在Python中按逗号拆分、去重）
+- facet_counts表（get_facets，一次按主键前缀的索引查询）
+"""
+
+import sys
+import logging
+import argparse
+from app.dao.book_dao import BookDAO
+from app.dao.movie_dao import MovieDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def scan_book_options(book_dao):
+    """旧版图书列表页的筛选列表"""
+    return book_dao.get_distinct_values('tags', split=True), book_dao.get_distinct_values('author')
+
+def scan_movie_options(movie_dao):
+    """旧版电影列表页的筛选列表"""
+    return (movie_dao.get_distinct_values('genre', split=True), movie_dao.get_distinct_values('director'),
+            movie_dao.get_distinct_values('cast', split=True))
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='筛选项基准测试')
+    parser.add_argument('--items', type=int, default=100000, help='书籍和电影各自的条目数')
+    parser.add_argument('--repeat', type=int, default=20, help='每种方式重复次数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items, movies=args.items)
+        book_dao = BookDAO()
+        movie_dao = MovieDAO()
+        # 合成数据直接写入表中，需要重新统计一次计数
+        book_dao.rebuild_facet_counts()
+        movie_dao.rebuild_facet_counts()
+
+        cases = [
+            ('图书', lambda: scan_book_options(book_dao), lambda: book_dao.get_facets(['tag', 'author'])),
+            ('电影', lambda: scan_movie_options(movie_dao),
+             lambda: movie_dao.get_facets(['genre', 'director', 'actor'])),
+        ]
+        print(f"条目数: {args.items}")
+        print(f"{'页面':<8}{'扫描平均(ms)':>14}{'扫描p95(ms)':>14}{'计数表平均(ms)':>16}{'计数表p95(ms)':>16}")
+        for name, scan, facets in cases:
+            scan_mean, scan_p95 = summarize(timed(scan, args.repeat))
+            facet_mean, facet_p95 = summarize(timed(facets, args.repeat))
+            print(f"{name:<8}{scan_mean:>14.2f}{scan_p95:>14.2f}{facet_mean:>16.2f}{facet_p95:>16.2f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+批量获取基准测试
+
+在合成书库上按ID列表读取一批书籍，比较:
+- 逐个请求GET /api/books/<id>（每个ID一次HTTP请求和一次数据库查询）
+- 一次请求GET /api/books?ids=...（BaseDAO.get_many，每500个ID一条IN查询）
+"""
+
+import sys
+import random
+import logging
+import argparse
+from app import app
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='批量获取基准测试')
+    parser.add_argument('--items', type=int, default=20000, help='书籍条目数')
+    parser.add_argument('--ids', type=int, default=200, help='每次读取的ID数')
+    parser.add_argument('--repeat', type=int, default=5, help='每种方式重复次数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items)
+        all_ids = [item['id'] for item in BookDAO().get_all(columns=['title'])]
+        ids = random.Random(0).sample(all_ids, min(args.ids, len(all_ids)))
+        client = app.test_client()
+
+        def one_by_one():
+            for id in ids:
+                assert client.get(f'/api/books/{id}').status_code == 200
+
+        def multi_get():
+            response = client.post('/api/books/lookup', json={'ids': ids})
+            assert len(response.get_json()['items']) == len(ids)
+
+        print(f"条目数: {args.items}, 每次读取: {len(ids)}个ID")
+        print(f"{'方式':<12}{'平均(ms)':>12}{'p95(ms)':>12}")
+        for name, func in [('逐个请求', one_by_one), ('批量获取', multi_get)]:
+            mean, p95 = summarize(timed(func, args.repeat))
+            print(f"{name:<12}{mean:>12.2f}{p95:>12.2f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+字段投影基准测试
+
+在合成书库上比较全部字段(SELECT *)与列表页投影(LIST_COLUMNS)的:
+- 一页列表查询的耗时
+- 读取全部书籍的耗时和Python内存峰值（tracemalloc）
+- 结果集大小（JSON序列化后的字节数）
+"""
+
+import sys
+import json
+import logging
+import argparse
+import tracemalloc
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def peak_memory(func):
+    """执行func，返回(结果, 内存峰值MB)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024 / 1024
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='字段投影基准测试')
+    parser.add_argument('--books', type=int, default=50000, help='书籍条目数')
+    parser.add_argument('--page-size', type=int, default=60, help='每页条数')
+    parser.add_argument('--repeat', type=int, default=200, help='分页查询重复次数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.books)
+        book_dao = BookDAO()
+
+        print(f"书籍数: {args.books}, 每页: {args.page_size}")
+        print(f"{'场景':<12}{'分页平均(ms)':>14}{'分页p95(ms)':>14}{'全量(ms)':>12}{'内存峰值(MB)':>14}{'JSON(MB)':>12}")
+        for name, columns in [('全部字段', None), ('列表投影', 'list')]:
+            page = lambda: book_dao.get_page('-created_at', limit=args.page_size, columns=columns)
+            page()  # 预热
+            mean, p95 = summarize(timed(page, args.repeat))
+
+            full_time, _ = summarize(timed(lambda: book_dao.get_all(columns), 3))
+            rows, peak = peak_memory(lambda: book_dao.get_all(columns))
+            size = len(json.dumps(rows, ensure_ascii=False).encode('utf-8')) / 1024 / 1024
+            print(f"{name:<12}{mean:>14.3f}{p95:>14.3f}{full_time:>12.1f}{peak:>14.1f}{size:>12.1f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
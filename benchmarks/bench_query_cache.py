@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+查询缓存基准测试
+
+在合成书库上比较列表页常用读取（首页、标签云、筛选项、条目数）在三种设置下的耗时:
+- 关闭缓存（每次都查询数据库）
+- 进程内代数（单进程部署）
+- 共享代数（每次读取缓存前从cache_generations表读取代数，多进程部署）
+"""
+
+import sys
+import logging
+import argparse
+from app.dao.book_dao import BookDAO
+from app.dao.cache import query_cache
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+def read_list_page(book_dao):
+    """图书列表页及标签云的读取"""
+    book_dao.get_page('-created_at', limit=50, columns='list')
+    book_dao.get_facets(['tag', 'author'])
+    book_dao.get_all_tags()
+    book_dao.count()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='查询缓存基准测试')
+    parser.add_argument('--items', type=int, default=50000, help='书籍条目数')
+    parser.add_argument('--repeat', type=int, default=50, help='每种设置重复次数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.items)
+        book_dao = BookDAO()
+        book_dao.rebuild_facet_counts()
+        book_dao.rebuild_item_tags()
+
+        print(f"条目数: {args.items}")
+        print(f"{'设置':<12}{'平均(ms)':>12}{'p95(ms)':>12}{'命中率':>10}")
+        for name, enabled, shared in [('关闭缓存', False, False), ('进程内代数', True, False),
+                                      ('共享代数', True, True)]:
+            query_cache.configure(enabled=enabled, shared=shared)
+            mean, p95 = summarize(timed(lambda: read_list_page(book_dao), args.repeat))
+            print(f"{name:<12}{mean:>12.2f}{p95:>12.2f}{query_cache.stats()['hit_rate']:>10.2%}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+全文搜索基准测试
+
+在合成书库上比较:
+- 旧的LIKE搜索（六个字段 LIKE '%q%' OR ...，全表扫描，无排序）
+- FTS5全文索引搜索（trigram分词，bm25相关度排序，取前20条）
+
+少于3个字的词无法使用trigram索引，逐行匹配；"无果"（没有匹配）是这种情况下的最坏情况（扫描全表）。
+"""
+
+import sys
+import logging
+import argparse
+from app import database
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library, timed, summarize
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.WARNING)
+
+LIKE_FIELDS = ['title', 'author', 'isbn', 'publisher', 'notes', 'tags']
+
+def like_search(query):
+    """旧版BaseDAO.search的查询方式"""
+    conn = database.get_connection()
+    try:
+        where_clause = ' OR '.join(f'{field} LIKE ?' for field in LIKE_FIELDS)
+        cursor = conn.execute(f'SELECT * FROM books WHERE {where_clause}',
+                              tuple(f'%{query}%' for _ in LIKE_FIELDS))
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        database.release_connection(conn)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='全文搜索基准测试')
+    parser.add_argument('--books', type=int, default=100000, help='书籍条目数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询重复次数')
+    args = parser.parse_args()
+
+    path = use_temp_database()
+    try:
+        seed_library(books=args.books)
+        book_dao = BookDAO()
+        queries = ['作者42', '出版社7', '9780000012345', '科幻', '无果']
+
+        print(f"书籍数: {args.books}")
+        print(f"{'查询':<16}{'LIKE平均(ms)':>14}{'LIKE结果数':>12}{'FTS平均(ms)':>14}{'FTS p95(ms)':>14}")
+        for query in queries:
+            like_mean, _ = summarize(timed(lambda: like_search(query), args.repeat))
+            like_count = len(like_search(query))
+            book_dao.search(query)  # 预热
+            fts_mean, fts_p95 = summarize(timed(lambda: book_dao.search(query), args.repeat))
+            print(f"{query:<16}{like_mean:>14.2f}{like_count:>12}{fts_mean:>14.2f}{fts_p95:>14.2f}")
+        return 0
+    finally:
+        remove_database(path)
+
+if __name__ == "__main__":
+    sys.exit(main())
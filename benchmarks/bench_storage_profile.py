@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+存储配置档案并发基准测试
+
+多个线程同时执行混合读写（默认80%读、20%写），比较SQLite默认设置与
+production档案（WAL、synchronous=NORMAL、busy_timeout等）的吞吐量和失败次数。
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+from app import database
+from app.dao.book_dao import BookDAO
+from benchmarks.common import use_temp_database, remove_database, seed_library
+
+# app包导入时已配置了INFO级别日志，基准测试只输出警告以上级别
+logging.getLogger().setLevel(logging.CRITICAL)
+logger = logging.getLogger(__name__)
+
+def run_profile(profile, threads, duration, write_ratio, items):
+    """在指定档案下运行并发负载，返回(读次数, 写次数, 失败次数)"""
+    database.configure_storage(profile, overrides={})
+    path = use_temp_database()
+    try:
+        seed_library(books=items)
+        book_dao = BookDAO()
+        book_ids = [b['id'] for b in book_dao.get_all()]
+        counters = {'reads': 0, 'writes': 0, 'failures': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        
+        def worker(seed):
+            rng = random.Random(seed)
+            reads = writes = failures = 0
+            while time.perf_counter() < deadline:
+                book_id = rng.choice(book_ids)
+                if rng.random() < write_ratio:
+                    if book_dao.update(book_id, {'rating': rng.randint(0, 50) / 10}):
+                        writes += 1
+                    else:
+                        failures += 1
+                else:
+                    if book_dao.get_by_id(book_id) is not None:
+                        reads += 1
+                    else:
+                        failures += 1
+            with lock:
+                counters['reads'] += reads
+                counters['writes'] += writes
+                counters['failures'] += failures
+        
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return counters['reads'], counters['writes'], counters['failures']
+    finally:
+        remove_database(path)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='存储配置档案并发基准测试')
+    parser.add_argument('--threads', type=int, default=8, help='并发线程数')
+    parser.add_argument('--duration', type=float, default=5.0, help='每个档案的运行时间（秒）')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='写操作比例')
+    parser.add_argument('--items', type=int, default=2000, help='书籍条目数')
+    args = parser.parse_args()
+    
+    print(f"{'档案':<12}{'读/秒':>10}{'写/秒':>10}{'失败':>8}")
+    for profile in ('default', 'production'):
+        reads, writes, failures = run_profile(profile, args.threads, args.duration,
+                                              args.write_ratio, args.items)
+        print(f"{profile:<12}{reads / args.duration:>10.0f}{writes / args.duration:>10.0f}{failures:>8}")
+    
+    database.configure_storage()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+基准测试公共工具：临时数据库与合成数据
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import tempfile
+from datetime import datetime, timedelta
+from app import database
+from app.dao.cache import query_cache
+from app.douban.cache import HttpCache, cache_key
+from app.douban.parser import make_soup
+
+BOOK_TAGS = ["小说", "文学", "历史", "科幻", "奇幻", "悬疑", "传记", "科普", "哲学", "心理学"]
+MOVIE_GENRES = ["动作", "喜剧", "剧情", "科幻", "动画", "纪录片", "爱情", "惊悚"]
+MUSIC_GENRES = ["流行", "摇滚", "民谣", "电子", "古典", "爵士"]
+
+def use_temp_database(prefix='bench_'):
+    """切换到临时数据库文件并初始化表结构，返回数据库路径"""
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix='.db')
+    os.close(fd)
+    os.remove(path)
+    database.DB_FILE = path
+    database.reset_pool()
+    database.init_db()
+    # 基准测试比较的是查询本身，关闭查询结果缓存（bench_query_cache单独测试缓存）
+    query_cache.configure(enabled=False)
+    return path
+
+def remove_database(path):
+    """删除临时数据库及其附属文件"""
+    database.reset_pool()
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+def _timestamp(i):
+    return (datetime(2020, 1, 1) + timedelta(minutes=i)).isoformat()
+
+def make_books(n, seed=0):
+    """生成n本合成书籍数据"""
+    rng = random.Random(seed)
+    books = []
+    for i in range(n):
+        books.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'title': f"书籍{i}",
+            'author': f"作者{rng.randint(1, max(1, n // 20))}",
+            'publisher': f"出版社{rng.randint(1, 50)}",
+            'isbn': str(9780000000000 + i),
+            'status': rng.choice(['unread', 'wish', 'reading', 'read']),
+            'rating': rng.randint(0, 50) / 10,
+            'notes': '笔记' * rng.randint(0, 50),
+            'description': '简介内容' * rng.randint(50, 200),
+            'cover_url': f"https://img1.doubanio.com/view/subject/{i}.jpg",
+            'tags': ','.join(rng.sample(BOOK_TAGS, rng.randint(1, 3))),
+            'is_owned': rng.randint(0, 1),
+            'created_at': _timestamp(i),
+            'updated_at': _timestamp(i),
+        })
+    return books
+
+def make_movies(n, seed=0):
+    """生成n部合成电影数据"""
+    rng = random.Random(seed)
+    movies = []
+    for i in range(n):
+        movies.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'title': f"电影{i}",
+            'director': f"导演{rng.randint(1, max(1, n // 10))}",
+            'cast': ','.join(f"演员{rng.randint(1, 500)}" for _ in range(3)),
+            'year': rng.randint(1950, 2025),
+            'genre': ','.join(rng.sample(MOVIE_GENRES, rng.randint(1, 3))),
+            'status': rng.choice(['watched', 'wish', 'unwatched']),
+            'rating': rng.randint(0, 50) / 10,
+            'notes': '',
+            'poster_url': '',
+            'tags': '',
+            'created_at': _timestamp(i),
+            'updated_at': _timestamp(i),
+        })
+    return movies
+
+def make_music(n, seed=0):
+    """生成n条合成音乐数据"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        album = f"专辑{i}"
+        items.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'title': album,
+            'album': album,
+            'artist': f"艺术家{rng.randint(1, max(1, n // 10))}",
+            'year': rng.randint(1960, 2025),
+            'genre': ','.join(rng.sample(MUSIC_GENRES, rng.randint(1, 2))),
+            'status': rng.choice(['listened', 'wish', 'unlistened']),
+            'rating': rng.randint(0, 50) / 10,
+            'notes': '',
+            'cover_url': '',
+            'tags': '',
+            'created_at': _timestamp(i),
+            'updated_at': _timestamp(i),
+        })
+    return items
+
+def insert_rows(table, rows):
+    """直接用executemany写入合成数据"""
+    if not rows:
+        return
+    fields = list(rows[0].keys())
+    sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})"
+    conn = database.get_db_connection()
+    try:
+        conn.executemany(sql, [tuple(row[f] for f in fields) for row in rows])
+        conn.commit()
+    finally:
+        conn.close()
+
+def seed_library(books=0, movies=0, music=0):
+    """写入合成书影音数据"""
+    insert_rows('books', make_books(books))
+    insert_rows('movies', make_movies(movies))
+    insert_rows('music', make_music(music))
+
+def timed(func, repeat):
+    """执行func repeat次，返回每次耗时（秒）的列表"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def summarize(timings):
+    """返回(平均毫秒, p95毫秒)"""
+    ordered = sorted(timings)
+    mean = sum(ordered) / len(ordered) * 1000
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    return mean, p95
+
+# 离线保存的豆瓣页面样本
+DOUBAN_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'douban')
+
+def load_douban_fixture(name):
+    """读取豆瓣页面样本，name为fixtures/douban/下的文件名"""
+    with open(os.path.join(DOUBAN_FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+def load_douban_corpus():
+    """读取样本清单fixtures/douban/corpus.json，返回样本列表
+
+    每个样本包含page（页面文件名）、method（调用的解析方法）和expect（期望结果），
+    经HTTP获取的页面还有url、params（请求参数）和args（方法参数）。
+    """
+    with open(os.path.join(DOUBAN_FIXTURES, 'corpus.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def douban_corpus_cache(path, corpus=None):
+    """把样本页面放入path处的响应缓存，返回HttpCache；DoubanAPI使用它即可离线解析"""
+    cache = HttpCache(path)
+    for case in corpus or load_douban_corpus():
+        if case.get('url'):
+            kind = 'search' if case['method'] == 'search' else 'detail'
+            cache.put(cache_key(case['url'], case.get('params')), kind,
+                      load_douban_fixture(case['page']))
+    return cache
+
+def run_douban_case(api, case, soup=None):
+    """按样本调用api的解析方法并返回结果
+
+    没有url的样本直接解析页面内容（如_get_music_artist），可以传入预先构建的soup。
+    """
+    method = getattr(api, case['method'])
+    if case.get('url'):
+        return method(*case.get('args', []))
+    if soup is None:
+        soup = make_soup(load_douban_fixture(case['page']), 'detail', api.parser)
+    return method(soup)
+
+def corpus_mismatches(actual, expected, path='$'):
+    """比较解析结果与期望，返回不一致之处的描述列表
+
+    期望为字典时只比较其中列出的字段；为列表时长度和每个元素都须一致；其余值须相等。
+    """
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict):
+            return [f"{path}: 期望字典，实际为{actual!r}"]
+        mismatches = []
+        for key, value in expected.items():
+            if key not in actual:
+                mismatches.append(f"{path}.{key}: 缺少字段")
+            else:
+                mismatches.extend(corpus_mismatches(actual[key], value, f"{path}.{key}"))
+        return mismatches
+    if isinstance(expected, list):
+        if not isinstance(actual, list) or len(actual) != len(expected):
+            return [f"{path}: 期望{len(expected)}项，实际为{actual!r}"]
+        mismatches = []
+        for i, (item, value) in enumerate(zip(actual, expected)):
+            mismatches.extend(corpus_mismatches(item, value, f"{path}[{i}]"))
+        return mismatches
+    if actual != expected:
+        return [f"{path}: 期望{expected!r}，实际为{actual!r}"]
+    return []
@@ -12,6 +12,7 @@ from app.database import get_db_connection
 from app.dao.book_dao import BookDAO
 from app.dao.movie_dao import MovieDAO
 from app.dao.music_dao import MusicDAO
+from app.dao.cache import bump_generation
 
 # 配置日志
 logging.basicConfig(
@@ -48,7 +49,10 @@ def clear_all_items():
         cursor.execute('DELETE FROM item_tags WHERE item_type IN ("book", "movie", "music")')
         item_tags_deleted = cursor.rowcount
         logger.info(f"已删除 {item_tags_deleted} 条标签关联记录")
-        
+
+        # 清空筛选项计数
+        cursor.execute('DELETE FROM facet_counts')
+
         # 清空三个主表
         cursor.execute('DELETE FROM books')
         books_deleted = cursor.rowcount
@@ -62,6 +66,10 @@ def clear_all_items():
         music_deleted = cursor.rowcount
         logger.info(f"已删除 {music_deleted} 条音乐记录")
         
+        # 使各进程缓存的查询结果过期
+        for table in ('books', 'movies', 'music'):
+            bump_generation(conn, table)
+        
         # 获取清空后的数量
         cursor.execute('SELECT COUNT(*) as count FROM books')
         books_count_after = cursor.fetchone()['count']
@@ -0,0 +1,16 @@
+"""
+pytest配置：每个测试使用独立的临时数据库，不读写data/media_manager.db
+"""
+
+import pytest
+from app import database
+from app.database import init_db
+
+@pytest.fixture(autouse=True)
+def temp_database(monkeypatch, tmp_path):
+    """切换到临时数据库并执行迁移，测试结束后恢复原数据库路径"""
+    monkeypatch.setattr(database, 'DB_FILE', str(tmp_path / 'media_manager.db'))
+    database.reset_pool()
+    init_db()
+    yield
+    database.reset_pool()
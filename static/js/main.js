@@ -279,4 +279,30 @@ function updateThemeIcon(theme) {
             lightIcon.classList.remove('d-none');
         }
     }
-} 
\ No newline at end of file
+} 
+// 列表页的筛选和排序由服务器完成：更新查询参数后从第一页重新加载，参数没有变化时不跳转
+function applyListParams(updates) {
+    var params = new URLSearchParams(window.location.search);
+    Object.keys(updates).forEach(function(name) {
+        var values = Array.isArray(updates[name]) ? updates[name] : [updates[name]];
+        params.delete(name);
+        values.forEach(function(value) {
+            if (value !== null && value !== undefined && String(value).trim() !== '') {
+                params.append(name, String(value).trim());
+            }
+        });
+    });
+    params.delete('cursor');
+    
+    // 参数顺序不同不算变化
+    var normalize = function(search) {
+        return Array.from(search.entries())
+            .filter(function(entry) { return entry[0] !== 'cursor'; })
+            .map(function(entry) { return entry[0] + '=' + entry[1]; })
+            .sort()
+            .join('&');
+    };
+    if (normalize(params) !== normalize(new URLSearchParams(window.location.search))) {
+        window.location.search = params.toString();
+    }
+}
@@ -9,10 +9,34 @@ import os
 import sys
 import logging
 import sqlite3
+import csv
+import gzip
+import json
+import uuid
+import time
+import tempfile
+import zipfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bs4 import BeautifulSoup
+from app import app
+from app import database
 from app.database import get_db_connection, init_db
 from app.dao.book_dao import BookDAO
 from app.dao.movie_dao import MovieDAO
 from app.dao.music_dao import MusicDAO
+from app import models
+from app.status import status_code, validate_status
+from app.config import get_config
+from app.logging_config import setup_logging, sample_trace, TraceFilter
+from app.dao.dashboard import get_dashboard_summary
+from app.webdav_sync import create_zip_backup
+from app.dao.cache import QueryCache, query_cache, configure_query_cache
+from app.douban import http as douban_http
+from app.douban.cache import HttpCache, cache_key
+from app.douban.api import DoubanAPI
+from app.douban.parser import parse_info, info_text, info_people, extract_json_ld, make_soup, PARSER_BACKENDS
+from benchmarks.common import load_douban_corpus, douban_corpus_cache, run_douban_case, corpus_mismatches
 
 # 设置日志
 logging.basicConfig(
@@ -26,107 +50,1195 @@ logger = logging.getLogger(__name__)
 
 def test_database_connection():
     """测试数据库连接"""
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT sqlite_version();')
-        version = cursor.fetchone()[0]
+        version = conn.execute('SELECT sqlite_version();').fetchone()[0]
+    finally:
         conn.close()
-        logger.info(f"SQLite版本: {version}")
-        return True
-    except Exception as e:
-        logger.error(f"数据库连接测试失败: {e}")
-        return False
+    logger.info(f"SQLite版本: {version}")
 
 def test_tables_exist():
     """测试表是否存在"""
+    conn = get_db_connection()
     try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()]
+    finally:
+        conn.close()
+    
+    expected_tables = ['books', 'movies', 'music', 'tags', 'item_tags', 'facet_counts']
+    missing_tables = [table for table in expected_tables if table not in tables]
+    assert not missing_tables, f"缺少以下表: {', '.join(missing_tables)}"
+    logger.info(f"所有必要的表都存在: {', '.join(tables)}")
+
+def test_schema_version():
+    """测试数据库架构已迁移到最新版本"""
+    from app.migrations import get_schema_version, latest_version
+    conn = get_db_connection()
+    try:
+        version = get_schema_version(conn)
+    finally:
+        conn.close()
+    assert version == latest_version(), f"架构版本 {version} 落后于最新版本 {latest_version()}"
+    logger.info(f"数据库架构版本: {version}")
+
+def test_migration_claim():
+    """测试迁移标记：其他进程迁移时等待，标记超时后接管，被接管后停止迁移"""
+    from datetime import datetime, timedelta
+    from app import migrations
+    
+    def set_state(version, claimed_at):
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # 获取所有表
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = [row[0] for row in cursor.fetchall()]
+        try:
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.execute('INSERT OR REPLACE INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)',
+                         (migrations.CLAIM_VERSION, 'other-host:1:abc', claimed_at.isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def read_state():
+        conn = get_db_connection()
+        try:
+            claim = conn.execute('SELECT name FROM schema_version WHERE version = ?',
+                                 (migrations.CLAIM_VERSION,)).fetchone()
+            return migrations.get_schema_version(conn), claim
+        finally:
+            conn.close()
+    
+    latest = init_db()
+    
+    # 其他进程持有未超时的标记时等待，标记清除后重新检查版本并执行剩余迁移
+    set_state(latest - 1, datetime.now())
+    worker = threading.Thread(target=migrations.migrate)
+    worker.start()
+    time.sleep(migrations.CLAIM_POLL_INTERVAL * 3)
+    assert worker.is_alive(), "其他进程正在迁移时不应继续执行"
+    assert read_state()[0] == latest - 1, "等待期间不应执行迁移"
+    conn = get_db_connection()
+    conn.execute('DELETE FROM schema_version WHERE version = ?', (migrations.CLAIM_VERSION,))
+    conn.commit()
+    conn.close()
+    worker.join(10)
+    assert not worker.is_alive(), "标记清除后迁移未完成"
+    assert read_state() == (latest, None), "迁移完成后应更新版本并清除标记"
+    
+    # 超时的标记视为中断，直接接管
+    set_state(latest - 1, datetime.now() - timedelta(seconds=migrations.CLAIM_TIMEOUT + 60))
+    assert migrations.migrate() == latest
+    assert read_state() == (latest, None), "接管后应更新版本并清除标记"
+    
+    # 标记被其他进程接管后，当前进程的心跳检查失败
+    conn = get_db_connection()
+    try:
+        migrations._claim_owner = 'this-host:2:def'
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            migrations.heartbeat(conn)
+            assert False, "标记不属于当前进程时应抛出MigrationClaimLost"
+        except migrations.MigrationClaimLost:
+            pass
+    finally:
+        migrations._claim_owner = None
+        conn.rollback()
         conn.close()
+    
+    logger.info("迁移标记测试通过")
+
+def test_book_dao():
+    """测试BookDAO功能"""
+    book_dao = BookDAO()
+    assert book_dao.create({'id': str(uuid.uuid4()), 'title': 'DAO测试书籍'}), "创建书籍失败"
+    items = book_dao.get_all()
+    logger.info(f"书籍总数: {len(items)}")
+    assert items, "未读取到书籍"
+    
+    item = book_dao.get_by_id(items[0]['id'])
+    assert item is not None, f"无法获取书籍ID: {items[0]['id']}"
+    logger.info(f"成功获取书籍: {item['title']}")
+
+def test_movie_dao():
+    """测试MovieDAO功能"""
+    movie_dao = MovieDAO()
+    assert movie_dao.create({'id': str(uuid.uuid4()), 'title': 'DAO测试电影'}), "创建电影失败"
+    items = movie_dao.get_all()
+    logger.info(f"电影总数: {len(items)}")
+    assert items, "未读取到电影"
+    
+    item = movie_dao.get_by_id(items[0]['id'])
+    assert item is not None, f"无法获取电影ID: {items[0]['id']}"
+    logger.info(f"成功获取电影: {item['title']}")
+
+def test_music_dao():
+    """测试MusicDAO功能"""
+    music_dao = MusicDAO()
+    assert music_dao.create({'id': str(uuid.uuid4()), 'title': 'DAO测试音乐'}), "创建音乐失败"
+    items = music_dao.get_all()
+    logger.info(f"音乐总数: {len(items)}")
+    assert items, "未读取到音乐"
+    
+    item = music_dao.get_by_id(items[0]['id'])
+    assert item is not None, f"无法获取音乐ID: {items[0]['id']}"
+    logger.info(f"成功获取音乐: {item['title']}")
+
+def test_connection_pool():
+    """测试连接池复用与请求级连接绑定"""
+    pool = database.ConnectionPool(size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn, "归还的连接未被复用"
+    pool.release(conn)
+    
+    # 重置后旧连接不再复用
+    pool.reset()
+    assert pool.acquire() is not conn, "重置后仍复用了旧连接"
+    
+    # 同一请求内共用一个连接，请求结束时归还
+    with app.test_request_context('/'):
+        first = database.get_connection()
+        database.release_connection(first)
+        second = database.get_connection()
+        assert first is second, "同一请求内获取到了不同的连接"
+    
+    logger.info("连接池测试通过")
+
+def test_backup():
+    """测试WebDAV备份包含WAL中的最新数据，以及检查点被占用时重试后报错"""
+    directory = tempfile.mkdtemp()
+    book_id = models.add_book({'title': '备份测试'})
+    reader = get_db_connection()
+    try:
+        zip_path = os.path.join(directory, 'backup.zip')
+        assert create_zip_backup(zip_path), "创建备份失败"
+        with zipfile.ZipFile(zip_path) as zipf:
+            zipf.extract('media_manager.db', directory)
+        restored = sqlite3.connect(os.path.join(directory, 'media_manager.db'))
+        try:
+            row = restored.execute('SELECT title FROM books WHERE id = ?', (book_id,)).fetchone()
+        finally:
+            restored.close()
+        assert row == ('备份测试',), "备份中缺少WAL中的数据"
+        
+        # 另一个连接持有读事务时检查点无法完成
+        database.configure_storage('production', {'busy_timeout': 0})
+        reader.execute('BEGIN')
+        reader.execute('SELECT COUNT(*) FROM books').fetchone()
+        try:
+            database.checkpoint(retries=1, interval=0)
+            assert False, "检查点未完成时未报错"
+        except sqlite3.OperationalError:
+            pass
+        reader.rollback()
+        database.checkpoint()
+        
+        logger.info("备份测试通过")
+    finally:
+        reader.close()
+        database.configure_storage()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+def test_pagination():
+    """测试游标分页不重复、不遗漏，且与完整排序结果一致"""
+    book_dao = BookDAO()
+    created = []
+    try:
+        # 相同排序值的记录按id排序，评分为空的记录也要能翻页
+        for i, rating in enumerate([5.0, 5.0, None, 3.0]):
+            book_id = str(uuid.uuid4())
+            book_dao.create({'id': book_id, 'title': f'分页测试{i}', 'rating': rating,
+                             'created_at': '2000-01-01 00:00:00'})
+            created.append(book_id)
+        
+        for order_by in ['created_at', '-rating', 'rating', 'title']:
+            column = order_by.lstrip('-')
+            expected = sorted(book_dao.get_all(), key=lambda b: b['id'], reverse=order_by.startswith('-'))
+            expected = sorted(expected, key=lambda b: (b[column] is not None, b[column] or 0),
+                              reverse=order_by.startswith('-'))
+            
+            ids = []
+            cursor = None
+            while True:
+                page = book_dao.get_page(order_by, cursor, limit=2)
+                ids.extend(book['id'] for book in page['items'])
+                cursor = page['next_cursor']
+                if not cursor:
+                    break
+            assert ids == [book['id'] for book in expected], f"按{order_by}分页结果与完整排序不一致"
         
-        expected_tables = ['books', 'movies', 'music', 'tags', 'item_tags']
-        missing_tables = [table for table in expected_tables if table not in tables]
+        try:
+            book_dao.get_page('notes')
+            assert False, "不支持的排序字段未被拒绝"
+        except ValueError:
+            pass
+        
+        logger.info("游标分页测试通过")
+    finally:
+        for book_id in created:
+            book_dao.delete(book_id)
+
+def test_column_projection():
+    """测试字段投影只返回所需字段"""
+    book_dao = BookDAO()
+    page = book_dao.get_page('title', limit=5, columns='list')
+    for book in page['items']:
+        assert set(book.keys()) == {'id'} | set(BookDAO.LIST_COLUMNS), "列表投影返回了多余的字段"
+    
+    page = book_dao.get_page('-rating', limit=5, columns=['title'])
+    for book in page['items']:
+        assert set(book.keys()) == {'id', 'title', 'rating'}, "投影未包含排序字段"
+    
+    try:
+        book_dao.get_all(['no_such_column'])
+        assert False, "不存在的字段未被拒绝"
+    except ValueError:
+        pass
+    
+    logger.info("字段投影测试通过")
+
+def test_create_many():
+    """测试批量创建记录及每行的处理结果"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    try:
+        rows = [
+            {'id': ids[0], 'title': '批量测试0'},
+            {'id': ids[1], 'title': '批量测试1', 'author': '作者'},
+            {'id': ids[0], 'title': '批量测试0重复'},
+            {'id': ids[2]},  # 缺少必填的标题
+            {'title': '缺少ID'},
+        ]
+        outcomes = book_dao.create_many(rows, on_conflict='ignore', batch_size=2)
+        assert outcomes == ['inserted', 'inserted', 'ignored', 'failed', 'failed'], f"批量创建结果不正确: {outcomes}"
+        assert book_dao.get_by_id(ids[0])['title'] == '批量测试0'
         
-        if missing_tables:
-            logger.error(f"缺少以下表: {', '.join(missing_tables)}")
-            return False
+        outcomes = book_dao.create_many([{'id': ids[1], 'title': '批量测试1更新'}], on_conflict='update')
+        assert outcomes == ['updated']
+        book = book_dao.get_by_id(ids[1])
+        assert book['title'] == '批量测试1更新' and book['author'] == '作者', "update模式覆盖了未提供的字段"
+        
+        outcomes = book_dao.create_many([{'id': ids[1], 'title': '批量测试1替换'}], on_conflict='replace')
+        assert outcomes == ['replaced']
+        assert book_dao.get_by_id(ids[1])['author'] is None, "replace模式未整行替换"
+        
+        logger.info("批量创建测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
+
+def test_full_text_search():
+    """测试全文索引随增删改同步，并按相关度排序"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(2)]
+    try:
+        book_dao.create({'id': ids[0], 'title': '普通书名', 'notes': 'zyxsearchterm 出现在笔记中'})
+        book_dao.create({'id': ids[1], 'title': 'zyxsearchterm 出现在标题中'})
+        
+        results = book_dao.search('zyxsearch')
+        assert [book['id'] for book in results] == [ids[1], ids[0]], "标题匹配应排在笔记匹配之前"
+        assert '<mark>' in results[0]['snippet'], "搜索结果缺少高亮摘要"
+        
+        book_dao.update(ids[1], {'title': '改名后的书'})
+        assert [book['id'] for book in book_dao.search('zyxsearchterm')] == [ids[0]], "更新后索引未同步"
+        
+        book_dao.create_many([{'id': ids[0], 'title': '替换后的书'}], on_conflict='replace')
+        assert book_dao.search('zyxsearchterm') == [], "替换后索引中残留旧内容"
+        assert book_dao.check_search_index(), "全文索引与数据不一致"
+        
+        # FTS5语法字符按普通文本处理
+        assert book_dao.search('"AND (') == []
+        
+        logger.info("全文搜索测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
+
+def test_chinese_search():
+    """测试中文子串搜索和拼音搜索"""
+    from app.pinyin import pinyin_available
+    book_dao = BookDAO()
+    book_id = str(uuid.uuid4())
+    try:
+        book_dao.create({'id': book_id, 'title': '测试三体黑暗森林', 'author': '测试刘慈欣'})
+        
+        # 中文没有分词边界，任意子串都应能匹配（短于3个字的词逐行匹配）
+        for query in ['黑暗森', '体黑暗', '三体', '测试刘慈欣 森林']:
+            assert book_id in [book['id'] for book in book_dao.search(query)], f"搜索'{query}'未找到"
+        
+        if pinyin_available():
+            for query in ['ceshisantiheiansenlin', 'cssthasl', 'liucixin']:
+                assert book_id in [book['id'] for book in book_dao.search(query)], f"拼音搜索'{query}'未找到"
         else:
-            logger.info(f"所有必要的表都存在: {', '.join(tables)}")
-            return True
-    except Exception as e:
-        logger.error(f"表存在性测试失败: {e}")
-        return False
+            logger.info("未安装pypinyin，跳过拼音搜索测试")
+        
+        logger.info("中文搜索测试通过")
+    finally:
+        book_dao.delete(book_id)
 
-def test_book_dao():
-    """测试BookDAO功能"""
+def test_filter_query():
+    """测试列表筛选条件在数据库中生效，并与游标分页组合"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+    rows = [
+        {'id': ids[0], 'title': '筛选测试0', 'author': '筛选作者', 'tags': '筛选标签, 科幻', 'status': 'read',
+         'rating': 4.5, 'publish_date': '2001-05', 'is_owned': 1},
+        {'id': ids[1], 'title': '筛选测试1', 'author': '筛选作者', 'tags': '筛选标签', 'status': 'read',
+         'rating': 3.0, 'publish_date': '2010', 'is_owned': 0},
+        {'id': ids[2], 'title': '筛选测试2', 'author': '筛选作者', 'tags': '筛选标签扩展', 'status': 'wish',
+         'rating': None, 'publish_date': '1999-12-01', 'is_owned': 1},
+        {'id': ids[3], 'title': '筛选测试3', 'author': '其他作者', 'tags': '筛选标签, 科幻', 'status': 'read',
+         'rating': 5.0, 'publish_date': '2005', 'is_owned': 1},
+    ]
     try:
-        book_dao = BookDAO()
-        books = book_dao.get_all()
-        logger.info(f"书籍总数: {len(books)}")
+        book_dao.create_many(rows)
         
-        # 如果有书籍，测试获取单本书籍
-        if books:
-            book_id = books[0]['id']
-            book = book_dao.get_by_id(book_id)
-            if book:
-                logger.info(f"成功获取书籍: {book['title']}")
-            else:
-                logger.error(f"无法获取书籍ID: {book_id}")
-                return False
+        def matching(filters):
+            ids_found = []
+            cursor = None
+            while True:
+                page = book_dao.get_page('title', cursor, limit=1, filters=filters)
+                ids_found.extend(book['id'] for book in page['items'])
+                cursor = page['next_cursor']
+                if not cursor:
+                    return ids_found
         
-        return True
-    except Exception as e:
-        logger.error(f"BookDAO测试失败: {e}")
-        return False
+        base = {'author': ['筛选作者', '其他作者']}
+        assert matching(base) == ids, "多个作者取值应匹配任意一个"
+        assert matching(dict(base, status='read')) == [ids[0], ids[1], ids[3]], "状态筛选不正确"
+        assert matching(dict(base, status='读过')) == [ids[0], ids[1], ids[3]], "状态筛选应接受中文名称"
+        assert matching(dict(base, tag='筛选标签')) == [ids[0], ids[1], ids[3]], "标签应按整项匹配"
+        assert matching(dict(base, tag=['筛选标签', '科幻'])) == [ids[0], ids[3]], "多个标签须全部包含"
+        assert matching(dict(base, year_min='2001', year_max='2005')) == [ids[0], ids[3]], "年份范围筛选不正确"
+        assert matching(dict(base, rating_min='4', rating_max='4.5')) == [ids[0]], "评分范围筛选不正确"
+        assert matching(dict(base, is_owned='1', author='筛选作者')) == [ids[0], ids[2]], "是否拥有筛选不正确"
+        
+        results = book_dao.search('筛选测试', filters={'tag': '科幻', 'author': '其他作者'})
+        assert [book['id'] for book in results] == [ids[3]], "搜索结果未应用筛选条件"
+        
+        for filters in [{'no_such_filter': 1}, {'rating_min': 'abc'}, {'year_min': '20'}, {'status': '看过'}]:
+            try:
+                book_dao.get_page(filters=filters)
+                assert False, f"无效的筛选条件未被拒绝: {filters}"
+            except ValueError:
+                pass
+        
+        # HTML页面忽略未知的查询参数，API仍然拒绝
+        client = app.test_client()
+        for url in ['/books?utm_source=x&page=2', '/movies?utm_source=x', '/music?utm_source=x',
+                    '/bookshelf?utm_source=x&tag=科幻']:
+            assert client.get(url).status_code == 200, f"HTML页面因未知参数失败: {url}"
+        assert client.get('/books?status=无效状态').status_code == 400, "HTML页面未拒绝无效的筛选值"
+        assert client.get('/api/books?utm_source=x').status_code == 400, "API未拒绝未知的筛选条件"
+        
+        logger.info("列表筛选测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
 
-def test_movie_dao():
-    """测试MovieDAO功能"""
+def test_facets():
+    """测试筛选项计数随创建、更新、删除增量维护"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    
+    def counts(filters=None):
+        facets = book_dao.get_facets(['tag', 'author'], filters)
+        return {(name, item['value']): item['count'] for name, items in facets.items()
+                for item in items if item['value'].startswith('计数')}
+    
     try:
-        movie_dao = MovieDAO()
-        movies = movie_dao.get_all()
-        logger.info(f"电影总数: {len(movies)}")
+        book_dao.create_many([
+            {'id': ids[0], 'title': '计数测试0', 'author': '计数作者甲', 'tags': '计数标签A, 计数标签B', 'is_owned': 1},
+            {'id': ids[1], 'title': '计数测试1', 'author': '计数作者甲', 'tags': '计数标签A', 'is_owned': 0},
+        ])
+        book_dao.create({'id': ids[2], 'title': '计数测试2', 'author': '计数作者乙', 'tags': '计数标签B', 'is_owned': 1})
+        assert counts() == {('tag', '计数标签A'): 2, ('tag', '计数标签B'): 2,
+                            ('author', '计数作者甲'): 2, ('author', '计数作者乙'): 1}, "创建后计数不正确"
         
-        # 如果有电影，测试获取单部电影
-        if movies:
-            movie_id = movies[0]['id']
-            movie = movie_dao.get_by_id(movie_id)
-            if movie:
-                logger.info(f"成功获取电影: {movie['title']}")
-            else:
-                logger.error(f"无法获取电影ID: {movie_id}")
-                return False
+        book_dao.update(ids[1], {'author': '计数作者乙', 'tags': '计数标签C'})
+        book_dao.update(ids[2], {'notes': '不涉及筛选项的字段'})
+        book_dao.add_tag_to_book(ids[2], '计数标签A')
+        book_dao.create_many([{'id': ids[0], 'title': '计数测试0', 'author': '计数作者甲', 'tags': '计数标签B'}],
+                             on_conflict='replace')
+        expected = {('tag', '计数标签A'): 1, ('tag', '计数标签B'): 2, ('tag', '计数标签C'): 1,
+                    ('author', '计数作者甲'): 1, ('author', '计数作者乙'): 2}
+        assert counts() == expected, "更新后计数不正确"
         
-        return True
-    except Exception as e:
-        logger.error(f"MovieDAO测试失败: {e}")
-        return False
+        book_dao.rebuild_facet_counts()
+        assert counts() == expected, "增量维护的计数与重新统计的结果不一致"
+        
+        assert counts({'author': '计数作者乙'}) == {('tag', '计数标签A'): 1, ('tag', '计数标签B'): 1,
+                                                 ('tag', '计数标签C'): 1, ('author', '计数作者乙'): 2}, \
+            "筛选条件下的计数不正确"
+        
+        book_dao.delete(ids[1])
+        assert ('tag', '计数标签C') not in counts(), "计数为0的取值未被删除"
+        
+        try:
+            book_dao.get_facets(['no_such_facet'])
+            assert False, "无效的筛选项未被拒绝"
+        except ValueError:
+            pass
+        
+        logger.info("筛选项计数测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
 
-def test_music_dao():
-    """测试MusicDAO功能"""
+def test_facets_concurrent_write():
+    """测试另一个连接在分类统计快照和写入之间修改同一条记录时计数仍然正确"""
+    book_dao = BookDAO()
+    book_id = str(uuid.uuid4())
+    
+    def counts():
+        return {item['value']: item['count'] for item in book_dao.get_facets(['author'])['author']
+                if item['value'].startswith('并发作者')}
+    
+    book_dao.create({'id': book_id, 'title': '并发计数测试', 'author': '并发作者甲'})
+    other = get_db_connection()
+    try:
+        # 另一个连接按DAO的方式修改作者并持有写锁
+        other.execute('BEGIN IMMEDIATE')
+        before = book_dao._facet_snapshot(other, [book_id])
+        other.execute("UPDATE books SET author = '并发作者乙' WHERE id = ?", (book_id,))
+        book_dao._update_facets(other, before, [book_id])
+        
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(
+            updated=book_dao.update(book_id, {'author': '并发作者丙'})))
+        worker.start()
+        time.sleep(0.3)
+        assert worker.is_alive(), "写锁被占用时update未等待"
+        other.commit()
+        worker.join(timeout=10)
+        assert result.get('updated'), "等待写锁后update失败"
+    finally:
+        other.close()
+    
+    expected = {'并发作者丙': 1}
+    assert counts() == expected, f"交错写入后计数不正确: {counts()}"
+    book_dao.rebuild_facet_counts()
+    assert counts() == expected, "增量维护的计数与重新统计的结果不一致"
+    logger.info("并发写入的筛选项计数测试通过")
+
+def test_item_tags():
+    """测试标签关联随每次写入同步，按标签筛选使用item_tags表"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    
+    def linked(book_id):
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('''
+            SELECT t.name FROM item_tags it JOIN tags t ON t.id = it.tag_id
+            WHERE it.item_type = 'book' AND it.item_id = ?
+            ''', (book_id,)).fetchall()
+            return sorted(row['name'] for row in rows)
+        finally:
+            conn.close()
+    
+    try:
+        book_dao.create({'id': ids[0], 'title': '关联测试0', 'tags': ['关联标签A', ' 关联标签B', '关联标签A']})
+        book_dao.create_many([
+            {'id': ids[1], 'title': '关联测试1', 'tags': '关联标签B,,关联标签C'},
+            {'id': ids[2], 'title': '关联测试2', 'tags': '关联标签A'},
+        ])
+        assert book_dao.get_by_id(ids[0])['tags'] == '关联标签A, 关联标签B', "tags字段未规范化"
+        assert linked(ids[0]) == ['关联标签A', '关联标签B'], "创建时未写入标签关联"
+        assert linked(ids[1]) == ['关联标签B', '关联标签C'], "批量创建时未写入标签关联"
+        
+        book_dao.update(ids[0], {'tags': '关联标签C'})
+        book_dao.add_tag_to_book(ids[2], '关联标签C')
+        book_dao.remove_tag_from_book(ids[1], '关联标签B')
+        assert linked(ids[0]) == ['关联标签C'], "更新后标签关联未同步"
+        assert linked(ids[2]) == ['关联标签A', '关联标签C'], "添加标签后关联未同步"
+        assert linked(ids[1]) == ['关联标签C'], "移除标签后关联未同步"
+        
+        page = book_dao.get_page('title', filters={'tag': '关联标签C'})
+        assert [book['id'] for book in page['items']] == ids, "按标签筛选结果不正确"
+        page = book_dao.get_page('title', filters={'tag': ['关联标签A', '关联标签C']})
+        assert [book['id'] for book in page['items']] == [ids[2]], "多个标签须全部包含"
+        assert [book['id'] for book in book_dao.get_books_by_tag('关联标签A')] == [ids[2]], "按标签获取书籍结果不正确"
+        tag_counts = {tag['name']: tag['count'] for tag in book_dao.get_all_tags()}
+        assert tag_counts.get('关联标签C') == 3, "标签云计数不正确"
+        
+        book_dao.create_many([{'id': ids[2], 'title': '关联测试2'}], on_conflict='replace')
+        assert linked(ids[2]) == [], "整行替换后未清除标签关联"
+        book_dao.delete(ids[1])
+        assert linked(ids[1]) == [], "删除条目后未清除标签关联"
+        
+        logger.info("标签关联测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
+
+def test_status():
+    """测试状态校验与统一保存为状态代码"""
+    assert validate_status('book', '读过') == 'read', "中文名称未转换为状态代码"
+    assert validate_status('movie', 'watching') == 'wish', "旧状态值未转换为状态代码"
+    assert validate_status('music', '') == 'unlistened', "空状态未使用默认状态"
+    assert status_code('book', 'unknown') is None, "未知状态应无法识别"
+    try:
+        validate_status('movie', '读过')
+        assert False, "无效状态未抛出异常"
+    except ValueError:
+        pass
+    
+    book_ids = []
+    movie_id = None
+    try:
+        book_id = models.add_book({'title': '状态测试', 'status': '读过'})
+        book_ids.append(book_id)
+        assert BookDAO().get_by_id(book_id)['status'] == 'read', "写入时未保存状态代码"
+        assert models.add_book({'title': '状态测试', 'status': 'bad'}) is None, "无效状态不应写入"
+        assert models.update_book(book_id, {'status': '想读'}), "更新状态失败"
+        assert BookDAO().get_by_id(book_id)['status'] == 'wish', "更新时未保存状态代码"
+        assert not models.update_book(book_id, {'status': 'bad'}), "无效状态不应更新"
+        
+        movie_id = models.add_movie({'title': '状态测试'})
+        assert MovieDAO().get_by_id(movie_id)['status'] == 'unwatched', "未指定状态时未使用默认状态"
+        
+        # 编辑页提交无效状态时提示失败并重新显示表单，不报告保存成功
+        client = app.test_client()
+        response = client.post(f'/books/{book_id}/edit', data={'title': '状态测试', 'status': 'bad'})
+        assert response.status_code == 200, "提交无效状态后不应跳转"
+        page = response.get_data(as_text=True)
+        assert '更新图书失败' in page and '图书更新成功' not in page, "无效状态被报告为保存成功"
+        assert BookDAO().get_by_id(book_id)['status'] == 'wish', "无效状态不应写入"
+        response = client.post(f'/movies/edit/{movie_id}', data={'title': '状态测试', 'status': '读过'})
+        assert response.status_code == 200 and '更新电影失败' in response.get_data(as_text=True)
+        assert MovieDAO().get_by_id(movie_id)['status'] == 'unwatched', "无效状态不应写入"
+        
+        logger.info("状态测试通过")
+    finally:
+        for book_id in book_ids:
+            if book_id:
+                BookDAO().delete(book_id)
+        if movie_id:
+            MovieDAO().delete(movie_id)
+
+def test_logging():
+    """测试各模块日志级别与调试跟踪抽样"""
+    dao_logger = logging.getLogger('app.dao.base_dao')
+    routes_logger = logging.getLogger('app.routes')
+    try:
+        setup_logging({'level': 'INFO', 'levels': {'app.dao': 'WARNING', 'app.unknown': 'LOUD'}})
+        assert not dao_logger.isEnabledFor(logging.INFO), "模块日志级别未生效"
+        assert routes_logger.isEnabledFor(logging.INFO), "未配置的模块应沿用根日志级别"
+        assert not routes_logger.isEnabledFor(logging.DEBUG), "未开启调试跟踪时不应产生DEBUG记录"
+        assert not sample_trace(), "抽样比例为0时不应跟踪请求"
+        
+        setup_logging({'level': 'INFO', 'levels': {'app.dao': 'WARNING'}, 'trace_sample_rate': 1})
+        assert dao_logger.isEnabledFor(logging.DEBUG), "开启调试跟踪后app各模块应产生DEBUG记录"
+        trace_filter = TraceFilter({'app.dao': logging.WARNING}, logging.INFO)
+        debug_record = logging.LogRecord('app.dao.base_dao', logging.DEBUG, __file__, 0, '调试', (), None)
+        info_record = logging.LogRecord('app.routes', logging.INFO, __file__, 0, '信息', (), None)
+        assert trace_filter.filter(info_record), "达到配置级别的记录应输出"
+        assert not trace_filter.filter(debug_record), "未被抽样的请求应过滤DEBUG记录"
+        assert sample_trace(), "抽样比例为1时应跟踪请求"
+        assert trace_filter.filter(debug_record), "被抽样的请求应输出DEBUG记录"
+        
+        logger.info("日志配置测试通过")
+    finally:
+        setup_logging(get_config('logging'))
+        sample_trace()
+
+def test_dashboard():
+    """测试最近记录和首页概览的状态计数"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    daos = {'book': book_dao, 'movie': MovieDAO()}
+    
+    def book_counts():
+        summary = get_dashboard_summary(daos)['book']
+        return summary['total'], {item['value']: item['count'] for item in summary['statuses']}
+    
+    total_before, counts_before = book_counts()
+    try:
+        book_dao.create_many([
+            {'id': ids[0], 'title': '概览测试0', 'status': 'read', 'created_at': '2999-01-01 00:00:00',
+             'updated_at': '2999-01-01 00:00:00'},
+            {'id': ids[1], 'title': '概览测试1', 'status': 'read', 'created_at': '2999-01-02 00:00:00',
+             'updated_at': '2999-01-02 00:00:00'},
+            {'id': ids[2], 'title': '概览测试2', 'created_at': '2999-01-03 00:00:00',
+             'updated_at': '2998-12-31 00:00:00'},
+        ])
+        assert [book['id'] for book in book_dao.get_recent(2)] == [ids[2], ids[1]], "最近添加的记录不正确"
+        assert [book['id'] for book in book_dao.get_recent(2, 'updated_at')] == [ids[1], ids[0]], \
+            "最近更新的记录不正确"
+        assert set(book_dao.get_recent(1)[0]) == {'id', *BookDAO.CARD_COLUMNS}, "最近记录应只包含卡片字段"
+        
+        summary = get_dashboard_summary(daos, limit=2)
+        assert [book['id'] for book in summary['book']['recent']] == [ids[2], ids[1]], "概览的最近记录不正确"
+        total, counts = book_counts()
+        assert total == total_before + 3, "概览的条目总数应包含没有状态的条目"
+        assert counts['read'] == counts_before['read'] + 2, "概览的状态计数不正确"
+        
+        book_dao.update(ids[0], {'status': 'wish'})
+        total, counts = book_counts()
+        assert counts['read'] == counts_before['read'] + 1 and counts['wish'] == counts_before['wish'] + 1, \
+            "更新状态后概览计数不正确"
+        
+        try:
+            book_dao.get_recent(3, 'title')
+            assert False, "无效的时间字段未被拒绝"
+        except ValueError:
+            pass
+        
+        assert models.get_dashboard_summary()['book']['total'] == total, "首页概览与未缓存的结果不一致"
+        
+        logger.info("首页概览测试通过")
+    finally:
+        for book_id in ids:
+            book_dao.delete(book_id)
+
+def test_query_cache():
+    """测试查询结果缓存的命中、写入后失效、LRU淘汰和跨进程代数"""
+    book_dao = BookDAO()
+    ids = [str(uuid.uuid4()) for _ in range(2)]
+    try:
+        configure_query_cache(enabled=True, shared=False)
+        count_before = book_dao.count()
+        assert book_dao.count() == count_before
+        stats = query_cache.stats()
+        assert stats['hits'] >= 1 and stats['entries'] >= 1, "相同的查询未命中缓存"
+        
+        book_dao.create({'id': ids[0], 'title': '缓存测试0', 'tags': '缓存标签'})
+        assert book_dao.count() == count_before + 1, "写入后读到了过期的缓存"
+        assert query_cache.stats()['stale'] >= 1, "过期的结果未被统计"
+        
+        tags = book_dao.get_all_tags()
+        tags.clear()
+        assert any(tag['name'] == '缓存标签' for tag in book_dao.get_all_tags()), "修改返回值影响了缓存的结果"
+        book_dao.add_tag_to_book(ids[0], '缓存标签B')
+        assert any(tag['name'] == '缓存标签B' for tag in book_dao.get_all_tags()), "添加标签后标签云未更新"
+        
+        # 其他进程的写入只更新数据库中的代数
+        configure_query_cache(enabled=True, shared=True)
+        assert book_dao.count() == count_before + 1
+        conn = get_db_connection()
+        try:
+            conn.execute("INSERT INTO books (id, title) VALUES (?, '缓存测试1')", (ids[1],))
+            conn.execute("UPDATE cache_generations SET generation = generation + 1 WHERE name = 'books'")
+            conn.commit()
+        finally:
+            conn.close()
+        assert book_dao.count() == count_before + 2, "共享代数未使其他进程写入前的缓存过期"
+        
+        small = QueryCache(max_mb=0.01)
+        for i in range(50):
+            small.get_or_compute(('books',), 'lru', i, lambda: ['缓存'] * 20)
+        stats = small.stats()
+        assert stats['evictions'] > 0 and stats['bytes'] <= stats['max_bytes'], "超出内存预算时未淘汰"
+        assert small.get_or_compute(('books',), 'large', 0, lambda: ['缓存'] * 10000) and \
+            small.stats()['entries'] == stats['entries'], "超过预算四分之一的结果不应缓存"
+        
+        logger.info("查询缓存测试通过")
+    finally:
+        configure_query_cache()
+        for book_id in ids:
+            book_dao.delete(book_id)
+
+def test_conditional_get():
+    """测试列表页和API的ETag、Last-Modified及304响应"""
+    client = app.test_client()
+    book_id = None
     try:
-        music_dao = MusicDAO()
-        music_items = music_dao.get_all()
-        logger.info(f"音乐总数: {len(music_items)}")
+        response = client.get('/api/books')
+        etag = response.headers.get('ETag')
+        assert response.status_code == 200 and etag, "响应未附带ETag"
+        assert 'no-cache' in response.headers.get('Cache-Control', ''), "响应须要求重新验证"
         
-        # 如果有音乐，测试获取单个音乐
-        if music_items:
-            music_id = music_items[0]['id']
-            music = music_dao.get_by_id(music_id)
-            if music:
-                logger.info(f"成功获取音乐: {music['title']}")
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+        assert response.status_code == 304 and not response.data, "数据未变化时未返回304"
+        assert client.get('/books', headers={'If-None-Match': etag}).status_code == 304, "列表页未返回304"
+        assert client.get('/api/movies', headers={'If-None-Match': etag}).status_code == 200, \
+            "其他表的ETag不应匹配"
+        
+        # 恢复备份后表的代数可能不变，更换实例标识后旧的ETag不再匹配
+        database.renew_instance_id()
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers.get('ETag') != etag, "恢复数据库后仍返回304"
+        etag = response.headers.get('ETag')
+        
+        book_id = models.add_book({'title': '条件请求测试'})
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers.get('ETag') != etag, "写入后ETag未改变"
+        
+        last_modified = response.headers.get('Last-Modified')
+        if last_modified:
+            assert client.get('/api/books', headers={'If-Modified-Since': last_modified}).status_code == 304, \
+                "If-Modified-Since未生效"
+        
+        logger.info("条件GET测试通过")
+    finally:
+        if book_id:
+            BookDAO().delete(book_id)
+
+def test_export():
+    """测试流式导出的三种格式、字段选择、筛选条件和gzip压缩"""
+    client = app.test_client()
+    ids = []
+    try:
+        ids.append(models.add_book({'title': '导出测试, "一"', 'author': '导出作者', 'status': 'reading'}))
+        ids.append(models.add_book({'title': '导出测试二', 'author': '导出作者', 'status': 'read'}))
+        
+        response = client.get('/api/export?type=books&format=ndjson&fields=title,status&status=reading')
+        assert response.status_code == 200 and response.is_streamed, "导出响应不是流式响应"
+        assert 'attachment' in response.headers.get('Content-Disposition', ''), "导出未作为附件下载"
+        rows = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        exported = [row for row in rows if row['id'] in ids]
+        assert [row['title'] for row in exported] == ['导出测试, "一"'], "筛选条件未生效"
+        assert set(exported[0]) == {'id', 'title', 'status'}, "字段选择未生效"
+        
+        response = client.get('/api/export?type=book&format=csv&fields=title,author')
+        reader = csv.reader(response.data.decode('utf-8-sig').splitlines())
+        assert next(reader) == ['id', 'title', 'author'], "CSV表头错误"
+        titles = {row[1] for row in reader if row[0] in ids}
+        assert titles == {'导出测试, "一"', '导出测试二'}, "CSV转义错误"
+        
+        response = client.get('/api/export?type=books&format=json&gzip=1')
+        assert response.headers['Content-Disposition'].endswith('.json.gz"'), "压缩文件名错误"
+        rows = json.loads(gzip.decompress(response.data))
+        assert {row['id'] for row in rows} >= set(ids), "JSON导出缺少记录"
+        assert all('search_pinyin' not in row for row in rows), "导出了内部字段"
+        
+        for url in ['/api/export?type=unknown', '/api/export?format=xml', '/api/export?fields=nope',
+                    '/api/export?nope=1']:
+            assert client.get(url).status_code == 400, f"无效参数未返回400: {url}"
+        
+        logger.info("流式导出测试通过")
+    finally:
+        for id in ids:
+            if id:
+                BookDAO().delete(id)
+
+def test_bulk_import():
+    """测试批量导入接口的NDJSON/CSV解析、字段映射、逐行结果和流式响应"""
+    client = app.test_client()
+    book_ids, music_ids = [], []
+    try:
+        body = '\n'.join([
+            json.dumps({'title': '导入测试一', 'state': '在读', 'myTags': ['导入标签']}, ensure_ascii=False),
+            '{无效的JSON',
+            '',
+            json.dumps({'title': '导入测试二', 'status': '无效状态'}, ensure_ascii=False),
+        ])
+        response = client.post('/api/books/bulk', data=body.encode('utf-8'), content_type='application/x-ndjson')
+        assert response.status_code == 200, "批量导入失败"
+        report = response.get_json()
+        assert report['summary'] == {'inserted': 1, 'failed': 2}, f"导入结果统计错误: {report['summary']}"
+        assert [row['line'] for row in report['rows']] == [1, 2, 4], "结果的行号错误"
+        book_ids = [row['id'] for row in report['rows'] if row['result'] == 'inserted']
+        book = BookDAO().get_by_id(book_ids[0])
+        assert book['status'] == 'reading' and '导入标签' in book['tags'], "未按add_book的规则映射字段"
+        
+        # 带ID的记录按on_conflict处理，未提供的状态不被默认值覆盖
+        update = json.dumps({'id': book_ids[0], 'title': '导入测试一改'}, ensure_ascii=False)
+        response = client.post('/api/books/bulk?on_conflict=update', data=update.encode('utf-8'))
+        assert response.get_json()['summary'] == {'updated': 1}, "按ID更新失败"
+        book = BookDAO().get_by_id(book_ids[0])
+        assert book['title'] == '导入测试一改' and book['status'] == 'reading', "更新导入覆盖了未提供的字段"
+        
+        # JSON中的数字ID与已有记录的文本ID视为同一条记录
+        numeric_id = 987654321
+        book_ids.append(str(numeric_id))
+        for record in [{'id': numeric_id, 'title': '导入测试数字ID', 'status': '在读'},
+                       {'id': numeric_id, 'title': '导入测试数字ID改'}]:
+            response = client.post('/api/books/bulk?on_conflict=update',
+                                   data=json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        assert response.get_json()['summary'] == {'updated': 1}, "数字ID未按已有记录更新"
+        book = BookDAO().get_by_id(str(numeric_id))
+        assert book['title'] == '导入测试数字ID改' and book['status'] == 'reading', "数字ID的更新导入覆盖了未提供的字段"
+        
+        csv_body = '\ufefftitle,artist,rating\n"导入,专辑\n第二行",导入艺术家,4.5\n导入专辑二,,\n'
+        response = client.post('/api/music/bulk?stream=1', data=csv_body.encode('utf-8'), content_type='text/csv')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        assert lines[-1] == {'summary': {'inserted': 2}}, "流式响应的统计错误"
+        assert [line['line'] for line in lines[:-1]] == [2, 4], "CSV多行字段的行号错误"
+        music_ids = [line['id'] for line in lines[:-1]]
+        assert MusicDAO().get_by_id(music_ids[0])['title'] == '导入,专辑\n第二行', "CSV转义解析错误"
+        
+        # 流式响应已发出响应头后遇到非UTF-8的行或CSV格式错误，以带行号的失败记录结束，响应不被截断
+        body = json.dumps({'title': '导入测试三'}, ensure_ascii=False).encode('utf-8') + b'\n{"title": "\xff"}\n{"title": "x"}\n'
+        response = client.post('/api/books/bulk?stream=1', data=body, content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        book_ids.append(lines[0]['id'])
+        assert lines[1]['line'] == 2 and 'UTF-8' in lines[1]['error'], f"未报告无法解码的行: {lines}"
+        assert lines[-1] == {'summary': {'inserted': 1, 'failed': 1}}, "解码错误后应停止解析"
+        csv_body = 'title\n"' + 'x' * (csv.field_size_limit() + 1) + '"\n'
+        response = client.post('/api/music/bulk?stream=1', data=csv_body.encode('utf-8'), content_type='text/csv')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        assert lines[0]['line'] == 2 and 'CSV' in lines[0]['error'], f"未报告CSV格式错误: {lines}"
+        assert lines[-1] == {'summary': {'failed': 1}}
+        
+        for url in ['/api/books/bulk?format=xml', '/api/books/bulk?on_conflict=merge']:
+            assert client.post(url, data=b'').status_code == 400, f"无效参数未返回400: {url}"
+        
+        logger.info("批量导入测试通过")
+    finally:
+        for id in book_ids:
+            BookDAO().delete(id)
+        for id in music_ids:
+            MusicDAO().delete(id)
+
+def test_batch_update():
+    """测试批量修改接口：字段、标签、筛选项计数和不存在的ID"""
+    client = app.test_client()
+    book_dao = BookDAO()
+    ids = []
+    try:
+        ids = [models.add_book({'title': f'批量修改测试{i}', 'tags': '批量标签甲, 批量标签乙', 'status': 'unread'})
+               for i in range(3)]
+        facet_count = lambda: {facet['value']: facet['count'] for facet in book_dao.get_facets(['status'])['status']}
+        before = facet_count()
+        
+        response = client.patch('/api/books/batch', json={
+            'ids': ids + ['不存在的ID'], 'set': {'status': '读过', 'rating': 4.5, 'is_owned': 1},
+            'add_tags': ['批量标签丙'], 'remove_tags': ['批量标签甲']})
+        assert response.status_code == 200, "批量修改失败"
+        assert response.get_json() == {'updated': 3, 'missing': ['不存在的ID']}, "批量修改的返回值错误"
+        for id in ids:
+            book = book_dao.get_by_id(id)
+            assert (book['status'], book['rating'], book['is_owned']) == ('read', 4.5, 1), "字段未修改"
+            assert book['tags'] == '批量标签乙, 批量标签丙', f"标签修改错误: {book['tags']}"
+        assert len(book_dao.get_by_tag('批量标签丙')) == 3 and not book_dao.get_by_tag('批量标签甲'), "标签关联未同步"
+        after = facet_count()
+        assert after.get('read', 0) == before.get('read', 0) + 3, "筛选项计数未更新"
+        assert after.get('unread', 0) == before.get('unread', 0) - 3, "筛选项计数未更新"
+        
+        for body in [{'ids': ids, 'set': {'不存在的字段': 1}}, {'ids': ids}, {'ids': ids, 'set': {'status': '无效状态'}},
+                     {'ids': ids[0]}]:
+            assert client.patch('/api/books/batch', json=body).status_code == 400, f"无效请求未返回400: {body}"
+        
+        logger.info("批量修改测试通过")
+    finally:
+        for id in ids:
+            book_dao.delete(id)
+
+def test_get_many():
+    """测试按ID列表批量获取：请求顺序、去重、不存在的ID和POST变体"""
+    client = app.test_client()
+    book_dao = BookDAO()
+    ids = []
+    try:
+        ids = [models.add_book({'title': f'批量获取测试{i}'}) for i in range(3)]
+        
+        items = book_dao.get_many([ids[2], '不存在的ID', ids[0], ids[2]], columns=['title'])
+        assert [item['id'] for item in items] == [ids[2], ids[0]], "未按请求顺序返回或未去重"
+        assert set(items[0]) == {'id', 'title'}, "字段投影未生效"
+        
+        response = client.get(f'/api/books?ids={ids[1]},不存在的ID&ids={ids[0]}&fields=title')
+        data = response.get_json()
+        assert [item['title'] for item in data['items']] == ['批量获取测试1', '批量获取测试0'], "GET批量获取结果错误"
+        assert data['missing'] == ['不存在的ID'], "未报告不存在的ID"
+        
+        response = client.post('/api/books/lookup', json={'ids': ids[::-1]})
+        assert [item['id'] for item in response.get_json()['items']] == ids[::-1], "POST批量获取结果错误"
+        assert client.post('/api/books/lookup', json={'ids': ids, 'fields': ['不存在的字段']}).status_code == 400, \
+            "无效字段未返回400"
+        
+        logger.info("批量获取测试通过")
+    finally:
+        for id in ids:
+            book_dao.delete(id)
+
+def test_douban_http():
+    """测试豆瓣连接池：连接复用、429/5xx重试和按线程的Session"""
+    connections = []
+    statuses = [503, 429, 200, 200]
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def setup(self):
+            connections.append(self.client_address)
+            super().setup()
+        
+        def do_GET(self):
+            status = statuses.pop(0) if statuses else 200
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            if status == 429:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(b'ok')
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    try:
+        session = douban_http.create_session(douban_http.create_adapter(retries=3, backoff_factor=0))
+        response = session.get(url, timeout=5)
+        assert response.status_code == 200 and response.text == 'ok', "503/429响应未重试"
+        for _ in range(3):
+            session.get(url, timeout=5).raise_for_status()
+        assert len(connections) == 1, f"连接未复用，共建立{len(connections)}个连接"
+        
+        sessions = []
+        worker = threading.Thread(target=lambda: sessions.append(douban_http.get_session()))
+        worker.start()
+        worker.join()
+        assert sessions[0] is not douban_http.get_session(), "不同线程应使用各自的Session"
+        assert sessions[0].get_adapter(url) is douban_http.get_session().get_adapter(url), "Session未共享连接池"
+        
+        logger.info("豆瓣连接池测试通过")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_douban_cache():
+    """测试豆瓣响应缓存：键的规范化、有效期、过期后后台刷新、请求失败时返回旧内容和LRU淘汰"""
+    path = os.path.join(tempfile.mkdtemp(), 'douban_cache.db')
+    cache = HttpCache(path, ttl={'detail': 60}, stale={'detail': 3600})
+    calls = []
+    
+    def fetcher(body):
+        def fetch():
+            calls.append(body)
+            return body
+        return fetch
+    
+    def failing():
+        raise IOError("网络错误")
+    
+    try:
+        assert cache_key('HTTPS://Book.Douban.com/subject/1/?b=2#x', {'a': 1}) == \
+            cache_key('https://book.douban.com/subject/1/?a=1&b=2'), "缓存键未规范化"
+        
+        url = 'https://book.douban.com/subject/1/'
+        assert cache.fetch('detail', url, None, fetcher('第一版')) == '第一版'
+        assert cache.fetch('detail', url, None, fetcher('第二版')) == '第一版', "有效期内未使用缓存"
+        assert calls == ['第一版'], "有效期内不应重新请求"
+        
+        # 过期但在stale时间内：返回旧内容并在后台刷新
+        cache._conn.execute('UPDATE responses SET fetched_at = fetched_at - 120')
+        assert cache.fetch('detail', url, None, fetcher('第二版')) == '第一版', "过期后未返回旧内容"
+        for _ in range(50):
+            if not cache._refreshing:
+                break
+            time.sleep(0.05)
+        assert cache.fetch('detail', url, None, fetcher('第三版')) == '第二版', "后台刷新未生效"
+        
+        # 超过stale时间后同步请求，请求失败时返回旧内容
+        cache._conn.execute('UPDATE responses SET fetched_at = fetched_at - 7200')
+        assert cache.fetch('detail', url, None, failing) == '第二版', "请求失败时未返回旧内容"
+        
+        # 超过大小上限时淘汰最久未访问的内容
+        cache.configure(max_mb=2500 / 1024 / 1024, ttl={'detail': 60})
+        cache.clear()
+        for i in range(3):
+            cache.fetch('detail', f'https://book.douban.com/subject/{i}/', None, fetcher('页' * 300))
+            time.sleep(0.01)
+        cache.fetch('detail', 'https://book.douban.com/subject/0/', None, fetcher('页' * 300))
+        cache.fetch('detail', 'https://book.douban.com/subject/3/', None, fetcher('页' * 300))
+        stats = cache.stats()
+        assert stats['entries'] == 2 and stats['bytes'] <= stats['max_bytes'], f"未按大小上限淘汰: {stats}"
+        assert cache.get(cache_key('https://book.douban.com/subject/0/')), "淘汰了最近访问的内容"
+        
+        assert app.test_client().get('/settings').status_code == 200, "设置页显示缓存统计失败"
+        logger.info("豆瓣响应缓存测试通过")
+    finally:
+        cache.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(os.path.dirname(path))
+
+def test_douban_uncacheable():
+    """测试豆瓣响应缓存不保存跳转到其他主机的页面和验证码、登录页"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            port = self.server.server_address[1]
+            if self.path.startswith('/subject/1/'):
+                # 127.0.0.1和localhost视为不同主机，模拟跳转到sec.douban.com
+                self.send_response(302)
+                self.send_header('Location', f'http://localhost:{port}/captcha')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.path.startswith('/subject/3/'):
+                body = '<h1>正常条目</h1><div id="info">作者: 某人</div>'.encode('utf-8')
             else:
-                logger.error(f"无法获取音乐ID: {music_id}")
-                return False
+                body = '<form>请输入验证码</form>'.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    path = os.path.join(tempfile.mkdtemp(), 'douban_cache.db')
+    cache = HttpCache(path)
+    api = DoubanAPI(cache=cache, session=douban_http.create_session())
+    try:
+        for i in (1, 2):
+            url = f'{base}/subject/{i}/'
+            assert '验证码' in api._fetch_text('detail', url), "未返回抓取到的页面"
+            assert cache.get(cache_key(url)) is None, f"缓存了异常页面: {url}"
+        assert '验证码' in api._fetch_text('search', f'{base}/search/', params={'q': '测试'}), "未返回抓取到的页面"
+        assert cache.get(cache_key(f'{base}/search/', {'q': '测试'})) is None, "缓存了没有结果列表的搜索页"
+        
+        url = f'{base}/subject/3/'
+        assert '正常条目' in api._fetch_text('detail', url)
+        assert cache.get(cache_key(url)) is not None, "正常页面未缓存"
+        
+        # 已有过期的缓存内容时，返回它而不是验证码页
+        url = f'{base}/subject/2/'
+        cache.put(cache_key(url), 'detail', '<h1>旧内容</h1>')
+        cache._conn.execute('UPDATE responses SET fetched_at = 0')
+        cache._conn.commit()
+        assert api._fetch_text('detail', url) == '<h1>旧内容</h1>', "异常页面覆盖了过期的缓存内容"
+        assert cache.stats()['rejected'] == 4, "未统计不缓存的页面"
+        
+        logger.info("豆瓣异常页面不缓存测试通过")
+    finally:
+        server.shutdown()
+        server.server_close()
+        cache.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(os.path.dirname(path))
+
+def test_douban_info_parser():
+    """测试豆瓣#info单次遍历解析：各种标签写法、链接与文本值、国籍标识，以及详情方法使用解析结果"""
+    info_html = """<div id="info">
+    <span><span class="pl"> 作者</span>:
+        <a href="/author/1">
+            [英] 乔治·奥威尔</a> / <a href="/author/2">某 合著者</a>
+    </span><br/>
+    <span class="pl">出版社:</span> <a href="/press/1">上海译文出版社</a><br>
+    <span class="pl">出版时间:</span> 2011-4<br/>
+    <span class="pl">丛书:</span>&nbsp;<a href="/series/1">译文经典</a><br>
+    <span class="pl">又名:</span> 月黑高飞(港) / 刺激1995(台)<br/>
+    <span class="actor"><span class="pl">主演</span>: <span class="attrs"><a href="/c/1">甲</a> / <a href="/c/2">乙</a><a href="javascript:;" class="more-actor">更多...</a></span></span><br/>
+    <span><span class="pl">表演者:
+        <a href="/musician/1/">陈绮贞</a></span></span><br />
+    <span class="pl">ISBN:</span> 9787532754687<br/>
+    <span class="pl">ISBN:</span> 重复的标签<br/>
+    </div>"""
+    path = os.path.join(tempfile.mkdtemp(), 'douban_cache.db')
+    cache = HttpCache(path)
+    
+    try:
+        info = parse_info(BeautifulSoup(info_html, "html.parser"))
+        assert info["作者"] == ["[英] 乔治·奥威尔", "某 合著者"], f"作者解析错误: {info.get('作者')}"
+        assert info_people(info, "作者") == "乔治·奥威尔, 某 合著者", "未去掉国籍标识"
+        assert info_text(info, "出版社") == "上海译文出版社"
+        assert info_text(info, "出版年", "出版时间") == "2011-4", "替代标签未生效"
+        assert info_text(info, "丛书") == "译文经典"
+        assert info["又名"] == ["月黑高飞(港)", "刺激1995(台)"], "文本值未按/分隔"
+        assert info["主演"] == ["甲", "乙"], "javascript链接不应作为值"
+        assert info["表演者"] == ["陈绮贞"], "标签span内的链接未解析"
+        assert info_text(info, "ISBN") == "9787532754687", "同名标签应保留第一个"
+        assert info_text(info, "页数") == "", "不存在的标签应返回空字符串"
+        assert parse_info(BeautifulSoup("<div>没有信息栏</div>", "html.parser")) == {}
+        
+        # 详情方法从同一个解析结果读取各字段（页面预先放入响应缓存，不访问网络）
+        url = "https://book.douban.com/subject/1/"
+        cache.put(cache_key(url), 'detail', f"<html><h1>1984</h1>{info_html}</html>")
+        book = DoubanAPI(cache=cache).get_book_detail("1")
+        assert book["title"] == "1984"
+        assert book["author"] == "乔治·奥威尔, 某 合著者", f"作者错误: {book['author']}"
+        assert book["publisher"] == "上海译文出版社"
+        assert book["publish_date"] == "2011-4"
+        assert book["series"] == "译文经典"
+        assert book["isbn"] == "9787532754687"
+        
+        logger.info("豆瓣#info解析测试通过")
+    finally:
+        cache.close()
+
+def test_douban_parser_backends():
+    """测试豆瓣页面解析方式：JSON-LD直接截取，三种解析方式的详情结果相同，partial只保留用到的元素"""
+    page = """<html><head><title>测试电影 (豆瓣)</title>
+    <script type="text/javascript">var x = 1;</script>
+    <script type="application/ld+json">{"name": "测试电影 Test", "description": "第一行
+第二行", "genre": ["剧情"], "director": [{"name": "某导演"}], "datePublished": "2001-02-03",
+    "aggregateRating": {"ratingValue": "8.5"}}</script></head>
+    <body><div id="db-global-nav"><a href="/x">导航</a></div>
+    <h1><span property="v:itemreviewed">测试电影 Test</span></h1>
+    <div id="mainpic"><img src="https://img.example/cover.jpg" rel="v:image"></div>
+    <div id="info"><span class="pl">制片国家/地区:</span> 美国 / 英国<br/>
+    <span class="pl">语言:</span> 英语<br/><span class="pl">片长:</span> <span property="v:runtime">99分钟</span><br/></div>
+    <div id="comments-section"><p class="comment-content">短评内容</p></div></body></html>"""
+    path = os.path.join(tempfile.mkdtemp(), 'douban_cache.db')
+    cache = HttpCache(path)
+    
+    try:
+        json_ld = extract_json_ld(page)
+        assert json_ld["description"] == "第一行\n第二行", "简介中的换行导致JSON-LD解析失败"
+        assert extract_json_ld("<html><script type='application/ld+json'>{坏的</script></html>") is None
         
+        partial = make_soup(page, 'detail', 'partial')
+        assert partial.find("div", id="info") is not None, "partial方式缺少#info"
+        assert partial.find("div", id="comments-section") is None, "partial方式不应保留短评"
+        assert partial.find("div", id="db-global-nav") is None, "partial方式不应保留导航"
+        try:
+            make_soup(page, 'detail', 'html5')
+            assert False, "不支持的解析方式应抛出ValueError"
+        except ValueError:
+            pass
+        
+        url = "https://movie.douban.com/subject/7/"
+        cache.put(cache_key(url), 'detail', page)
+        results = [DoubanAPI(cache=cache, parser=backend).get_movie_detail("7") for backend in PARSER_BACKENDS]
+        movie = results[0]
+        assert all(result == movie for result in results), "各解析方式的结果不同"
+        assert movie["title"] == "测试电影 Test" and movie["original_title"] == "Test"
+        assert movie["director"] == "某导演" and movie["year"] == "2001"
+        assert movie["country"] == "美国,英国", f"国家错误: {movie['country']}"
+        assert movie["duration"] == "99分钟"
+        assert movie["cover_url"] == "https://img.example/cover.jpg", "JSON-LD缺少封面时应从DOM读取"
+        
+        logger.info("豆瓣页面解析方式测试通过")
+    finally:
+        cache.close()
+
+def test_douban_corpus():
+    """测试豆瓣离线样本集：每种解析方式下，样本页面的解析结果都符合清单中的期望"""
+    corpus = load_douban_corpus()
+    cache = douban_corpus_cache(os.path.join(tempfile.mkdtemp(), 'douban_cache.db'), corpus)
+    
+    try:
+        assert corpus_mismatches({"a": [1, 2], "b": 3}, {"a": [1, 2]}) == [], "期望中未列出的字段不应比较"
+        assert corpus_mismatches({"a": [1]}, {"a": [1, 2]}), "列表长度不同应报告不一致"
+        
+        for backend in PARSER_BACKENDS:
+            api = DoubanAPI(cache=cache, parser=backend)
+            for case in corpus:
+                mismatches = corpus_mismatches(run_douban_case(api, case), case["expect"])
+                assert not mismatches, f"{backend}解析{case['page']}（{case['method']}）不一致: {mismatches}"
+        
+        logger.info("豆瓣离线样本集测试通过")
+    finally:
+        cache.close()
+
+def run_test(test):
+    """在独立的临时数据库上执行一个测试（与conftest.py中的temp_database夹具相同），返回是否通过"""
+    original = database.DB_FILE
+    database.DB_FILE = os.path.join(tempfile.mkdtemp(), 'media_manager.db')
+    database.reset_pool()
+    try:
+        init_db()
+        test()
         return True
-    except Exception as e:
-        logger.error(f"MusicDAO测试失败: {e}")
+    except Exception:
+        logger.exception("%s失败", test.__name__)
         return False
+    finally:
+        database.DB_FILE = original
+        database.reset_pool()
 
 def main():
     """主函数"""
@@ -134,25 +1246,137 @@ def main():
     
     # 测试数据库连接
     logger.info("测试数据库连接...")
-    if not test_database_connection():
+    if not run_test(test_database_connection):
         return 1
     
     # 测试表是否存在
     logger.info("测试表是否存在...")
-    if not test_tables_exist():
+    if not run_test(test_tables_exist):
+        return 1
+    
+    logger.info("测试数据库架构版本...")
+    if not run_test(test_schema_version):
+        return 1
+    
+    logger.info("测试迁移标记...")
+    if not run_test(test_migration_claim):
         return 1
     
     # 测试DAO功能
     logger.info("测试BookDAO功能...")
-    if not test_book_dao():
+    if not run_test(test_book_dao):
         return 1
     
     logger.info("测试MovieDAO功能...")
-    if not test_movie_dao():
+    if not run_test(test_movie_dao):
         return 1
     
     logger.info("测试MusicDAO功能...")
-    if not test_music_dao():
+    if not run_test(test_music_dao):
+        return 1
+    
+    logger.info("测试连接池...")
+    if not run_test(test_connection_pool):
+        return 1
+    
+    logger.info("测试备份...")
+    if not run_test(test_backup):
+        return 1
+    
+    logger.info("测试游标分页...")
+    if not run_test(test_pagination):
+        return 1
+    
+    logger.info("测试字段投影...")
+    if not run_test(test_column_projection):
+        return 1
+    
+    logger.info("测试批量创建...")
+    if not run_test(test_create_many):
+        return 1
+    
+    logger.info("测试全文搜索...")
+    if not run_test(test_full_text_search):
+        return 1
+    
+    logger.info("测试中文搜索...")
+    if not run_test(test_chinese_search):
+        return 1
+    
+    logger.info("测试列表筛选...")
+    if not run_test(test_filter_query):
+        return 1
+    
+    logger.info("测试筛选项计数...")
+    if not run_test(test_facets):
+        return 1
+    
+    logger.info("测试并发写入的筛选项计数...")
+    if not run_test(test_facets_concurrent_write):
+        return 1
+    
+    logger.info("测试标签关联...")
+    if not run_test(test_item_tags):
+        return 1
+    
+    logger.info("测试状态校验...")
+    if not run_test(test_status):
+        return 1
+    
+    logger.info("测试日志配置...")
+    if not run_test(test_logging):
+        return 1
+    
+    logger.info("测试首页概览...")
+    if not run_test(test_dashboard):
+        return 1
+    
+    logger.info("测试查询缓存...")
+    if not run_test(test_query_cache):
+        return 1
+    
+    logger.info("测试条件GET...")
+    if not run_test(test_conditional_get):
+        return 1
+    
+    logger.info("测试流式导出...")
+    if not run_test(test_export):
+        return 1
+    
+    logger.info("测试批量导入...")
+    if not run_test(test_bulk_import):
+        return 1
+    
+    logger.info("测试批量修改...")
+    if not run_test(test_batch_update):
+        return 1
+    
+    logger.info("测试批量获取...")
+    if not run_test(test_get_many):
+        return 1
+    
+    logger.info("测试豆瓣连接池...")
+    if not run_test(test_douban_http):
+        return 1
+    
+    logger.info("测试豆瓣响应缓存...")
+    if not run_test(test_douban_cache):
+        return 1
+    
+    logger.info("测试豆瓣异常页面不缓存...")
+    if not run_test(test_douban_uncacheable):
+        return 1
+    
+    logger.info("测试豆瓣#info解析...")
+    if not run_test(test_douban_info_parser):
+        return 1
+    
+    logger.info("测试豆瓣页面解析方式...")
+    if not run_test(test_douban_parser_backends):
+        return 1
+    
+    logger.info("测试豆瓣离线样本集...")
+    if not run_test(test_douban_corpus):
         return 1
     
     logger.info("所有测试通过!")